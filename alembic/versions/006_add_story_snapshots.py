@@ -0,0 +1,46 @@
+"""Add story ranking snapshot tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "story_snapshots",
+        sa.Column("filter_key", sa.String(255), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("total", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("generated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "story_snapshot_items",
+        sa.Column("filter_key", sa.String(255), primary_key=True),
+        sa.Column("version", sa.BigInteger, primary_key=True),
+        sa.Column("position", sa.Integer, primary_key=True),
+        sa.Column("story_key", sa.String(64), nullable=False),
+        sa.Column(
+            "lead_article_id",
+            sa.Integer,
+            sa.ForeignKey("articles.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("dedup_cluster_id", sa.Integer, nullable=True),
+        sa.Column("score", sa.Float, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("story_snapshot_items")
+    op.drop_table("story_snapshots")
@@ -0,0 +1,41 @@
+"""Add hourly article view rollups and pipeline watermarks
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:01.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "article_view_rollups",
+        sa.Column(
+            "article_id",
+            sa.Integer,
+            sa.ForeignKey("articles.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("view_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_article_view_rollups_bucket_start", "article_view_rollups", ["bucket_start"])
+
+    op.create_table(
+        "pipeline_watermarks",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("value", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("pipeline_watermarks")
+    op.drop_table("article_view_rollups")
@@ -0,0 +1,28 @@
+"""Add HNSW cosine index on articles.embedding
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:02.000000
+"""
+
+from alembic import op
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so crawls and API reads keep running on large tables.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_embedding_hnsw "
+            "ON articles USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_embedding_hnsw")
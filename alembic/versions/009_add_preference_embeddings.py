@@ -0,0 +1,27 @@
+"""Store preference-topic embeddings and the time a user's preferences changed
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:03.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_preferences", sa.Column("embedding", Vector(384), nullable=True))
+    op.add_column("user_preferences", sa.Column("embedding_model", sa.String(100), nullable=True))
+    op.add_column("users", sa.Column("profile_updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "profile_updated_at")
+    op.drop_column("user_preferences", "embedding_model")
+    op.drop_column("user_preferences", "embedding")
@@ -0,0 +1,26 @@
+"""Add (publishing_date, id) index for keyset pagination
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:04.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_articles_publishing_date_id",
+        "articles",
+        [sa.text("publishing_date DESC NULLS LAST"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_publishing_date_id", table_name="articles")
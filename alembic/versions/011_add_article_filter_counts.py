@@ -0,0 +1,28 @@
+"""Add incrementally maintained per-filter article counts
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:05.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "article_filter_counts",
+        sa.Column("dimension", sa.String(20), primary_key=True),
+        sa.Column("value", sa.Text, primary_key=True),
+        sa.Column("total", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("embedded", sa.BigInteger, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("article_filter_counts")
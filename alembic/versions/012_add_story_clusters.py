@@ -0,0 +1,52 @@
+"""Add denormalized story_clusters table and index articles.dedup_cluster_id
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 00:00:06.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "story_clusters",
+        sa.Column("cluster_id", sa.Integer, primary_key=True),
+        sa.Column("size", sa.Integer, nullable=False),
+        sa.Column("member_ids", sa.ARRAY(sa.Integer), nullable=False),
+        sa.Column("tier_1_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("tier_2_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("tier_3_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "lead_article_id",
+            sa.Integer,
+            sa.ForeignKey("articles.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("publishers", sa.ARRAY(sa.String(255)), nullable=False, server_default="{}"),
+        sa.Column("languages", sa.ARRAY(sa.String(10)), nullable=False, server_default="{}"),
+        sa.Column("categories", sa.ARRAY(sa.String(50)), nullable=False, server_default="{}"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_story_clusters_size", "story_clusters", [sa.text("size DESC"), "cluster_id"])
+    op.create_index("ix_story_clusters_publishers", "story_clusters", ["publishers"], postgresql_using="gin")
+    op.create_index("ix_story_clusters_languages", "story_clusters", ["languages"], postgresql_using="gin")
+    op.create_index("ix_story_clusters_categories", "story_clusters", ["categories"], postgresql_using="gin")
+
+    # The table is filled by the next dedup pass (see services/dedup.py).
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_dedup_cluster_id ON articles (dedup_cluster_id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_dedup_cluster_id")
+    op.drop_table("story_clusters")
@@ -0,0 +1,36 @@
+"""Compress article bodies kept in PostgreSQL with lz4
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 00:00:07.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+
+def _supports_lz4() -> bool:
+    bind = op.get_bind()
+    if bind.dialect.server_version_info < (14,):
+        return False
+    # Servers built without --with-lz4 reject the method.
+    return bool(
+        bind.execute(sa.text("SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'"))
+        .scalar()
+    )
+
+
+def upgrade() -> None:
+    # Only newly written values use lz4; existing rows keep pglz until rewritten.
+    if _supports_lz4():
+        op.execute("ALTER TABLE articles ALTER COLUMN body SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    if _supports_lz4():
+        op.execute("ALTER TABLE articles ALTER COLUMN body SET COMPRESSION DEFAULT")
@@ -0,0 +1,29 @@
+"""Index articles.crawled_at and (embedded_at, id) for change watermarks
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 00:00:08.000000
+"""
+
+from alembic import op
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Conditional GET reads max(crawled_at) / max(embedded_at) per request, and
+    # the embedding store syncs by (embedded_at, id) keyset.
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_crawled_at ON articles (crawled_at)")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_embedded_at_id ON articles (embedded_at, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_embedded_at_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_crawled_at")
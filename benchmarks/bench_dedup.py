@@ -0,0 +1,145 @@
+"""Benchmark windowed, tiled dedup similarity against the full-history dense product.
+
+Usage:
+    python benchmarks/bench_dedup.py [--sizes 100000,1000000] [--new 2000] [--history-days 365] [--window-days 7]
+                                     [--margin 0.03]
+
+The synthetic corpus is spread evenly over ``--history-days`` and the new
+batch is dated on the last day, so the window holds roughly
+``size * 2 * window / history`` rows whatever the corpus size.  The dense
+baseline is skipped when its score matrix would exceed ``--max-dense-mb``.
+
+A second table compares quantized scoring (``DEDUP_SCORE_DTYPE``) with the
+exact float32 pass over the full corpus.  The new batch is perturbed so its
+similarities spread around the threshold, and recall is the share of the
+exact pass's pairs that the quantized pass also finds.  The ``ms`` column
+is the scan alone: in production ``EmbeddingStore.sync`` keeps the codes
+in ``codes.bin``/``scales.bin`` and only quantizes the rows it writes, so
+quantization is not paid per dedup run.  That cost is reported separately
+as ``rebuild ms`` (quantizing the whole corpus, paid once when the store
+is created or ``DEDUP_SCORE_DTYPE`` changes) and ``sync ms`` (quantizing
+one ``--new`` batch, paid by each sync).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from fundus_recommend.services.dedup import _Corpus, _neighbours
+from fundus_recommend.services.quantization import quantize
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _corpus(new_vectors: np.ndarray, ids: np.ndarray, vectors: np.ndarray, quantized=None) -> _Corpus:
+    return _Corpus(
+        new_ids=list(range(len(new_vectors))),
+        new_vectors=new_vectors,
+        new_blocks=np.zeros(len(new_vectors), dtype=np.int64),
+        ids=ids.tolist(),
+        vectors=vectors,
+        blocks=np.zeros(len(ids), dtype=np.int64),
+        cluster_of={},
+        quantized=quantized,
+    )
+
+
+def _pairs(neighbours: list[np.ndarray]) -> set[tuple[int, int]]:
+    return {(row, int(col)) for row, hits in enumerate(neighbours) for col in hits}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--new", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--history-days", type=float, default=365.0)
+    parser.add_argument("--window-days", type=float, default=7.0)
+    parser.add_argument("--tile-mb", type=int, default=64)
+    parser.add_argument("--max-dense-mb", type=int, default=2048)
+    parser.add_argument("--threshold", type=float, default=0.70)
+    parser.add_argument("--margin", type=float, default=0.03)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    tile_bytes = args.tile_mb * 1024 * 1024
+    results = []
+
+    print(
+        f"{'corpus':>9}  {'window':>7}  {'dense ms':>9}  {'dense MB':>8}  "
+        f"{'tiled ms':>9}  {'window ms':>9}  {'tile MB':>7}  {'speedup':>8}"
+    )
+    for n in (int(size) for size in args.sizes.split(",")):
+        vectors = rng.standard_normal((n, args.dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        days = rng.uniform(0, args.history_days, n)
+        new_vectors = vectors[-args.new :] + rng.normal(scale=0.02, size=(args.new, args.dim)).astype(np.float32)
+        ids = np.arange(n)
+
+        # The corpus query returns only rows inside the window around the new batch.
+        in_window = days >= args.history_days - 1 - args.window_days
+        windowed = _corpus(new_vectors, ids[in_window], vectors[in_window])
+        full = _corpus(new_vectors, ids, vectors)
+
+        dense_bytes = args.new * n * 4
+        if dense_bytes <= args.max_dense_mb * 1024 * 1024:
+            dense_s = _best_of(lambda: np.nonzero(new_vectors @ vectors.T >= args.threshold), args.repeat)
+            dense_ms = f"{dense_s * 1e3:>9.1f}"
+        else:
+            dense_ms = f"{'skipped':>9}"
+        tiled_s = _best_of(lambda: _neighbours(full, args.threshold, tile_bytes), args.repeat)
+        window_s = _best_of(lambda: _neighbours(windowed, args.threshold, tile_bytes), args.repeat)
+
+        print(
+            f"{n:>9}  {int(in_window.sum()):>7}  {dense_ms}  {dense_bytes / 2**20:>8.0f}  "
+            f"{tiled_s * 1e3:>9.1f}  {window_s * 1e3:>9.1f}  {min(dense_bytes, tile_bytes) / 2**20:>7.0f}  "
+            f"{tiled_s / max(window_s, 1e-9):>7.1f}x"
+        )
+        results.append((n, new_vectors, ids, vectors))
+
+    print()
+    print(
+        f"{'corpus':>9}  {'dtype':>7}  {'matrix MB':>9}  {'ms':>8}  {'pairs':>7}  {'recall':>7}  {'speedup':>8}  "
+        f"{'rebuild ms':>10}  {'sync ms':>8}"
+    )
+    for n, new_vectors, ids, vectors in results:
+        # Noise spreads the batch's best similarities over ~0.5-0.95.
+        noise = rng.uniform(0.02, 0.09, (args.new, 1)).astype(np.float32)
+        queries = new_vectors + noise * rng.standard_normal(new_vectors.shape, dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact = _corpus(queries, ids, vectors)
+        exact_s = _best_of(lambda: _neighbours(exact, args.threshold, tile_bytes), args.repeat)
+        expected = _pairs(_neighbours(exact, args.threshold, tile_bytes))
+        print(
+            f"{n:>9}  {'float32':>7}  {vectors.nbytes / 2**20:>9.0f}  {exact_s * 1e3:>8.1f}  "
+            f"{len(expected):>7}  {1.0:>7.4f}  {1.0:>7.1f}x  {'-':>10}  {'-':>8}"
+        )
+        for dtype in ("float16", "int8"):
+            rebuild_s = _best_of(lambda: quantize(vectors, dtype, args.dim), 1)
+            sync_s = _best_of(lambda: quantize(new_vectors, dtype, args.dim), args.repeat)
+            matrix = quantize(vectors, dtype, args.dim)
+            corpus = _corpus(queries, ids, vectors, matrix)
+            quantized_s = _best_of(lambda: _neighbours(corpus, args.threshold, tile_bytes, args.margin), args.repeat)
+            found = _pairs(_neighbours(corpus, args.threshold, tile_bytes, args.margin))
+            recall = len(found & expected) / len(expected) if expected else 1.0
+            print(
+                f"{n:>9}  {dtype:>7}  {matrix.nbytes / 2**20:>9.0f}  {quantized_s * 1e3:>8.1f}  "
+                f"{len(found):>7}  {recall:>7.4f}  {exact_s / max(quantized_s, 1e-9):>7.1f}x  "
+                f"{rebuild_s * 1e3:>10.1f}  {sync_s * 1e3:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark the array-native ranking engine against the per-candidate loop.
+
+Usage:
+    python benchmarks/bench_ranking.py [--sizes 200,500,10000,50000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from fundus_recommend.services.ranking import (
+    RankingWeights,
+    composite_scores_from_arrays,
+    engagement_score,
+    epoch_seconds,
+    freshness_score,
+    prominence_score,
+)
+
+
+def _loop_scores(dates, views, weights, cluster_sizes, authorities) -> np.ndarray:
+    """The pre-vectorization implementation, kept here as the baseline."""
+    now = datetime.now(timezone.utc)
+    scores = np.zeros(len(dates))
+    max_views = max(views) if views else 0
+    max_cluster = max(cluster_sizes) if cluster_sizes else 1
+    for i in range(len(dates)):
+        f = freshness_score(dates[i], now, weights.half_life_hours)
+        e = engagement_score(views[i], max_views)
+        p = prominence_score(cluster_sizes[i], max_cluster)
+        scores[i] = weights.freshness * f + weights.prominence * p + weights.authority * authorities[i] + weights.engagement * e
+    return scores
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="200,500,10000,50000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    weights = RankingWeights()
+    now = datetime.now(timezone.utc)
+
+    print(f"{'candidates':>10}  {'loop ms':>9}  {'array ms':>9}  {'convert ms':>10}  {'speedup':>8}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        ages = rng.uniform(0, 24 * 14, n)
+        dates = [now - timedelta(hours=float(age)) for age in ages]
+        views = rng.integers(0, 500, n).tolist()
+        cluster_sizes = rng.integers(1, 30, n).tolist()
+        authorities = rng.choice([1.0, 0.7, 0.4], n).tolist()
+
+        loop_s = _best_of(lambda: _loop_scores(dates, views, weights, cluster_sizes, authorities), args.repeat)
+
+        publish_ts = epoch_seconds(dates)
+        views_arr = np.asarray(views, dtype=np.float64)
+        sizes_arr = np.asarray(cluster_sizes, dtype=np.float64)
+        auth_arr = np.asarray(authorities, dtype=np.float64)
+        array_s = _best_of(
+            lambda: composite_scores_from_arrays(publish_ts, views_arr, weights, sizes_arr, auth_arr),
+            args.repeat,
+        )
+        convert_s = _best_of(lambda: epoch_seconds(dates), args.repeat)
+
+        print(
+            f"{n:>10}  {loop_s * 1e3:>9.2f}  {array_s * 1e3:>9.3f}  {convert_s * 1e3:>10.2f}  "
+            f"{loop_s / max(array_s + convert_s, 1e-9):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark fragment-cached story serialization against the pydantic path.
+
+Usage:
+    python benchmarks/bench_serialization.py [--page-sizes 20,50,100] [--sources 4] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fundus_recommend.db.queries import RankedStory
+from fundus_recommend.models.schemas import ArticleSummary, NewsStory, StoryListResponse
+from fundus_recommend.services import serialization
+from fundus_recommend.services.serialization import ArticleJSONCache, dumps, story_payload
+
+
+def _article(article_id: int, cluster_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=article_id,
+        url=f"https://example.com/news/{article_id}",
+        title=f"Headline number {article_id} about an unfolding story",
+        title_en=None,
+        authors=["Staff Reporter", "Wire Desk"],
+        topics=["politics", "economy", "world"],
+        publisher="Reuters",
+        language="en",
+        publishing_date=datetime(2026, 2, 10, tzinfo=timezone.utc) - timedelta(minutes=article_id),
+        cover_image_url=f"https://img.example.com/{article_id}.jpg",
+        dedup_cluster_id=cluster_id,
+        category="Global",
+    )
+
+
+def _stories(count: int, sources: int) -> list[RankedStory]:
+    stories = []
+    for story_index in range(count):
+        articles = [_article(story_index * sources + offset + 1, story_index + 1) for offset in range(sources)]
+        stories.append(RankedStory(f"cluster:{story_index + 1}", story_index + 1, articles[0], articles))
+    return stories
+
+
+def _pydantic_path(stories: list[RankedStory]) -> bytes:
+    """The pre-fragment implementation, kept here as the baseline."""
+    response = StoryListResponse(
+        items=[
+            NewsStory(
+                story_id=story.story_id,
+                dedup_cluster_id=story.dedup_cluster_id,
+                source_count=len(story.articles),
+                lead_article=ArticleSummary.model_validate(story.lead_article),
+                articles=[ArticleSummary.model_validate(article) for article in story.articles],
+            )
+            for story in stories
+        ],
+        total=len(stories),
+        page=1,
+        page_size=len(stories),
+    )
+    return response.model_dump_json().encode("utf-8")
+
+
+def _fragment_path(stories: list[RankedStory], cache: ArticleJSONCache) -> bytes:
+    return dumps(
+        {
+            "items": [story_payload(story, cache) for story in stories],
+            "total": len(stories),
+            "page": 1,
+            "page_size": len(stories),
+            "next_cursor": None,
+        }
+    )
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-sizes", default="20,50,100")
+    parser.add_argument("--sources", type=int, default=4, help="Articles per story")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"envelope encoder: {encoder}")
+    print(f"{'stories':>8}  {'pydantic ms':>11}  {'cold ms':>8}  {'warm ms':>8}  {'speedup':>8}")
+    for count in (int(size) for size in args.page_sizes.split(",")):
+        stories = _stories(count, args.sources)
+        assert _fragment_path(stories, ArticleJSONCache(0)) == _pydantic_path(stories)
+
+        pydantic_s = _best_of(lambda: _pydantic_path(stories), args.repeat)
+        cold_s = _best_of(lambda: _fragment_path(stories, ArticleJSONCache()), args.repeat)
+        warm_cache = ArticleJSONCache()
+        _fragment_path(stories, warm_cache)
+        warm_s = _best_of(lambda: _fragment_path(stories, warm_cache), args.repeat)
+
+        print(
+            f"{count:>8}  {pydantic_s * 1e3:>11.2f}  {cold_s * 1e3:>8.2f}  {warm_s * 1e3:>8.2f}  "
+            f"{pydantic_s / max(warm_s, 1e-9):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
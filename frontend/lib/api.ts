@@ -19,11 +19,17 @@ export interface ArticleDetail extends ArticleSummary {
   body: string;
 }
 
+export interface ArticleBatchResponse {
+  items: ArticleSummary[];
+  missing_ids: number[];
+}
+
 export interface ArticleListResponse {
   items: ArticleSummary[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface NewsStory {
@@ -39,6 +45,7 @@ export interface StoryListResponse {
   total: number;
   page: number;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface StoryRecommendationResult {
@@ -73,7 +80,8 @@ async function fetchApi<T>(path: string, params?: Record<string, string>): Promi
       if (v) url.searchParams.set(k, v);
     });
   }
-  const res = await fetch(url.toString(), { cache: "no-store" });
+  // Revalidate with the stored ETag; unchanged polls come back as 304.
+  const res = await fetch(url.toString(), { cache: "no-cache" });
   if (!res.ok) {
     throw new Error(`API error: ${res.status} ${res.statusText}`);
   }
@@ -87,6 +95,8 @@ export async function getArticles(params?: {
   language?: string;
   category?: string;
   sort?: "recent" | "ranked";
+  cursor?: string;
+  include_total?: boolean;
 }): Promise<ArticleListResponse> {
   const query: Record<string, string> = {};
   if (params?.page) query.page = String(params.page);
@@ -95,6 +105,8 @@ export async function getArticles(params?: {
   if (params?.language) query.language = params.language;
   if (params?.category) query.category = params.category;
   if (params?.sort) query.sort = params.sort;
+  if (params?.cursor) query.cursor = params.cursor;
+  if (params?.include_total === false) query.include_total = "false";
   return fetchApi<ArticleListResponse>("/articles", query);
 }
 
@@ -105,6 +117,7 @@ export async function getStories(params?: {
   language?: string;
   topic?: string;
   category?: string;
+  cursor?: string;
 }): Promise<StoryListResponse> {
   const query: Record<string, string> = {};
   if (params?.page) query.page = String(params.page);
@@ -113,6 +126,7 @@ export async function getStories(params?: {
   if (params?.language) query.language = params.language;
   if (params?.topic) query.topic = params.topic;
   if (params?.category) query.category = params.category;
+  if (params?.cursor) query.cursor = params.cursor;
   return fetchApi<StoryListResponse>("/stories", query);
 }
 
@@ -120,6 +134,10 @@ export async function getArticle(id: number): Promise<ArticleDetail> {
   return fetchApi<ArticleDetail>(`/articles/${id}`);
 }
 
+export async function getArticlesBatch(ids: number[]): Promise<ArticleBatchResponse> {
+  return fetchApi<ArticleBatchResponse>("/articles/batch", { ids: ids.join(",") });
+}
+
 export async function search(q: string, limit?: number): Promise<SearchResponse> {
   const query: Record<string, string> = { q };
   if (limit) query.limit = String(limit);
@@ -2,30 +2,37 @@ from datetime import datetime
 from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fundus_recommend.db.queries import (
     get_article_by_id,
+    get_articles_by_ids,
     get_ranked_articles,
     get_ranked_stories,
     list_articles,
-    record_article_view,
 )
 from fundus_recommend.db.session import get_async_session
 from fundus_recommend.models.db import Article
 from fundus_recommend.models.schemas import (
+    ArticleBatchResponse,
     ArticleDetail,
     ArticleListResponse,
     ArticleSummary,
-    NewsStory,
     StoryListResponse,
 )
 from fundus_recommend.services.article_body_store import BodyStoreError, get_body
+from fundus_recommend.services.body_cache import article_body_cache
+from fundus_recommend.services.pagination import InvalidCursorError
+from fundus_recommend.services.result_cache import feed_result_cache
+from fundus_recommend.services.serialization import article_json_cache, dumps, json_response, story_payload
+from fundus_recommend.services.view_sink import article_id_cache, get_view_sink
 
 router = APIRouter(tags=["articles"])
 
+MAX_BATCH_IDS = 500
+
 
 @router.get("/articles", response_model=ArticleListResponse)
 async def get_articles(
@@ -36,18 +43,57 @@ async def get_articles(
     topic: str | None = None,
     category: str | None = None,
     sort: Literal["recent", "ranked"] = "ranked",
+    diversify: bool = False,
+    cursor: str | None = None,
+    include_total: bool = True,
+    exact: bool = False,
     session: AsyncSession = Depends(get_async_session),
 ):
-    if sort == "ranked":
-        articles, total = await get_ranked_articles(session, page, page_size, publisher, language, topic, category)
-    else:
-        articles, total = await list_articles(session, page, page_size, publisher, language, topic, category)
-    return ArticleListResponse(
-        items=[ArticleSummary.model_validate(a) for a in articles],
-        total=total,
-        page=page,
-        page_size=page_size,
-    )
+    async def build() -> bytes:
+        try:
+            if sort == "ranked":
+                articles, total, next_cursor = await get_ranked_articles(
+                    session,
+                    page,
+                    page_size,
+                    publisher,
+                    language,
+                    topic,
+                    category,
+                    diversify=diversify,
+                    cursor=cursor,
+                    include_total=include_total,
+                    exact=exact,
+                )
+            else:
+                articles, total, next_cursor = await list_articles(
+                    session,
+                    page,
+                    page_size,
+                    publisher,
+                    language,
+                    topic,
+                    category,
+                    cursor=cursor,
+                    include_total=include_total,
+                    exact=exact,
+                )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return dumps(
+            {
+                "items": [article_json_cache.fragment(a) for a in articles],
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+            }
+        )
+
+    if sort != "ranked" or exact:
+        return json_response(await build())
+    cache_key = ("articles", page, page_size, publisher, language, topic, category, diversify, cursor, include_total)
+    return json_response(await feed_result_cache.get_or_build(session, cache_key, build))
 
 
 @router.get("/stories", response_model=StoryListResponse)
@@ -58,24 +104,29 @@ async def get_stories(
     language: str | None = None,
     topic: str | None = None,
     category: str | None = None,
+    diversify: bool = False,
+    cursor: str | None = None,
     session: AsyncSession = Depends(get_async_session),
 ):
-    stories, total = await get_ranked_stories(session, page, page_size, publisher, language, topic, category)
-    return StoryListResponse(
-        items=[
-            NewsStory(
-                story_id=story.story_id,
-                dedup_cluster_id=story.dedup_cluster_id,
-                source_count=len(story.articles),
-                lead_article=ArticleSummary.model_validate(story.lead_article),
-                articles=[ArticleSummary.model_validate(article) for article in story.articles],
+    async def build() -> bytes:
+        try:
+            stories, total, next_cursor = await get_ranked_stories(
+                session, page, page_size, publisher, language, topic, category, diversify=diversify, cursor=cursor
             )
-            for story in stories
-        ],
-        total=total,
-        page=page,
-        page_size=page_size,
-    )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return dumps(
+            {
+                "items": [story_payload(story) for story in stories],
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+            }
+        )
+
+    cache_key = ("stories", page, page_size, publisher, language, topic, category, diversify, cursor)
+    return json_response(await feed_result_cache.get_or_build(session, cache_key, build))
 
 
 class LatestTimestampResponse(BaseModel):
@@ -89,6 +140,30 @@ async def get_latest_timestamp(session: AsyncSession = Depends(get_async_session
     return LatestTimestampResponse(latest_crawled_at=latest)
 
 
+@router.get("/articles/batch", response_model=ArticleBatchResponse)
+async def get_articles_batch(ids: str, session: AsyncSession = Depends(get_async_session)):
+    """Summaries for comma-separated *ids* in request order, plus the ids that do not exist."""
+    try:
+        article_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers") from exc
+    if not article_ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(article_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    articles = await get_articles_by_ids(session, article_ids)
+    found = {article.id for article in articles}
+    return json_response(
+        dumps(
+            {
+                "items": [article_json_cache.fragment(article) for article in articles],
+                "missing_ids": [article_id for article_id in article_ids if article_id not in found],
+            }
+        )
+    )
+
+
 @router.get("/articles/{article_id}", response_model=ArticleDetail)
 async def get_article(article_id: int, session: AsyncSession = Depends(get_async_session)):
     article = await get_article_by_id(session, article_id)
@@ -97,7 +172,7 @@ async def get_article(article_id: int, session: AsyncSession = Depends(get_async
     body: str
     if article.body_storage_key:
         try:
-            body = get_body(article.body_storage_key)
+            body = await article_body_cache.get(article.body_storage_key, get_body)
         except BodyStoreError as exc:
             if article.body is not None:
                 body = article.body
@@ -113,7 +188,8 @@ async def get_article(article_id: int, session: AsyncSession = Depends(get_async
 
 
 class ViewRequest(BaseModel):
-    session_id: str
+    # article_views.session_id is VARCHAR(36); longer values would fail the bulk insert.
+    session_id: str = Field(max_length=36)
 
 
 @router.post("/articles/{article_id}/view", status_code=204)
@@ -122,7 +198,6 @@ async def track_article_view(
     body: ViewRequest,
     session: AsyncSession = Depends(get_async_session),
 ):
-    article = await get_article_by_id(session, article_id)
-    if article is None:
+    if not await article_id_cache.exists(session, article_id):
         raise HTTPException(status_code=404, detail="Article not found")
-    await record_article_view(session, article_id, body.session_id)
+    get_view_sink().record(article_id, body.session_id)
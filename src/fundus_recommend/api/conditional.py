@@ -0,0 +1,179 @@
+"""Conditional GET for feed, article and recommendation responses.
+
+The frontend polls the feed every minute, and between scheduler cycles every
+poll used to re-transfer the same pages.  Responses from these endpoints now
+carry an ``ETag`` and ``Last-Modified`` derived from the request path and
+query string (the filter tuple) and from when the data behind them last
+changed: the ``feed_version`` watermark, the newest ``articles.crawled_at``
+and ``articles.embedded_at`` (so ``fr-crawl`` / ``fr-embed`` runs outside a
+scheduler cycle count), and for personalized feeds the user's
+``profile_updated_at``.  Views are deliberately left out: they arrive every
+few seconds, while snapshots, the ranked feed cache and the view rollups only
+move once per scheduler cycle, which bumps ``feed_version`` anyway.  A request whose
+``If-None-Match`` or ``If-Modified-Since`` still matches is answered with 304
+before the endpoint runs, so an unchanged poll costs one cached watermark
+read and one indexed max lookup.  ``If-None-Match: *`` only matches once the
+endpoint has confirmed the resource exists.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+
+from fundus_recommend.db.session import AsyncSessionLocal
+from fundus_recommend.models.db import Article, User
+from fundus_recommend.services.result_cache import feed_result_cache
+
+_CONDITIONAL_PATH_RE = re.compile(
+    r"^/(?:articles|stories|recommendations|story-recommendations|articles/(?:\d+|batch)|(?:story-)?feed/[^/]+)$"
+)
+_PERSONALIZED_PATH_RE = re.compile(r"^/(?:story-)?feed/(?P<user_id>[^/]+)$")
+
+
+@dataclass
+class ConditionalGetStats:
+    requests: int = 0
+    not_modified: int = 0
+
+
+conditional_stats = ConditionalGetStats()
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: datetime
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Cacheable, but always revalidated: the next cycle can change any page.
+            "Cache-Control": "no-cache",
+        }
+
+
+def is_conditional_path(path: str) -> bool:
+    return _CONDITIONAL_PATH_RE.match(path) is not None
+
+
+def _millis(value: datetime | None) -> int:
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def build_validators(
+    path: str,
+    query_items: Iterable[tuple[str, str]],
+    feed_version: int,
+    profile_updated_at: datetime | None = None,
+    data_updated_at: Iterable[datetime | None] = (),
+) -> Validators:
+    """Validators for the response at *path* under *feed_version* (milliseconds).
+
+    *data_updated_at* are the change times of the underlying tables; any of
+    them moving changes both validators.
+    """
+    versions = [feed_version, _millis(profile_updated_at), *(_millis(value) for value in data_updated_at)]
+    key = json.dumps([path, sorted(query_items), versions[1:]], separators=(",", ":"))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    modified_ms = max(versions)
+    return Validators(
+        etag=f'W/"{modified_ms:x}-{digest}"',
+        last_modified=datetime.fromtimestamp(modified_ms // 1000, tz=timezone.utc),
+    )
+
+
+def is_not_modified(headers: Headers, validators: Validators) -> bool:
+    """RFC 9110 evaluation: ``If-None-Match`` (weak comparison) takes precedence over ``If-Modified-Since``.
+
+    ``*`` is not matched here; see :func:`matches_any`.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return validators.etag.removeprefix("W/") in tags
+
+    if_modified_since = headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return validators.last_modified <= since
+
+
+def matches_any(headers: Headers) -> bool:
+    """``If-None-Match: *`` — a match only if the resource exists."""
+    if_none_match = headers.get("if-none-match")
+    return if_none_match is not None and "*" in {tag.strip() for tag in if_none_match.split(",")}
+
+
+async def data_updated_at(session: AsyncSession) -> list[datetime | None]:
+    """Newest ``crawled_at`` / ``embedded_at``, read from their indexes in one query."""
+    columns = [
+        select(func.max(Article.crawled_at)).scalar_subquery(),
+        select(func.max(Article.embedded_at)).scalar_subquery(),
+    ]
+    return list((await session.execute(select(*columns))).one())
+
+
+async def request_validators(session: AsyncSession, request: Request) -> Validators | None:
+    """Validators for *request*, or ``None`` before the scheduler has published a feed version."""
+    feed_version = await feed_result_cache.current_watermark(session)
+    if not feed_version:
+        return None
+    profile_updated_at = None
+    personalized = _PERSONALIZED_PATH_RE.match(request.url.path)
+    if personalized is not None:
+        profile_updated_at = (
+            await session.execute(select(User.profile_updated_at).where(User.id == personalized["user_id"]))
+        ).scalar_one_or_none()
+    return build_validators(
+        request.url.path,
+        request.query_params.multi_items(),
+        feed_version,
+        profile_updated_at,
+        await data_updated_at(session),
+    )
+
+
+async def conditional_get(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """HTTP middleware answering unchanged conditional GETs with 304."""
+    if request.method != "GET" or not is_conditional_path(request.url.path):
+        return await call_next(request)
+
+    conditional_stats.requests += 1
+    async with AsyncSessionLocal() as session:
+        validators = await request_validators(session, request)
+    if validators is None:
+        return await call_next(request)
+    if is_not_modified(request.headers, validators):
+        conditional_stats.not_modified += 1
+        return Response(status_code=304, headers=validators.headers())
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    if matches_any(request.headers):
+        conditional_stats.not_modified += 1
+        return Response(status_code=304, headers=validators.headers())
+    response.headers.update(validators.headers())
+    return response
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fundus_recommend.db.queries import (
-    RankedStory,
     get_personalized_feed,
     get_personalized_story_feed,
     recommend_by_topic,
@@ -11,28 +10,18 @@ from fundus_recommend.db.queries import (
     recommend_stories_similar,
 )
 from fundus_recommend.db.session import get_async_session
-from fundus_recommend.models.schemas import (
-    ArticleSummary,
-    NewsStory,
-    RecommendationResponse,
-    SearchResult,
-    StoryRecommendationResponse,
-    StoryRecommendationResult,
+from fundus_recommend.models.schemas import RecommendationResponse, StoryRecommendationResponse
+from fundus_recommend.services.query_embeddings import DEFAULT_QUERY_TOPICS
+from fundus_recommend.services.serialization import (
+    dumps,
+    json_response,
+    scored_article_payloads,
+    scored_story_payloads,
 )
 
 router = APIRouter(tags=["recommendations"])
 
 
-def _to_news_story(story: RankedStory) -> NewsStory:
-    return NewsStory(
-        story_id=story.story_id,
-        dedup_cluster_id=story.dedup_cluster_id,
-        source_count=len(story.articles),
-        lead_article=ArticleSummary.model_validate(story.lead_article),
-        articles=[ArticleSummary.model_validate(article) for article in story.articles],
-    )
-
-
 @router.get("/recommendations", response_model=RecommendationResponse)
 async def get_recommendations(
     topic: str | None = Query(None, description="Topic to get recommendations for"),
@@ -48,16 +37,10 @@ async def get_recommendations(
         strategy = f"topic:{topic}"
     else:
         # Default: recent articles with embeddings
-        results = await recommend_by_topic(session, "latest news", limit)
+        results = await recommend_by_topic(session, DEFAULT_QUERY_TOPICS[0], limit)
         strategy = "recent"
 
-    return RecommendationResponse(
-        strategy=strategy,
-        results=[
-            SearchResult(article=ArticleSummary.model_validate(article), score=round(score, 4))
-            for article, score in results
-        ],
-    )
+    return json_response(dumps({"strategy": strategy, "results": scored_article_payloads(results)}))
 
 
 @router.get("/story-recommendations", response_model=StoryRecommendationResponse)
@@ -74,16 +57,10 @@ async def get_story_recommendations(
         results = await recommend_stories_by_topic(session, topic, limit)
         strategy = f"topic:{topic}"
     else:
-        results = await recommend_stories_by_topic(session, "latest news", limit)
+        results = await recommend_stories_by_topic(session, DEFAULT_QUERY_TOPICS[0], limit)
         strategy = "recent"
 
-    return StoryRecommendationResponse(
-        strategy=strategy,
-        results=[
-            StoryRecommendationResult(story=_to_news_story(story), score=round(score, 4))
-            for story, score in results
-        ],
-    )
+    return json_response(dumps({"strategy": strategy, "results": scored_story_payloads(results)}))
 
 
 @router.get("/feed/{user_id}", response_model=RecommendationResponse)
@@ -93,13 +70,7 @@ async def get_feed(
     session: AsyncSession = Depends(get_async_session),
 ):
     results = await get_personalized_feed(session, user_id, limit)
-    return RecommendationResponse(
-        strategy=f"personalized:{user_id}",
-        results=[
-            SearchResult(article=ArticleSummary.model_validate(article), score=round(score, 4))
-            for article, score in results
-        ],
-    )
+    return json_response(dumps({"strategy": f"personalized:{user_id}", "results": scored_article_payloads(results)}))
 
 
 @router.get("/story-feed/{user_id}", response_model=StoryRecommendationResponse)
@@ -109,10 +80,4 @@ async def get_story_feed(
     session: AsyncSession = Depends(get_async_session),
 ):
     results = await get_personalized_story_feed(session, user_id, limit)
-    return StoryRecommendationResponse(
-        strategy=f"personalized:{user_id}",
-        results=[
-            StoryRecommendationResult(story=_to_news_story(story), score=round(score, 4))
-            for story, score in results
-        ],
-    )
+    return json_response(dumps({"strategy": f"personalized:{user_id}", "results": scored_story_payloads(results)}))
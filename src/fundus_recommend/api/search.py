@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fundus_recommend.db.queries import semantic_search
 from fundus_recommend.db.session import get_async_session
-from fundus_recommend.models.schemas import ArticleSummary, SearchResponse, SearchResult
+from fundus_recommend.models.schemas import SearchResponse
+from fundus_recommend.services.serialization import dumps, json_response, scored_article_payloads
 
 router = APIRouter(tags=["search"])
 
@@ -15,10 +16,4 @@ async def search(
     session: AsyncSession = Depends(get_async_session),
 ):
     results = await semantic_search(session, q, limit)
-    return SearchResponse(
-        query=q,
-        results=[
-            SearchResult(article=ArticleSummary.model_validate(article), score=round(score, 4))
-            for article, score in results
-        ],
-    )
+    return json_response(dumps({"query": q, "results": scored_article_payloads(results)}))
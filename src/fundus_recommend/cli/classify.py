@@ -6,6 +6,9 @@ from sqlalchemy import select, update
 from fundus_recommend.config import settings
 from fundus_recommend.models.db import Article, Base
 from fundus_recommend.services.categorizer import CATEGORY_PRIORITY, assign_category
+from fundus_recommend.services.dedup import refresh_story_clusters
+from fundus_recommend.services.embedding_store import get_embedding_store
+from fundus_recommend.services.watermarks import bump_feed_version
 from fundus_recommend.db.session import SyncSessionLocal, sync_engine
 
 
@@ -17,22 +20,34 @@ def classify_all_articles(batch_size: int = 256) -> tuple[int, Counter[str]]:
     snippet_chars = max(1, settings.article_body_snippet_chars)
 
     with SyncSessionLocal() as session:
+        # With a local embedding store, vectors are read from its memory map
+        # instead of being selected with every batch.
+        store = get_embedding_store()
+        snapshot = None
+        if store is not None:
+            store.sync(session)
+            snapshot = store.load()
+        columns = [Article.id, Article.title, Article.body_snippet, Article.body, Article.title_en]
+        if snapshot is None:
+            columns.append(Article.embedding)
+
         while True:
-            stmt = (
-                select(Article.id, Article.title, Article.body_snippet, Article.body, Article.title_en, Article.embedding)
-                .where(Article.id > last_id)
-                .order_by(Article.id)
-                .limit(batch_size)
-            )
+            stmt = select(*columns).where(Article.id > last_id).order_by(Article.id).limit(batch_size)
             rows = session.execute(stmt).all()
             if not rows:
                 break
 
-            for row in rows:
+            if snapshot is None:
+                embeddings = [row[5] for row in rows]
+            else:
+                positions = snapshot.positions([row[0] for row in rows])
+                embeddings = [snapshot.vectors[pos] if pos >= 0 else None for pos in positions]
+
+            for row, embedding in zip(rows, embeddings):
                 snippet_source = row[2] or (row[3] or "")[:snippet_chars]
                 body_snippet = snippet_source[:500]
                 category = assign_category(
-                    embedding=row[5],
+                    embedding=embedding,
                     title=row[1],
                     body_snippet=body_snippet,
                     title_en=row[4],
@@ -44,6 +59,11 @@ def classify_all_articles(batch_size: int = 256) -> tuple[int, Counter[str]]:
             session.commit()
             last_id = rows[-1][0]
 
+        if total:
+            # Every member may have changed category; rebuild the cluster summaries.
+            refresh_story_clusters(session)
+            session.commit()
+
     return total, counts
 
 
@@ -55,6 +75,10 @@ def main(batch_size: int) -> None:
 
     click.echo(f"Reclassifying articles with semantic classifier (batch_size={batch_size})...")
     total, counts = classify_all_articles(batch_size=batch_size)
+    if total:
+        # Categories feed every listing; invalidate cached pages and ETags.
+        with SyncSessionLocal() as session:
+            bump_feed_version(session)
     click.echo(f"Done. Reclassified {total} articles.")
     click.echo("Category counts:")
 
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 import click
 from sqlalchemy import select, update
 
@@ -5,6 +7,7 @@ from fundus_recommend.config import settings
 from fundus_recommend.db.session import SyncSessionLocal, sync_engine
 from fundus_recommend.models.db import Article, Base
 from fundus_recommend.services.embeddings import embed_texts, make_embedding_text
+from fundus_recommend.services.watermarks import bump_feed_version
 
 
 @click.command()
@@ -31,9 +34,12 @@ def main(batch_size: int, with_dedup: bool) -> None:
                 batch = rows[i : i + batch_size]
                 texts = [make_embedding_text(r[1], (r[2] or (r[3] or "")[:snippet_chars])) for r in batch]
                 vectors = embed_texts(texts)
+                now = datetime.now(timezone.utc)
 
                 for row, vec in zip(batch, vectors):
-                    session.execute(update(Article).where(Article.id == row[0]).values(embedding=vec.tolist()))
+                    session.execute(
+                        update(Article).where(Article.id == row[0]).values(embedding=vec.tolist(), embedded_at=now)
+                    )
 
                 session.commit()
                 click.echo(f"  Embedded {min(i + batch_size, len(rows))}/{len(rows)}")
@@ -46,6 +52,7 @@ def main(batch_size: int, with_dedup: bool) -> None:
 
         with SyncSessionLocal() as session:
             clustered = run_dedup(session)
+            bump_feed_version(session)
             click.echo(f"Dedup complete. {clustered} articles assigned to clusters.")
 
 
@@ -9,6 +9,8 @@ from sqlalchemy import select
 from fundus_recommend.db.session import SyncSessionLocal, sync_engine
 from fundus_recommend.models.db import Article, Base
 from fundus_recommend.services.date_resolution import is_ambiguous_month_day, swap_month_day
+from fundus_recommend.services.dedup import refresh_story_clusters
+from fundus_recommend.services.watermarks import bump_feed_version
 
 TARGET_PUBLISHERS = ("Anadolu Ajansı", "Klasse Gegen Klasse")
 FUTURE_TOLERANCE = timedelta(days=1)
@@ -94,15 +96,23 @@ def apply_backfill(candidates: list[BackfillCandidate]) -> int:
         articles = list(session.execute(stmt).scalars().all())
 
         updated = 0
+        cluster_ids: set[int] = set()
         for article in articles:
             swapped = swaps_by_id.get(article.id)
             if swapped is None:
                 continue
             article.publishing_date = swapped
             updated += 1
+            if article.dedup_cluster_id is not None:
+                cluster_ids.add(article.dedup_cluster_id)
 
         if updated:
+            # Publishing dates pick each cluster's lead and member order.
+            session.flush()
+            refresh_story_clusters(session, cluster_ids)
             session.commit()
+            # Dates order every listing; invalidate cached pages and ETags.
+            bump_feed_version(session)
 
     return updated
 
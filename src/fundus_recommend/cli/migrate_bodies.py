@@ -1,11 +1,38 @@
 from __future__ import annotations
 
+import json
+import os
+import time
+from pathlib import Path
+
 import click
 from sqlalchemy import select, update
 
+from fundus_recommend.config import settings
 from fundus_recommend.db.session import SyncSessionLocal, sync_engine
 from fundus_recommend.models.db import Article, Base
-from fundus_recommend.services.article_body_store import BodyStoreError, build_body_key, put_body
+from fundus_recommend.services.article_body_store import (
+    BodyStoreError,
+    build_body_key,
+    get_codec,
+    put_body,
+    upload_bodies,
+)
+
+
+def _load_checkpoint(path: Path) -> int:
+    try:
+        return int(json.loads(path.read_text())["last_id"])
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise click.ClickException(f"Unreadable checkpoint {path}: {exc}") from exc
+
+
+def _save_checkpoint(path: Path, stats: dict[str, int]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(stats))
+    os.replace(tmp_path, path)
 
 
 def migrate_bodies(
@@ -16,7 +43,23 @@ def migrate_bodies(
     dry_run: bool = False,
     prune_db_body: bool = False,
     max_errors: int = 20,
+    codec: str | None = None,
+    concurrency: int | None = None,
+    checkpoint_path: str | None = None,
 ) -> dict[str, int]:
+    """Upload PostgreSQL bodies to R2 in id order, one batch at a time.
+
+    Each batch is uploaded on a bounded thread pool and its row updates are
+    committed together.  With *checkpoint_path*, the highest id below which
+    every body was uploaded is written after every batch and read back when
+    *resume_from_id* is 0.  A failed upload stops the checkpoint just before
+    its id, so a resumed run retries it (rows already migrated are skipped
+    by the ``body_storage_key IS NULL`` filter).
+    """
+    checkpoint = Path(checkpoint_path) if checkpoint_path else None
+    if checkpoint is not None and not resume_from_id:
+        resume_from_id = _load_checkpoint(checkpoint)
+
     stats = {
         "processed": 0,
         "uploaded": 0,
@@ -24,6 +67,8 @@ def migrate_bodies(
         "errors": 0,
         "last_id": resume_from_id,
     }
+    first_failed_id: int | None = None
+    started = time.perf_counter()
 
     with SyncSessionLocal() as session:
         while True:
@@ -46,29 +91,33 @@ def migrate_bodies(
             if not rows:
                 break
 
-            for article_id, url, body in rows:
-                stats["processed"] += 1
-                stats["last_id"] = int(article_id)
-                if body is None:
-                    continue
+            stats["processed"] += len(rows)
+            stats["last_id"] = int(rows[-1][0])
+            pending = [
+                (int(article_id), build_body_key(int(article_id), url), body)
+                for article_id, url, body in rows
+                if body is not None
+            ]
 
-                key = build_body_key(int(article_id), url)
+            if dry_run:
+                stats["uploaded"] += len(pending)
+                if prune_db_body:
+                    stats["pruned"] += len(pending)
+                continue
 
-                if dry_run:
-                    stats["uploaded"] += 1
-                    if prune_db_body:
-                        stats["pruned"] += 1
-                    continue
+            results = upload_bodies(
+                lambda key, body: put_body(key, body, codec),
+                [(key, body) for _article_id, key, body in pending],
+                max_workers=concurrency,
+            )
 
-                try:
-                    put_body(key, body)
-                except BodyStoreError as exc:
-                    stats["errors"] += 1
-                    click.echo(f"[error] upload failed article_id={article_id} key={key} error={exc}")
-                    if stats["errors"] > max_errors:
-                        raise click.ClickException(
-                            f"Aborting after {stats['errors']} upload errors (max_errors={max_errors})"
-                        )
+            failed = 0
+            for (article_id, key, _body), error in zip(pending, results):
+                if error is not None:
+                    failed += 1
+                    if first_failed_id is None or article_id < first_failed_id:
+                        first_failed_id = article_id
+                    click.echo(f"[error] upload failed article_id={article_id} key={key} error={error}")
                     continue
 
                 values: dict[str, str | None] = {
@@ -80,9 +129,25 @@ def migrate_bodies(
                     stats["pruned"] += 1
 
                 session.execute(update(Article).where(Article.id == article_id).values(**values))
-                session.commit()
                 stats["uploaded"] += 1
 
+            if failed < len(pending):
+                session.commit()
+            stats["errors"] += failed
+            if checkpoint is not None:
+                safe_id = stats["last_id"] if first_failed_id is None else first_failed_id - 1
+                _save_checkpoint(checkpoint, {**stats, "last_id": safe_id})
+
+            elapsed = time.perf_counter() - started
+            click.echo(
+                f"[progress] last_id={stats['last_id']} uploaded={stats['uploaded']} errors={stats['errors']} "
+                f"rate={stats['uploaded'] / elapsed if elapsed > 0 else 0.0:.1f}/s"
+            )
+            if stats["errors"] > max_errors:
+                raise click.ClickException(
+                    f"Aborting after {stats['errors']} upload errors (max_errors={max_errors})"
+                )
+
     return stats
 
 
@@ -93,6 +158,20 @@ def migrate_bodies(
 @click.option("--dry-run", is_flag=True, help="Show what would be uploaded without writing to R2 or DB.")
 @click.option("--prune-db-body", is_flag=True, help="Set articles.body=NULL after successful upload.")
 @click.option("--max-errors", default=20, show_default=True, type=int, help="Abort after this many upload errors.")
+@click.option("--codec", default=None, help="Body codec for uploads (default: ARTICLE_BODY_CODEC).")
+@click.option(
+    "--concurrency",
+    default=None,
+    type=int,
+    help="Parallel uploads per batch (default: ARTICLE_BODY_UPLOAD_CONCURRENCY).",
+)
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="JSON file recording the id up to which every body is migrated; resumes from it without --resume-from-id.",
+)
 def main(
     batch_size: int,
     limit: int | None,
@@ -100,13 +179,24 @@ def main(
     dry_run: bool,
     prune_db_body: bool,
     max_errors: int,
+    codec: str | None,
+    concurrency: int | None,
+    checkpoint_path: str | None,
 ) -> None:
     """Backfill article bodies into R2 and optionally prune PostgreSQL bodies."""
+    if codec is not None:
+        try:
+            get_codec(codec)
+        except BodyStoreError as exc:
+            raise click.BadParameter(str(exc), param_hint="--codec") from exc
     Base.metadata.create_all(sync_engine)
     click.echo(
         f"Starting body migration: batch_size={batch_size} limit={limit} "
-        f"resume_from_id={resume_from_id} dry_run={dry_run} prune_db_body={prune_db_body}"
+        f"resume_from_id={resume_from_id} dry_run={dry_run} prune_db_body={prune_db_body} "
+        f"codec={codec or settings.article_body_codec} "
+        f"concurrency={concurrency or settings.article_body_upload_concurrency}"
     )
+    started = time.perf_counter()
     stats = migrate_bodies(
         batch_size=batch_size,
         limit=limit,
@@ -114,12 +204,17 @@ def main(
         dry_run=dry_run,
         prune_db_body=prune_db_body,
         max_errors=max_errors,
+        codec=codec,
+        concurrency=concurrency,
+        checkpoint_path=checkpoint_path,
     )
+    elapsed = time.perf_counter() - started
 
     mode_label = "would upload" if dry_run else "uploaded"
     click.echo(
         f"Done. processed={stats['processed']} {mode_label}={stats['uploaded']} "
-        f"pruned={stats['pruned']} errors={stats['errors']} last_id={stats['last_id']}"
+        f"pruned={stats['pruned']} errors={stats['errors']} last_id={stats['last_id']} "
+        f"elapsed={elapsed:.1f}s rate={stats['uploaded'] / elapsed if elapsed > 0 else 0.0:.1f}/s"
     )
 
 
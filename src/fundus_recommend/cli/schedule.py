@@ -9,10 +9,14 @@ from fundus_recommend.config import settings
 from fundus_recommend.db.session import SyncSessionLocal, sync_engine
 from fundus_recommend.ingest.pipeline import crawl_publishers_once
 from fundus_recommend.ingest.registry import DEFAULT_PUBLISHER_IDS
-from fundus_recommend.models.db import Article, Base
+from fundus_recommend.models.db import Article, Base, StoryCluster
+from fundus_recommend.services.article_counts import refresh_article_counts
 from fundus_recommend.services.categorizer import assign_category
-from fundus_recommend.services.dedup import run_dedup
+from fundus_recommend.services.dedup import rebuild_story_clusters_if_due, run_dedup
 from fundus_recommend.services.embeddings import embed_texts, make_embedding_text
+from fundus_recommend.services.story_snapshots import run_story_snapshot_refresh
+from fundus_recommend.services.view_counts import refresh_view_rollups
+from fundus_recommend.services.watermarks import bump_feed_version
 from fundus_recommend.services.translation import translate_to_english
 
 _body_snippet_available: bool | None = None
@@ -233,24 +237,35 @@ def run_dedup_pass(new_article_ids: list[int] | None = None) -> int:
         return run_dedup(session, new_article_ids)
 
 
+def run_view_rollup_pass() -> int:
+    with SyncSessionLocal() as session:
+        return refresh_view_rollups(session)
+
+
+def run_story_cluster_rebuild_pass() -> int:
+    with SyncSessionLocal() as session:
+        return rebuild_story_clusters_if_due(session)
+
+
+def run_article_count_pass() -> int:
+    with SyncSessionLocal() as session:
+        return refresh_article_counts(session)
+
+
+def publish_feed_version() -> int:
+    with SyncSessionLocal() as session:
+        return bump_feed_version(session)
+
+
 def get_dedup_stats() -> tuple[int, int, int]:
     with SyncSessionLocal() as session:
-        clustered_articles = (
-            session.execute(select(func.count(Article.id)).where(Article.dedup_cluster_id.is_not(None))).scalar() or 0
-        )
-        cluster_count = (
-            session.execute(
-                select(func.count(func.distinct(Article.dedup_cluster_id))).where(Article.dedup_cluster_id.is_not(None))
-            ).scalar()
-            or 0
-        )
-        cluster_sizes = (
-            select(func.count(Article.id).label("cluster_size"))
-            .where(Article.dedup_cluster_id.is_not(None))
-            .group_by(Article.dedup_cluster_id)
-            .subquery()
-        )
-        max_cluster_size = session.execute(select(func.coalesce(func.max(cluster_sizes.c.cluster_size), 0))).scalar() or 0
+        clustered_articles, cluster_count, max_cluster_size = session.execute(
+            select(
+                func.coalesce(func.sum(StoryCluster.size), 0),
+                func.count(StoryCluster.cluster_id),
+                func.coalesce(func.max(StoryCluster.size), 0),
+            )
+        ).one()
 
     return int(clustered_articles), int(cluster_count), int(max_cluster_size)
 
@@ -322,6 +337,30 @@ def run_cycle(publishers: list[str], max_articles: int, language: str | None, ba
     if refreshed:
         click.echo(f"  Refreshed {refreshed} stale embeddings")
 
+    rolled_up = run_view_rollup_pass()
+    click.echo(f"  View rollups: folded={rolled_up}")
+
+    counted = run_article_count_pass()
+    click.echo(f"  Article counts: folded={counted}")
+
+    rebuilt_clusters = run_story_cluster_rebuild_pass()
+    if rebuilt_clusters:
+        click.echo(f"  Story clusters: rebuilt={rebuilt_clusters}")
+
+    if settings.story_snapshot_enabled:
+        # Snapshots are an optimization: the API ranks live without them, so a
+        # failed refresh must not keep this cycle from publishing its feed version.
+        try:
+            snapshot_filters, snapshot_stories = run_story_snapshot_refresh()
+        except Exception as exc:
+            click.echo(f"  [error] Story snapshot refresh failed: {type(exc).__name__}: {exc}")
+            click.echo(traceback.format_exc())
+        else:
+            click.echo(f"  Story snapshots: filters={snapshot_filters}, stories={snapshot_stories}")
+
+    feed_version = publish_feed_version()
+    click.echo(f"  Feed version: {feed_version}")
+
     click.echo(f"  Crawl diagnostics run_id={crawl_result.run_id}")
     click.echo(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Cycle complete.")
 
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import click
+from sqlalchemy import select
+
+from fundus_recommend.config import settings
+from fundus_recommend.db.session import SyncSessionLocal
+from fundus_recommend.models.db import Article
+from fundus_recommend.services.article_body_store import BodyStoreError, get_body, get_codec, put_dictionary
+
+
+def sample_bodies(sample_size: int, publisher: str | None = None) -> list[bytes]:
+    """Most recent article bodies, read from PostgreSQL or R2 when pruned."""
+    stmt = select(Article.body, Article.body_storage_key).where(
+        (Article.body.is_not(None)) | (Article.body_storage_key.is_not(None))
+    )
+    if publisher:
+        stmt = stmt.where(Article.publisher == publisher)
+    stmt = stmt.order_by(Article.id.desc()).limit(sample_size)
+
+    samples: list[bytes] = []
+    with SyncSessionLocal() as session:
+        for body, key in session.execute(stmt).all():
+            if body is None:
+                try:
+                    body = get_body(key)
+                except BodyStoreError as exc:
+                    click.echo(f"[warn] skipped sample key={key} error={exc}")
+                    continue
+            samples.append(body.encode("utf-8"))
+    return samples
+
+
+def compression_report(codec_name: str, dictionary: bytes, samples: list[bytes]) -> dict[str, float]:
+    codec = get_codec(codec_name)
+    raw = sum(len(sample) for sample in samples)
+    plain = sum(len(codec.compress(sample, None)) for sample in samples)
+    with_dict = sum(len(codec.compress(sample, dictionary)) for sample in samples)
+    return {
+        "raw_bytes": raw,
+        "ratio_without_dict": round(raw / plain, 3) if plain else 0.0,
+        "ratio_with_dict": round(raw / with_dict, 3) if with_dict else 0.0,
+    }
+
+
+@click.command()
+@click.option("--version", "dict_version", required=True, help="Dictionary version label, e.g. 2026-10.")
+@click.option("--codec", "codec_name", default="zlib", show_default=True, help="Codec to train for.")
+@click.option("--sample-size", default=2000, show_default=True, type=int, help="Bodies to sample.")
+@click.option("--dict-size", default=32 * 1024, show_default=True, type=int, help="Target dictionary bytes.")
+@click.option("--publisher", default=None, help="Only sample this publisher.")
+@click.option("--dry-run", is_flag=True, help="Report compression without uploading the dictionary.")
+def main(
+    dict_version: str,
+    codec_name: str,
+    sample_size: int,
+    dict_size: int,
+    publisher: str | None,
+    dry_run: bool,
+) -> None:
+    """Train a body compression dictionary and upload it to R2."""
+    try:
+        codec = get_codec(codec_name)
+    except BodyStoreError as exc:
+        raise click.BadParameter(str(exc), param_hint="--codec") from exc
+
+    samples = sample_bodies(sample_size, publisher)
+    if len(samples) < 10:
+        raise click.ClickException(f"Need at least 10 bodies to train, found {len(samples)}")
+
+    # Hold out every tenth body so the report measures unseen articles.
+    holdout = samples[::10]
+    training = [sample for index, sample in enumerate(samples) if index % 10]
+    try:
+        dictionary = codec.train(training, dict_size)
+    except BodyStoreError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    report = compression_report(codec_name, dictionary, holdout)
+    click.echo(
+        f"Trained {codec_name}/{dict_version}: dict_bytes={len(dictionary)} samples={len(training)} "
+        f"holdout_ratio={report['ratio_without_dict']} -> {report['ratio_with_dict']}"
+    )
+    if dry_run:
+        return
+
+    key = put_dictionary(codec_name, dict_version, dictionary)
+    click.echo(
+        f"Uploaded {key}. Set ARTICLE_BODY_CODEC={codec_name} ARTICLE_BODY_DICT_VERSION={dict_version} "
+        f"on writers (current: {settings.article_body_codec}/{settings.article_body_dict_version})."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,40 @@ class Settings(BaseSettings):
     embedding_model: str = "all-MiniLM-L6-v2"
     embedding_dim: int = 384
     dedup_threshold: float = 0.70
+    dedup_window_days: float = 7.0
+    dedup_block_by_language: bool = False
+    dedup_block_by_category: bool = False
+    dedup_tile_bytes: int = 64 * 1024 * 1024
+    dedup_score_dtype: Literal["float32", "float16", "int8"] = "float32"
+    dedup_quantized_margin: float = 0.03
+    vector_search_ef_search: int = 100
+    vector_search_overfetch_factor: int = 1
+    query_embedding_cache_size: int = 4096
+    query_embedding_cache_path: str | None = None
+    embedding_batch_window_ms: float = 3.0
+    embedding_batch_max_size: int = 64
+    embedding_queue_max_size: int = 1024
     ranking_freshness_weight: float = 0.4
     ranking_prominence_weight: float = 0.35
     ranking_authority_weight: float = 0.2
     ranking_engagement_weight: float = 0.05
     ranking_diversity_lambda: float = 0.3
+    mmr_embedding_dtype: Literal["float32", "float16"] = "float32"
     ranking_recency_half_life_hours: float = 48.0
+    ranking_engagement_window_hours: float | None = None
+    ranking_candidate_limit: int = 200
+    story_candidate_limit: int = 500
     top_story_min_sources: int = 3  # unused, kept for .env compatibility
     top_story_score_popularity_weight: float = 0.30
     top_story_score_coverage_weight: float = 0.50
     top_story_score_reputation_weight: float = 0.20
+    story_snapshot_enabled: bool = True
+    story_snapshot_max_age_seconds: int = 1800
+    feed_cache_max_entries: int = 2048
+    feed_cache_max_bytes: int = 64 * 1024 * 1024
+    feed_cache_ttl_seconds: float = 120.0
+    article_json_cache_size: int = 20_000
+    feed_cache_watermark_ttl_seconds: float = 5.0
     category_semantic_min_score: float = 0.15
     category_semantic_min_margin: float = 0.04
     cors_origins: str = "http://localhost:3000"
@@ -34,7 +58,23 @@ class Settings(BaseSettings):
 
     article_body_storage_mode: Literal["database", "dual", "r2_primary"] = "database"
     article_body_snippet_chars: int = 1000
+    article_body_codec: str = "identity"
+    article_body_dict_version: str | None = None
+    article_body_upload_concurrency: int = 16
+    embedding_store_dir: str | None = None
+    embedding_store_dtype: Literal["float32", "float16"] = "float32"
+    embedding_store_sync_overlap_seconds: float = 300.0
+    article_body_cache_max_bytes: int = 32 * 1024 * 1024
+    article_body_cache_dir: str | None = None
+    article_body_cache_disk_max_bytes: int = 512 * 1024 * 1024
+    article_body_cache_negative_ttl_seconds: float = 300.0
     scheduler_stale_refresh_limit: int = 1000
+    view_rollup_lag_seconds: int = 60
+    article_count_rebuild_interval_hours: float = 24.0
+    story_cluster_rebuild_interval_hours: float = 24.0
+    view_sink_batch_size: int = 500
+    view_sink_flush_interval_seconds: float = 2.0
+    view_sink_max_buffer: int = 50_000
 
     r2_account_id: str | None = None
     r2_access_key_id: str | None = None
@@ -1,17 +1,31 @@
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import math
 
 import numpy as np
-from sqlalchemy import func, select
+from sqlalchemy import Integer, Row, delete, func, literal, or_, select, text, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import defer
 
 from fundus_recommend.config import settings
-from fundus_recommend.models.db import Article, ArticleView, User, UserPreference
-from fundus_recommend.services.embeddings import embed_single
+from fundus_recommend.models.db import (
+    Article,
+    ArticleFilterCount,
+    ArticleView,
+    ArticleViewRollup,
+    PipelineWatermark,
+    StoryCluster,
+    StorySnapshot,
+    StorySnapshotItem,
+    User,
+    UserPreference,
+)
+from fundus_recommend.services.pagination import decode_cursor, encode_cursor
 from fundus_recommend.services.publisher_authority import authority_score, publisher_tier
-from fundus_recommend.services.ranking import RankingWeights, composite_scores
+from fundus_recommend.services.query_embeddings import embed_queries, embed_query
+from fundus_recommend.services.ranking import RankingWeights, composite_scores_from_arrays, epoch_seconds, mmr_rerank
+from fundus_recommend.services.watermarks import ARTICLE_COUNT_WATERMARK, VIEW_ROLLUP_WATERMARK
 
 
 @dataclass
@@ -22,14 +36,50 @@ class RankedStory:
     articles: list[Article]
 
 
+@dataclass(slots=True)
+class RankingCandidate:
+    """The columns ranking reads, without ORM instrumentation.
+
+    Ranking and story assembly score hundreds of candidates per request but
+    return a page of them; full ``Article`` rows are hydrated for that page only.
+    """
+
+    id: int
+    publisher: str
+    publishing_date: datetime | None
+    dedup_cluster_id: int | None
+    category: str | None
+
+
+_CANDIDATE_COLUMNS = (Article.id, Article.publisher, Article.publishing_date, Article.dedup_cluster_id, Article.category)
+
+
+def _candidates(rows) -> list[RankingCandidate]:
+    return [
+        RankingCandidate(row.id, row.publisher, row.publishing_date, row.dedup_cluster_id, row.category)
+        for row in rows
+    ]
+
+
 @dataclass
 class _EligibleStory:
     story_key: str
-    lead_article: Article
+    lead_article: Article | RankingCandidate
     source_count: int
     popularity_score: float
 
 
+async def _hydrate_articles(session: AsyncSession, article_ids: list[int]) -> list[Article]:
+    """Full ``Article`` rows (body and embedding deferred) for *article_ids*, in input order."""
+    if not article_ids:
+        return []
+    result = await session.execute(
+        select(Article).options(defer(Article.body), defer(Article.embedding)).where(Article.id.in_(article_ids))
+    )
+    by_id = {article.id: article for article in result.scalars().all()}
+    return [by_id[article_id] for article_id in article_ids if article_id in by_id]
+
+
 def _as_utc_timestamp(dt: datetime | None) -> float:
     if dt is None:
         return float("-inf")
@@ -55,21 +105,19 @@ def _dedupe_articles_by_id(articles: list[Article]) -> list[Article]:
     return deduped
 
 
-def _compute_popularity_scores(articles: list[Article], view_counts: dict[int, int]) -> np.ndarray:
-    dates = [a.publishing_date for a in articles]
-    views = [view_counts.get(a.id, 0) for a in articles]
-    cluster_ids = [a.dedup_cluster_id for a in articles]
+def _cluster_sizes(cluster_ids: list[int | None]) -> np.ndarray:
+    """How many candidates share each dedup_cluster_id (1 for unclustered)."""
+    codes = np.fromiter((-1 if cid is None else cid for cid in cluster_ids), dtype=np.int64, count=len(cluster_ids))
+    if codes.size == 0:
+        return np.zeros(0)
+    _unique, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+    sizes = counts[inverse].astype(np.float64)
+    sizes[codes == -1] = 1.0
+    return sizes
 
-    # Compute cluster sizes: how many articles share each dedup_cluster_id.
-    cluster_size_map: dict[int, int] = {}
-    for cid in cluster_ids:
-        if cid is not None:
-            cluster_size_map[cid] = cluster_size_map.get(cid, 0) + 1
-    cluster_sizes = [cluster_size_map.get(cid, 1) if cid is not None else 1 for cid in cluster_ids]
 
-    authorities = [authority_score(a.publisher) for a in articles]
-
-    weights = RankingWeights(
+def _ranking_weights() -> RankingWeights:
+    return RankingWeights(
         freshness=settings.ranking_freshness_weight,
         prominence=settings.ranking_prominence_weight,
         authority=settings.ranking_authority_weight,
@@ -78,7 +126,38 @@ def _compute_popularity_scores(articles: list[Article], view_counts: dict[int, i
         half_life_hours=settings.ranking_recency_half_life_hours,
     )
 
-    return composite_scores(dates, views, weights, cluster_sizes, authorities)
+
+def _compute_popularity_scores(
+    articles: list[Article] | list[RankingCandidate],
+    view_counts: dict[int, int],
+    now_ts: float | None = None,
+) -> np.ndarray:
+    n = len(articles)
+    publish_ts = epoch_seconds([a.publishing_date for a in articles])
+    views = np.fromiter((view_counts.get(a.id, 0) for a in articles), dtype=np.float64, count=n)
+    cluster_sizes = _cluster_sizes([a.dedup_cluster_id for a in articles])
+    authorities = np.fromiter((authority_score(a.publisher) for a in articles), dtype=np.float64, count=n)
+
+    return composite_scores_from_arrays(publish_ts, views, _ranking_weights(), cluster_sizes, authorities, now_ts=now_ts)
+
+
+async def _fetch_candidate_embeddings(session: AsyncSession, article_ids: list[int]) -> np.ndarray:
+    """Load embeddings for *article_ids* as one compact matrix in input order.
+
+    Only the candidate set is read, and rows are stored as
+    ``settings.mmr_embedding_dtype`` to keep the matrix small.
+    """
+    dtype = np.float16 if settings.mmr_embedding_dtype == "float16" else np.float32
+    matrix = np.zeros((len(article_ids), settings.embedding_dim), dtype=dtype)
+    if not article_ids:
+        return matrix
+
+    row_by_id = {article_id: row for row, article_id in enumerate(article_ids)}
+    result = await session.execute(select(Article.id, Article.embedding).where(Article.id.in_(article_ids)))
+    for article_id, embedding in result.all():
+        if embedding is not None:
+            matrix[row_by_id[article_id]] = np.asarray(embedding, dtype=np.float32)
+    return matrix
 
 
 def _coverage_score(source_count: int) -> float:
@@ -131,6 +210,23 @@ async def _fetch_cluster_articles(
     return story_articles_by_cluster
 
 
+async def _fetch_story_clusters(session: AsyncSession, cluster_ids: list[int]) -> dict[int, Row]:
+    """``story_clusters`` summaries (size, tier counts, lead id) keyed by cluster id."""
+    if not cluster_ids:
+        return {}
+
+    result = await session.execute(
+        select(
+            StoryCluster.cluster_id,
+            StoryCluster.size,
+            StoryCluster.tier_1_count,
+            StoryCluster.tier_2_count,
+            StoryCluster.lead_article_id,
+        ).where(StoryCluster.cluster_id.in_(cluster_ids))
+    )
+    return {row.cluster_id: row for row in result.all()}
+
+
 def _order_story_articles(lead_article: Article, story_articles: list[Article]) -> list[Article]:
     # Preserve lead article identity in the response, then order supporters by tier and recency.
     deduped = _dedupe_articles_by_id([lead_article, *story_articles])
@@ -158,7 +254,7 @@ def _story_quality_sort_key(
     story_key: str,
     final_score_by_story_key: dict[str, float],
     source_count_by_story_key: dict[str, int],
-    lead_by_story_key: dict[str, Article],
+    lead_by_story_key: dict[str, Article | RankingCandidate],
 ) -> tuple[float, int, float, int]:
     lead_article = lead_by_story_key[story_key]
     return (
@@ -171,14 +267,14 @@ def _story_quality_sort_key(
 
 async def _build_tier_anchored_story_ranking(
     session: AsyncSession,
-    candidate_articles: list[Article],
+    candidate_articles: list[Article] | list[RankingCandidate],
     popularity_score_by_article_id: dict[int, float],
     exclude_story_key: str | None = None,
-) -> tuple[list[str], dict[str, Article], dict[str, float]]:
+) -> tuple[list[str], dict[str, Article | RankingCandidate], dict[str, float]]:
     if not candidate_articles:
         return [], {}, {}
 
-    candidate_by_story_key: dict[str, list[Article]] = {}
+    candidate_by_story_key: dict[str, list[Article | RankingCandidate]] = {}
     cluster_ids: set[int] = set()
 
     for article in candidate_articles:
@@ -192,12 +288,34 @@ async def _build_tier_anchored_story_ranking(
     if not candidate_by_story_key:
         return [], {}, {}
 
-    story_articles_by_cluster = await _fetch_cluster_articles(session, sorted(cluster_ids))
-    all_eligible_stories: list[_EligibleStory] = []
+    # Size, tier mix and default lead come from story_clusters; only clusters
+    # missing from it (not yet refreshed by dedup) load their member articles.
+    summaries = await _fetch_story_clusters(session, sorted(cluster_ids))
+    story_articles_by_cluster = await _fetch_cluster_articles(session, sorted(cluster_ids - summaries.keys()))
 
+    # story_key -> (lead article or stored lead id, source count, candidates)
+    selections: list[tuple[str, Article | RankingCandidate | int, int, list]] = []
     for story_key, story_candidate_articles in candidate_by_story_key.items():
-        first_article = story_candidate_articles[0]
-        cluster_id = first_article.dedup_cluster_id
+        cluster_id = story_candidate_articles[0].dedup_cluster_id
+        summary = summaries.get(cluster_id) if cluster_id is not None else None
+
+        if summary is not None:
+            # Skip runaway transitive-chain clusters
+            if summary.size > 200:
+                continue
+            # Lead pool is the best tier present in the cluster.  Candidates
+            # outrank other members (they have a popularity score), so the
+            # stored lead only wins when no candidate is in that tier.
+            lead_tier = 1 if summary.tier_1_count else 2 if summary.tier_2_count else 3
+            lead_pool = [a for a in story_candidate_articles if publisher_tier(a.publisher) == lead_tier]
+            lead: Article | RankingCandidate | int = (
+                max(lead_pool, key=lambda article: _lead_priority_tuple(article, popularity_score_by_article_id))
+                if lead_pool
+                else summary.lead_article_id
+            )
+            selections.append((story_key, lead, summary.size, story_candidate_articles))
+            continue
+
         full_story_articles = (
             story_articles_by_cluster.get(cluster_id, story_candidate_articles)
             if cluster_id is not None
@@ -226,6 +344,19 @@ async def _build_tier_anchored_story_ranking(
             lead_pool,
             key=lambda article: _lead_priority_tuple(article, popularity_score_by_article_id),
         )
+        selections.append((story_key, lead_article, len(full_story_articles), story_candidate_articles))
+
+    stored_lead_ids = sorted({lead for _key, lead, _count, _candidates in selections if isinstance(lead, int)})
+    stored_leads: dict[int, RankingCandidate] = {}
+    if stored_lead_ids:
+        result = await session.execute(select(*_CANDIDATE_COLUMNS).where(Article.id.in_(stored_lead_ids)))
+        stored_leads = {candidate.id: candidate for candidate in _candidates(result.all())}
+
+    all_eligible_stories: list[_EligibleStory] = []
+    for story_key, lead, source_count, story_candidate_articles in selections:
+        lead_article = stored_leads.get(lead) if isinstance(lead, int) else lead
+        if lead_article is None:
+            continue
 
         lead_popularity_score = popularity_score_by_article_id.get(lead_article.id, float("-inf"))
         if lead_popularity_score == float("-inf"):
@@ -240,7 +371,7 @@ async def _build_tier_anchored_story_ranking(
             _EligibleStory(
                 story_key=story_key,
                 lead_article=lead_article,
-                source_count=len(full_story_articles),
+                source_count=source_count,
                 popularity_score=float(lead_popularity_score),
             )
         )
@@ -248,7 +379,7 @@ async def _build_tier_anchored_story_ranking(
     if not all_eligible_stories:
         return [], {}, {}
 
-    lead_by_story_key: dict[str, Article] = {}
+    lead_by_story_key: dict[str, Article | RankingCandidate] = {}
     source_count_by_story_key: dict[str, int] = {}
     final_score_by_story_key: dict[str, float] = {}
 
@@ -274,7 +405,7 @@ async def _build_tier_anchored_story_ranking(
 
 async def _expand_ranked_stories(
     session: AsyncSession,
-    lead_by_story_key: dict[str, Article],
+    lead_by_story_key: dict[str, Article | RankingCandidate],
     story_keys: list[str],
 ) -> list[RankedStory]:
     if not story_keys:
@@ -290,9 +421,25 @@ async def _expand_ranked_stories(
 
     story_articles_by_cluster = await _fetch_cluster_articles(session, page_cluster_ids)
 
+    # Leads chosen from ranking candidates are column projections; take their
+    # full row from the cluster fetch, or hydrate the rest in one query.
+    hydrated: dict[int, Article] = {
+        article.id: article for members in story_articles_by_cluster.values() for article in members
+    }
+    missing_lead_ids = [
+        lead.id
+        for lead in (lead_by_story_key[story_key] for story_key in story_keys)
+        if isinstance(lead, RankingCandidate) and lead.id not in hydrated
+    ]
+    hydrated.update((article.id, article) for article in await _hydrate_articles(session, missing_lead_ids))
+
     stories: list[RankedStory] = []
     for story_key in story_keys:
-        lead_article = lead_by_story_key[story_key]
+        lead = lead_by_story_key[story_key]
+        lead_article = hydrated.get(lead.id, lead)
+        if isinstance(lead_article, RankingCandidate):
+            # Deleted between ranking and hydration.
+            continue
         cluster_id = lead_article.dedup_cluster_id
 
         if cluster_id is None:
@@ -329,7 +476,11 @@ async def _rank_story_candidates(
     if not articles:
         return []
 
-    view_counts = await get_view_counts(session)
+    view_counts = await get_view_counts(
+        session,
+        [a.id for a in articles],
+        window_hours=settings.ranking_engagement_window_hours,
+    )
     scores = _compute_popularity_scores(articles, view_counts)
     popularity_score_by_article_id = {
         article.id: float(scores[idx]) for idx, article in enumerate(articles)
@@ -346,46 +497,155 @@ async def _rank_story_candidates(
     return [(story, final_score_by_story_key[story.story_id]) for story in stories]
 
 
-async def get_article_count(session: AsyncSession) -> int:
-    result = await session.execute(select(func.count(Article.id)))
-    return result.scalar_one()
-
-
-async def get_embedded_count(session: AsyncSession) -> int:
-    result = await session.execute(select(func.count(Article.id)).where(Article.embedding.is_not(None)))
-    return result.scalar_one()
+async def _estimated_article_count(session: AsyncSession, embedded_only: bool) -> int | None:
+    """Planner estimate of the articles row count, or None before the first ANALYZE."""
+    row = (
+        await session.execute(
+            text(
+                "SELECT c.reltuples, s.null_frac FROM pg_class c "
+                "LEFT JOIN pg_stats s ON s.schemaname = current_schema() "
+                "AND s.tablename = 'articles' AND s.attname = 'embedding' "
+                "WHERE c.oid = to_regclass('articles')"
+            )
+        )
+    ).one_or_none()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    reltuples, null_frac = float(row[0]), float(row[1] or 0.0)
+    return int(round(reltuples * (1.0 - null_frac) if embedded_only else reltuples))
 
 
-async def list_articles(
+async def count_articles(
     session: AsyncSession,
-    page: int = 1,
-    page_size: int = 20,
     publisher: str | None = None,
     language: str | None = None,
     topic: str | None = None,
     category: str | None = None,
-) -> tuple[list[Article], int]:
-    query = select(Article).options(defer(Article.body), defer(Article.embedding))
-    count_query = select(func.count(Article.id))
+    *,
+    embedded_only: bool = False,
+    exact: bool = False,
+) -> int:
+    """Article total for a filter combination.
+
+    Unfiltered and single-filter totals come from ``article_filter_counts``,
+    which the scheduler keeps current as of its last cycle.  Before the table
+    has been built, unfiltered totals fall back to ``pg_class.reltuples``.
+    Combined filters and *exact* run a real ``COUNT(*)``.
+    """
+    filters = [
+        (dimension, value)
+        for dimension, value in (("publisher", publisher), ("language", language), ("topic", topic), ("category", category))
+        if value
+    ]
+
+    if not exact and len(filters) <= 1:
+        dimension, value = filters[0] if filters else ("all", "")
+        column = ArticleFilterCount.embedded if embedded_only else ArticleFilterCount.total
+        stored = (
+            select(column)
+            .where(ArticleFilterCount.dimension == dimension, ArticleFilterCount.value == value)
+            .scalar_subquery()
+        )
+        row = (
+            await session.execute(
+                select(PipelineWatermark.value, stored).where(PipelineWatermark.name == ARTICLE_COUNT_WATERMARK)
+            )
+        ).one_or_none()
+        if row is not None:
+            return int(row[1] or 0)
+        if not filters:
+            estimate = await _estimated_article_count(session, embedded_only)
+            if estimate is not None:
+                return estimate
+
+    conditions = _article_filters(publisher, language, topic, category)
+    if embedded_only:
+        conditions.append(Article.embedding.is_not(None))
+    return (await session.execute(select(func.count(Article.id)).where(*conditions))).scalar_one()
+
+
+async def get_article_count(session: AsyncSession, exact: bool = False) -> int:
+    return await count_articles(session, exact=exact)
+
+
+async def get_embedded_count(session: AsyncSession, exact: bool = False) -> int:
+    return await count_articles(session, embedded_only=True, exact=exact)
+
 
+def _article_filters(
+    publisher: str | None = None,
+    language: str | None = None,
+    topic: str | None = None,
+    category: str | None = None,
+) -> list:
+    conditions = []
     if publisher:
-        query = query.where(Article.publisher == publisher)
-        count_query = count_query.where(Article.publisher == publisher)
+        conditions.append(Article.publisher == publisher)
     if language:
-        query = query.where(Article.language == language)
-        count_query = count_query.where(Article.language == language)
+        conditions.append(Article.language == language)
     if topic:
-        query = query.where(Article.topics.any(topic))
-        count_query = count_query.where(Article.topics.any(topic))
+        conditions.append(Article.topics.any(topic))
     if category:
-        query = query.where(Article.category == category)
-        count_query = count_query.where(Article.category == category)
+        conditions.append(Article.category == category)
+    return conditions
 
-    total = (await session.execute(count_query)).scalar_one()
 
-    query = query.order_by(Article.publishing_date.desc().nulls_last()).offset((page - 1) * page_size).limit(page_size)
-    result = await session.execute(query)
-    return list(result.scalars().all()), total
+async def list_articles(
+    session: AsyncSession,
+    page: int = 1,
+    page_size: int = 20,
+    publisher: str | None = None,
+    language: str | None = None,
+    topic: str | None = None,
+    category: str | None = None,
+    cursor: str | None = None,
+    include_total: bool = True,
+    exact: bool = False,
+) -> tuple[list[Article], int | None, str | None]:
+    """Most recent articles, newest first.
+
+    With *cursor* the page starts after the (publishing_date, id) it encodes,
+    so deep pages cost the same as the first one; otherwise *page* is used.
+    Returns ``(articles, total, next_cursor)``; *total* is ``None`` unless
+    *include_total*.
+    """
+    conditions = _article_filters(publisher, language, topic, category)
+    query = select(Article).options(defer(Article.body), defer(Article.embedding)).where(*conditions)
+
+    total = None
+    if include_total:
+        total = await count_articles(session, publisher, language, topic, category, exact=exact)
+
+    query = query.order_by(Article.publishing_date.desc().nulls_last(), Article.id.desc())
+    if cursor is not None:
+        after = decode_cursor(cursor, "recent")
+        after_id = int(after["id"])
+        if after.get("date") is None:
+            query = query.where(Article.publishing_date.is_(None), Article.id < after_id)
+        else:
+            after_date = datetime.fromisoformat(after["date"])
+            query = query.where(
+                or_(
+                    tuple_(Article.publishing_date, Article.id) < tuple_(after_date, after_id),
+                    Article.publishing_date.is_(None),
+                )
+            )
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    # One extra row tells us whether a next page exists without counting.
+    result = await session.execute(query.limit(page_size + 1))
+    articles = list(result.scalars().all())
+    next_cursor = None
+    if len(articles) > page_size:
+        articles = articles[:page_size]
+        last = articles[-1]
+        next_cursor = encode_cursor(
+            "recent",
+            date=last.publishing_date.isoformat() if last.publishing_date else None,
+            id=last.id,
+        )
+    return articles, total, next_cursor
 
 
 async def get_article_by_id(session: AsyncSession, article_id: int) -> Article | None:
@@ -393,19 +653,91 @@ async def get_article_by_id(session: AsyncSession, article_id: int) -> Article |
     return result.scalar_one_or_none()
 
 
-async def semantic_search(session: AsyncSession, query_text: str, limit: int = 10) -> list[tuple[Article, float]]:
-    query_vec = embed_single(query_text)
-    stmt = (
-        select(Article, Article.embedding.cosine_distance(query_vec.tolist()).label("distance"))
-        .where(Article.embedding.is_not(None))
-        .order_by("distance")
-        .limit(limit)
-    )
+async def get_articles_by_ids(session: AsyncSession, article_ids: list[int]) -> list[Article]:
+    """Articles for *article_ids* in one primary-key lookup, in request order; unknown ids are skipped."""
+    return await _hydrate_articles(session, article_ids)
+
+
+async def _nearest_articles(
+    session: AsyncSession,
+    query_vec: list[float] | np.ndarray,
+    limit: int,
+    exclude_id: int | None = None,
+) -> list[tuple[Article, float]]:
+    """Cosine nearest neighbours of *query_vec* via the HNSW index.
+
+    ``hnsw.ef_search`` is raised for this transaction only, to at least
+    ``vector_search_overfetch_factor`` times the number of rows requested.
+    The index scan already orders by the exact distance of every row it
+    visits, so a wider candidate list is what buys recall; re-sorting the
+    returned rows by the same distance would not change them.
+    """
+    if limit <= 0:
+        return []
+
+    fetch_limit = limit * max(1, settings.vector_search_overfetch_factor)
+    ef_search = max(settings.vector_search_ef_search, fetch_limit)
+    await session.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+
+    distance = Article.embedding.cosine_distance(query_vec)
+    conditions = [Article.embedding.is_not(None)]
+    if exclude_id is not None:
+        conditions.append(Article.id != exclude_id)
+    stmt = select(Article, distance.label("distance")).where(*conditions).order_by("distance").limit(limit)
+
     result = await session.execute(stmt)
     rows = result.all()
     return [(row[0], 1.0 - row[1]) for row in rows]
 
 
+async def _nearest_articles_multi(
+    session: AsyncSession,
+    query_vecs: list[np.ndarray],
+    limit: int,
+) -> list[list[tuple[Article, float]]]:
+    """Nearest neighbours for several query vectors in one statement.
+
+    Each vector gets its own ``ORDER BY distance LIMIT`` branch, so every
+    branch is an HNSW index scan; the branches are combined with UNION ALL
+    and joined to ``articles`` once.  Returns one result list per vector.
+    """
+    results: list[list[tuple[Article, float]]] = [[] for _ in query_vecs]
+    if not query_vecs or limit <= 0:
+        return results
+
+    ef_search = max(settings.vector_search_ef_search, limit)
+    await session.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+
+    branches = []
+    for query_idx, query_vec in enumerate(query_vecs):
+        distance = Article.embedding.cosine_distance(np.asarray(query_vec).tolist())
+        branches.append(
+            select(
+                literal(query_idx, Integer).label("query_idx"),
+                Article.id.label("article_id"),
+                distance.label("distance"),
+            )
+            .where(Article.embedding.is_not(None))
+            .order_by(distance)
+            .limit(limit)
+        )
+    nearest = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery("nearest")
+    stmt = (
+        select(nearest.c.query_idx, Article, nearest.c.distance)
+        .join(Article, Article.id == nearest.c.article_id)
+        .order_by(nearest.c.query_idx, nearest.c.distance)
+    )
+
+    for query_idx, article, distance in (await session.execute(stmt)).all():
+        results[query_idx].append((article, 1.0 - distance))
+    return results
+
+
+async def semantic_search(session: AsyncSession, query_text: str, limit: int = 10) -> list[tuple[Article, float]]:
+    query_vec = await embed_query(query_text)
+    return await _nearest_articles(session, query_vec.tolist(), limit)
+
+
 async def recommend_by_topic(session: AsyncSession, topic: str, limit: int = 10) -> list[tuple[Article, float]]:
     return await semantic_search(session, topic, limit)
 
@@ -414,15 +746,7 @@ async def recommend_similar(session: AsyncSession, article_id: int, limit: int =
     article = await get_article_by_id(session, article_id)
     if article is None or article.embedding is None:
         return []
-    stmt = (
-        select(Article, Article.embedding.cosine_distance(article.embedding).label("distance"))
-        .where(Article.embedding.is_not(None), Article.id != article_id)
-        .order_by("distance")
-        .limit(limit)
-    )
-    result = await session.execute(stmt)
-    rows = result.all()
-    return [(row[0], 1.0 - row[1]) for row in rows]
+    return await _nearest_articles(session, article.embedding, limit, exclude_id=article_id)
 
 
 async def recommend_stories_by_topic(
@@ -456,6 +780,27 @@ async def recommend_stories_similar(
     )
 
 
+async def _preference_candidates(
+    session: AsyncSession,
+    preferences: list[UserPreference],
+    limit_per_topic: int,
+) -> list[list[tuple[Article, float]]]:
+    """Retrieve candidates for all preference topics in one query.
+
+    Vectors stored by ``set_user_preferences`` are used as-is; only topics
+    without a vector for the current model are embedded, in one batch.
+    """
+    query_vecs: list[np.ndarray | None] = [
+        pref.embedding if pref.embedding is not None and pref.embedding_model == settings.embedding_model else None
+        for pref in preferences
+    ]
+    stale = [idx for idx, vec in enumerate(query_vecs) if vec is None]
+    if stale:
+        for idx, vec in zip(stale, await embed_queries([preferences[idx].topic for idx in stale])):
+            query_vecs[idx] = vec
+    return await _nearest_articles_multi(session, query_vecs, limit_per_topic)
+
+
 async def get_personalized_feed(session: AsyncSession, user_id: str, limit: int = 20) -> list[tuple[Article, float]]:
     result = await session.execute(select(UserPreference).where(UserPreference.user_id == user_id))
     preferences = list(result.scalars().all())
@@ -463,8 +808,7 @@ async def get_personalized_feed(session: AsyncSession, user_id: str, limit: int
         return []
 
     scored: dict[int, tuple[Article, float]] = {}
-    for pref in preferences:
-        results = await semantic_search(session, pref.topic, limit=limit)
+    for pref, results in zip(preferences, await _preference_candidates(session, preferences, limit)):
         for article, score in results:
             weighted = score * pref.weight
             if article.id not in scored or scored[article.id][1] < weighted:
@@ -486,8 +830,7 @@ async def get_personalized_story_feed(
         return []
 
     candidate_articles_by_id: dict[int, Article] = {}
-    for pref in preferences:
-        candidates = await semantic_search(session, pref.topic, candidate_limit_per_topic)
+    for candidates in await _preference_candidates(session, preferences, candidate_limit_per_topic):
         for article, _score in candidates:
             if article.id not in candidate_articles_by_id:
                 candidate_articles_by_id[article.id] = article
@@ -502,26 +845,58 @@ async def get_personalized_story_feed(
 async def set_user_preferences(
     session: AsyncSession, user_id: str, preferences: list[tuple[str, float]]
 ) -> list[UserPreference]:
-    # Ensure user exists
-    user = (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-    if user is None:
-        user = User(id=user_id)
-        session.add(user)
-
-    # Delete existing preferences
-    existing = (await session.execute(select(UserPreference).where(UserPreference.user_id == user_id))).scalars().all()
-    for p in existing:
-        await session.delete(p)
-
-    # Insert new preferences
-    new_prefs = []
-    for topic, weight in preferences:
-        pref = UserPreference(user_id=user_id, topic=topic, weight=weight)
-        session.add(pref)
-        new_prefs.append(pref)
+    """Replace a user's preferences with one statement.
+
+    Topic vectors are computed here, once, and stored with the model name so
+    feed requests never have to re-encode them.  The user row (with its
+    ``profile_updated_at``), removal of dropped topics and the upsert of the
+    remaining ones run as a single CTE statement.
+    """
+    weight_by_topic = dict(preferences)  # a repeated topic keeps its last weight
+    topics = list(weight_by_topic)
+    weights = [weight_by_topic[topic] for topic in topics]
+    vectors = await embed_queries(topics) if topics else []
+    model = settings.embedding_model
+
+    user_stmt = pg_insert(User).values(id=user_id, profile_updated_at=func.now())
+    user_cte = user_stmt.on_conflict_do_update(
+        index_elements=[User.id],
+        set_={"profile_updated_at": user_stmt.excluded.profile_updated_at},
+    ).returning(User.id).cte("upsert_user")
+    removed_cte = (
+        delete(UserPreference)
+        .where(UserPreference.user_id == user_id, UserPreference.topic.not_in(topics))
+        .returning(UserPreference.id)
+        .cte("removed_preferences")
+    )
 
+    rows = [
+        {
+            "user_id": user_id,
+            "topic": topic,
+            "weight": weight,
+            "embedding": np.asarray(vector).tolist(),
+            "embedding_model": model,
+        }
+        for topic, weight, vector in zip(topics, weights, vectors)
+    ]
+    if rows:
+        pref_stmt = pg_insert(UserPreference).values(rows)
+        stmt = pref_stmt.on_conflict_do_update(
+            constraint="uq_user_topic",
+            set_={
+                "weight": pref_stmt.excluded.weight,
+                "embedding": pref_stmt.excluded.embedding,
+                "embedding_model": pref_stmt.excluded.embedding_model,
+            },
+        )
+    else:
+        # No preferences left: still upsert the user and clear old topics.
+        stmt = select(func.count()).select_from(user_cte)
+    await session.execute(stmt.add_cte(user_cte, removed_cte))
     await session.commit()
-    return new_prefs
+
+    return [UserPreference(**row) for row in rows]
 
 
 async def get_user_preferences(session: AsyncSession, user_id: str) -> list[UserPreference]:
@@ -529,17 +904,59 @@ async def get_user_preferences(session: AsyncSession, user_id: str) -> list[User
     return list(result.scalars().all())
 
 
-async def record_article_view(session: AsyncSession, article_id: int, session_id: str) -> None:
-    view = ArticleView(article_id=article_id, session_id=session_id)
-    session.add(view)
-    await session.commit()
+async def get_view_counts(
+    session: AsyncSession,
+    article_ids: list[int] | None = None,
+    window_hours: float | None = None,
+) -> dict[int, int]:
+    """Return view counts for *article_ids* (all articles when ``None``).
+
+    Counts come from the hourly ``article_view_rollups`` plus the raw views
+    since the rollup watermark, so the cost tracks the candidate set rather
+    than total traffic history.  With *window_hours* only recent views are
+    counted; rollup buckets are hour-aligned, so the window is rounded out
+    to the start of the hour.
+    """
+    if article_ids is not None and not article_ids:
+        return {}
+
+    watermark = (
+        select(func.coalesce(func.max(PipelineWatermark.value), 0))
+        .where(PipelineWatermark.name == VIEW_ROLLUP_WATERMARK)
+        .scalar_subquery()
+    )
+    # Buckets past the watermark (left by an older id-based rollup) would
+    # double-count views that the tail already covers.
+    rolled = (
+        select(
+            ArticleViewRollup.article_id.label("article_id"),
+            func.sum(ArticleViewRollup.view_count).label("view_count"),
+        )
+        .where(ArticleViewRollup.bucket_start < func.to_timestamp(watermark))
+        .group_by(ArticleViewRollup.article_id)
+    )
+    tail = (
+        select(
+            ArticleView.article_id.label("article_id"),
+            func.count(ArticleView.id).label("view_count"),
+        )
+        .where(ArticleView.viewed_at >= func.to_timestamp(watermark))
+        .group_by(ArticleView.article_id)
+    )
 
+    if article_ids is not None:
+        rolled = rolled.where(ArticleViewRollup.article_id.in_(article_ids))
+        tail = tail.where(ArticleView.article_id.in_(article_ids))
+    if window_hours is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+        rolled = rolled.where(ArticleViewRollup.bucket_start >= func.date_trunc("hour", cutoff))
+        tail = tail.where(ArticleView.viewed_at >= cutoff)
 
-async def get_view_counts(session: AsyncSession) -> dict[int, int]:
+    combined = union_all(rolled, tail).subquery()
     result = await session.execute(
-        select(ArticleView.article_id, func.count(ArticleView.id)).group_by(ArticleView.article_id)
+        select(combined.c.article_id, func.sum(combined.c.view_count)).group_by(combined.c.article_id)
     )
-    return dict(result.all())
+    return {int(article_id): int(count) for article_id, count in result.all()}
 
 
 async def get_ranked_articles(
@@ -550,69 +967,93 @@ async def get_ranked_articles(
     language: str | None = None,
     topic: str | None = None,
     category: str | None = None,
-    candidate_limit: int = 200,
-) -> tuple[list[Article], int]:
-    query = select(Article).options(defer(Article.body), defer(Article.embedding)).where(Article.embedding.is_not(None))
-    count_query = select(func.count(Article.id)).where(Article.embedding.is_not(None))
+    candidate_limit: int | None = None,
+    diversify: bool = False,
+    cursor: str | None = None,
+    include_total: bool = True,
+    exact: bool = False,
+) -> tuple[list[Article], int | None, str | None]:
+    """Composite-ranked articles, best first.
+
+    A ranked cursor pins the scoring time and records the (score, id) of the
+    last article served, so following pages continue the same ordering even
+    as freshness decays.  Diversified pages are sequence-dependent and only
+    support *page*.  Returns ``(articles, total, next_cursor)``.
+    """
+    conditions = [Article.embedding.is_not(None), *_article_filters(publisher, language, topic, category)]
+    query = select(*_CANDIDATE_COLUMNS).where(*conditions)
 
-    if publisher:
-        query = query.where(Article.publisher == publisher)
-        count_query = count_query.where(Article.publisher == publisher)
-    if language:
-        query = query.where(Article.language == language)
-        count_query = count_query.where(Article.language == language)
-    if topic:
-        query = query.where(Article.topics.any(topic))
-        count_query = count_query.where(Article.topics.any(topic))
-    if category:
-        query = query.where(Article.category == category)
-        count_query = count_query.where(Article.category == category)
+    total = None
+    if include_total:
+        total = await count_articles(session, publisher, language, topic, category, embedded_only=True, exact=exact)
 
-    total = (await session.execute(count_query)).scalar_one()
+    after = decode_cursor(cursor, "ranked") if cursor is not None and not diversify else None
+    now_ts = float(after["now"]) if after else datetime.now(timezone.utc).timestamp()
 
     # Fetch only the most recent candidates — freshness-weighted ranking makes
     # older articles score near-zero anyway (48h half-life), so loading all rows
     # wastes bandwidth, especially with a remote database.
+    if candidate_limit is None:
+        candidate_limit = settings.ranking_candidate_limit
     query = query.order_by(Article.publishing_date.desc().nulls_last()).limit(candidate_limit)
     result = await session.execute(query)
-    articles = list(result.scalars().all())
+    articles = _candidates(result.all())
 
     if not articles:
-        return [], total
-
-    view_counts = await get_view_counts(session)
+        return [], total, None
 
-    dates = [a.publishing_date for a in articles]
-    views = [view_counts.get(a.id, 0) for a in articles]
-    cluster_ids = [a.dedup_cluster_id for a in articles]
-
-    # Compute cluster sizes: how many articles share each dedup_cluster_id
-    cluster_size_map: dict[int, int] = {}
-    for cid in cluster_ids:
-        if cid is not None:
-            cluster_size_map[cid] = cluster_size_map.get(cid, 0) + 1
-    cluster_sizes = [cluster_size_map.get(cid, 1) if cid is not None else 1 for cid in cluster_ids]
-
-    authorities = [authority_score(a.publisher) for a in articles]
-
-    weights = RankingWeights(
-        freshness=settings.ranking_freshness_weight,
-        prominence=settings.ranking_prominence_weight,
-        authority=settings.ranking_authority_weight,
-        engagement=settings.ranking_engagement_weight,
-        diversity_lambda=settings.ranking_diversity_lambda,
-        half_life_hours=settings.ranking_recency_half_life_hours,
+    view_counts = await get_view_counts(
+        session,
+        [a.id for a in articles],
+        window_hours=settings.ranking_engagement_window_hours,
     )
+    scores = _compute_popularity_scores(articles, view_counts, now_ts=now_ts)
 
-    scores = composite_scores(dates, views, weights, cluster_sizes, authorities)
-
-    # Score-based ranking (avoids loading embeddings over the network for MMR)
     offset = (page - 1) * page_size
-    ranked_indices = np.argsort(-scores).tolist()
-    page_indices = ranked_indices[offset : offset + page_size]
-
-    ranked_articles = [articles[i] for i in page_indices]
-    return ranked_articles, total
+    if diversify:
+        if offset >= len(scores):
+            return [], total, None
+        # Opt-in MMR: embeddings are loaded for this candidate set only.
+        embeddings = await _fetch_candidate_embeddings(session, [a.id for a in articles])
+        page_indices = mmr_rerank(
+            scores,
+            embeddings,
+            page_size,
+            offset=offset,
+            lam=settings.ranking_diversity_lambda,
+            cluster_ids=[a.dedup_cluster_id for a in articles],
+        )
+        return await _hydrate_articles(session, [articles[i].id for i in page_indices]), total, None
+
+    # Score-based ranking (avoids loading embeddings over the network for MMR),
+    # ordered by (score desc, id desc) so a cursor identifies a unique position.
+    ids = np.fromiter((a.id for a in articles), dtype=np.int64, count=len(articles))
+    eligible = np.arange(len(scores))
+    if after is not None:
+        after_score, after_id = float(after["score"]), int(after["id"])
+        eligible = np.flatnonzero((scores < after_score) | ((scores == after_score) & (ids < after_id)))
+        offset = 0
+
+    # Only the requested window (plus one row to detect a next page) needs a
+    # full sort, so partition first.
+    window = min(offset + page_size + 1, len(eligible))
+    if offset >= window:
+        return [], total, None
+    if window < len(eligible):
+        eligible_scores = scores[eligible]
+        boundary = eligible_scores[np.argpartition(-eligible_scores, window - 1)[window - 1]]
+        # argpartition splits ties at the boundary arbitrarily; keep every tied
+        # row so the id tie-break below decides which of them fall in the window.
+        eligible = eligible[eligible_scores >= boundary]
+    ranked_indices = eligible[np.lexsort((-ids[eligible], -scores[eligible]))][:window]
+    page_indices = ranked_indices[offset : offset + page_size].tolist()
+
+    next_cursor = None
+    if len(ranked_indices) > offset + page_size:
+        last = page_indices[-1]
+        next_cursor = encode_cursor("ranked", now=now_ts, score=float(scores[last]), id=int(ids[last]))
+    page_articles = await _hydrate_articles(session, [articles[i].id for i in page_indices])
+    return page_articles, total, next_cursor
 
 
 async def _fetch_top_cluster_articles(
@@ -623,67 +1064,143 @@ async def _fetch_top_cluster_articles(
     publisher: str | None = None,
     language: str | None = None,
     category: str | None = None,
-) -> list[Article]:
-    """Fetch one representative article per large cluster so big stories
+) -> list[RankingCandidate]:
+    """Fetch the lead article of each of the largest clusters so big stories
     always appear in the candidate set regardless of recency.
 
-    Clusters larger than *max_cluster_size* are excluded — they are
-    almost certainly runaway transitive-chain artefacts, not real stories.
+    Reads ``story_clusters``: sizes are whole-cluster sizes, and a filter
+    keeps clusters with at least one member matching it.  Clusters larger
+    than *max_cluster_size* are excluded — they are almost certainly
+    runaway transitive-chain artefacts, not real stories.
     """
-    size_query = (
-        select(
-            Article.dedup_cluster_id,
-            func.count(Article.id).label("cluster_size"),
-        )
-        .where(Article.embedding.is_not(None), Article.dedup_cluster_id.is_not(None))
+    top_clusters = select(StoryCluster.lead_article_id).where(
+        StoryCluster.size >= min_cluster_size,
+        StoryCluster.size <= max_cluster_size,
     )
     if publisher:
-        size_query = size_query.where(Article.publisher == publisher)
+        top_clusters = top_clusters.where(StoryCluster.publishers.contains([publisher]))
     if language:
-        size_query = size_query.where(Article.language == language)
+        top_clusters = top_clusters.where(StoryCluster.languages.contains([language]))
     if category:
-        size_query = size_query.where(Article.category == category)
-
-    size_query = (
-        size_query
-        .group_by(Article.dedup_cluster_id)
-        .having(
-            func.count(Article.id) >= min_cluster_size,
-            func.count(Article.id) <= max_cluster_size,
-        )
-        .order_by(func.count(Article.id).desc())
-        .limit(cluster_limit)
-    )
-    cluster_rows = await session.execute(size_query)
-    top_cluster_ids = [row[0] for row in cluster_rows.all()]
+        top_clusters = top_clusters.where(StoryCluster.categories.contains([category]))
+    top_clusters = top_clusters.order_by(StoryCluster.size.desc(), StoryCluster.cluster_id).limit(cluster_limit)
 
-    if not top_cluster_ids:
-        return []
+    result = await session.execute(select(*_CANDIDATE_COLUMNS).where(Article.id.in_(top_clusters.scalar_subquery())))
+    return _candidates(result.all())
 
-    # Fetch one article per cluster (the most recent) as a representative
-    from sqlalchemy import distinct
-    repr_query = (
-        select(Article)
-        .options(defer(Article.body), defer(Article.embedding))
-        .where(Article.dedup_cluster_id.in_(top_cluster_ids))
-        .distinct(Article.dedup_cluster_id)
-        .order_by(Article.dedup_cluster_id, Article.publishing_date.desc().nulls_last())
-    )
-    result = await session.execute(repr_query)
-    return list(result.scalars().all())
 
+def story_snapshot_key(
+    publisher: str | None = None,
+    language: str | None = None,
+    topic: str | None = None,
+    category: str | None = None,
+) -> str | None:
+    """Return the snapshot key for a story filter combination.
 
-async def get_ranked_stories(
+    Only the default feed and single language / category filters are
+    materialized by the scheduler; every other combination ranks live.
+    """
+    if publisher or topic or (language and category):
+        return None
+    if language:
+        return f"language:{language}"
+    if category:
+        return f"category:{category}"
+    return "all"
+
+
+async def get_story_snapshot_page(
     session: AsyncSession,
+    filter_key: str,
     page: int = 1,
     page_size: int = 15,
+    after: dict | None = None,
+) -> tuple[list[RankedStory], int, str | None] | None:
+    """Serve a page of stories from the latest materialized snapshot.
+
+    *after* is a decoded story cursor.  Within the same snapshot version the
+    page continues after the cursor's position; once a newer version has been
+    published it continues after the cursor's story in that version (or the
+    same position if the story dropped out), so infinite scroll survives a
+    scheduler cycle.
+
+    Returns ``None`` when no snapshot exists for *filter_key* or the latest
+    one is older than ``story_snapshot_max_age_seconds``.
+    """
+    snapshot = (
+        await session.execute(select(StorySnapshot).where(StorySnapshot.filter_key == filter_key))
+    ).scalar_one_or_none()
+    if snapshot is None:
+        return None
+
+    max_age = timedelta(seconds=settings.story_snapshot_max_age_seconds)
+    generated_at = snapshot.generated_at
+    if generated_at is not None and generated_at.tzinfo is None:
+        generated_at = generated_at.replace(tzinfo=timezone.utc)
+    if generated_at is None or datetime.now(timezone.utc) - generated_at > max_age:
+        return None
+
+    if after is None:
+        position_filter = StorySnapshotItem.position >= (page - 1) * page_size
+    elif after.get("v") == snapshot.version:
+        position_filter = StorySnapshotItem.position > int(after["pos"])
+    else:
+        moved_to = (
+            select(StorySnapshotItem.position)
+            .where(
+                StorySnapshotItem.filter_key == filter_key,
+                StorySnapshotItem.version == snapshot.version,
+                StorySnapshotItem.story_key == after["key"],
+            )
+            .scalar_subquery()
+        )
+        position_filter = StorySnapshotItem.position > func.coalesce(moved_to, int(after["pos"]))
+
+    result = await session.execute(
+        select(StorySnapshotItem.story_key, Article, StorySnapshotItem.position)
+        .join(Article, Article.id == StorySnapshotItem.lead_article_id)
+        .options(defer(Article.body), defer(Article.embedding))
+        .where(
+            StorySnapshotItem.filter_key == filter_key,
+            StorySnapshotItem.version == snapshot.version,
+            position_filter,
+        )
+        .order_by(StorySnapshotItem.position)
+        .limit(page_size + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        story_key, _lead, position = rows[-1]
+        next_cursor = encode_cursor("stories", v=snapshot.version, pos=position, key=story_key)
+
+    lead_by_story_key: dict[str, Article] = {}
+    page_story_keys: list[str] = []
+    for story_key, lead_article, _position in rows:
+        lead_by_story_key[story_key] = lead_article
+        page_story_keys.append(story_key)
+
+    stories = await _expand_ranked_stories(session, lead_by_story_key, page_story_keys)
+    return stories, snapshot.total, next_cursor
+
+
+async def rank_story_feed(
+    session: AsyncSession,
     publisher: str | None = None,
     language: str | None = None,
     topic: str | None = None,
     category: str | None = None,
-    candidate_limit: int = 500,
-) -> tuple[list[RankedStory], int]:
-    base_filter = select(Article).options(defer(Article.body), defer(Article.embedding)).where(Article.embedding.is_not(None))
+    candidate_limit: int | None = None,
+) -> tuple[list[str], dict[str, RankingCandidate], dict[str, float]]:
+    """Rank every eligible story for a filter combination.
+
+    Returns the ordered story keys together with each story's lead (as a
+    :class:`RankingCandidate`) and final score.  Used by the live
+    ``/stories`` path and by the scheduler when materializing snapshots.
+    """
+    base_filter = select(*_CANDIDATE_COLUMNS).where(Article.embedding.is_not(None))
 
     if publisher:
         base_filter = base_filter.where(Article.publisher == publisher)
@@ -695,9 +1212,11 @@ async def get_ranked_stories(
         base_filter = base_filter.where(Article.category == category)
 
     # Pass 1: most recent articles (standalone + small clusters)
+    if candidate_limit is None:
+        candidate_limit = settings.story_candidate_limit
     recency_query = base_filter.order_by(Article.publishing_date.desc().nulls_last()).limit(candidate_limit)
     result = await session.execute(recency_query)
-    articles = list(result.scalars().all())
+    articles = _candidates(result.all())
 
     # Pass 2: ensure large clusters are represented even if not recent
     cluster_reps = await _fetch_top_cluster_articles(
@@ -707,15 +1226,19 @@ async def get_ranked_stories(
     articles.extend(cluster_reps)
 
     if not articles:
-        return [], 0
+        return [], {}, {}
 
     articles = _dedupe_articles_by_id(articles)
-    view_counts = await get_view_counts(session)
+    view_counts = await get_view_counts(
+        session,
+        [a.id for a in articles],
+        window_hours=settings.ranking_engagement_window_hours,
+    )
     scores = _compute_popularity_scores(articles, view_counts)
     popularity_score_by_article_id = {
         article.id: float(scores[idx]) for idx, article in enumerate(articles)
     }
-    ordered_story_keys, lead_by_story_key, _final_score_by_story_key = await _build_tier_anchored_story_ranking(
+    ordered_story_keys, lead_by_story_key, final_score_by_story_key = await _build_tier_anchored_story_ranking(
         session,
         articles,
         popularity_score_by_article_id,
@@ -729,12 +1252,74 @@ async def get_ranked_stories(
             if getattr(lead_by_story_key[sk], "category", None) == category
         ]
 
+    return ordered_story_keys, lead_by_story_key, final_score_by_story_key
+
+
+async def get_ranked_stories(
+    session: AsyncSession,
+    page: int = 1,
+    page_size: int = 15,
+    publisher: str | None = None,
+    language: str | None = None,
+    topic: str | None = None,
+    category: str | None = None,
+    candidate_limit: int | None = None,
+    diversify: bool = False,
+    cursor: str | None = None,
+) -> tuple[list[RankedStory], int, str | None]:
+    """Ranked stories for a filter combination.
+
+    Returns ``(stories, total, next_cursor)``.  The total is free here: it
+    comes from the snapshot header or from the live ranking itself.
+    """
+    after = decode_cursor(cursor, "stories") if cursor is not None and not diversify else None
+    filter_key = story_snapshot_key(publisher, language, topic, category)
+    if settings.story_snapshot_enabled and filter_key is not None and not diversify:
+        snapshot_page = await get_story_snapshot_page(session, filter_key, page, page_size, after=after)
+        if snapshot_page is not None:
+            return snapshot_page
+
+    ordered_story_keys, lead_by_story_key, final_score_by_story_key = await rank_story_feed(
+        session,
+        publisher=publisher,
+        language=language,
+        topic=topic,
+        category=category,
+        candidate_limit=candidate_limit,
+    )
+
     total_stories = len(ordered_story_keys)
-    offset = (page - 1) * page_size
-    page_story_keys = ordered_story_keys[offset : offset + page_size]
+    if after is not None:
+        # Live rankings are recomputed per request; continue after the
+        # cursor's story, or at its old position if it dropped out.
+        offset = int(after["pos"]) + 1
+        if after["key"] in lead_by_story_key:
+            offset = ordered_story_keys.index(after["key"]) + 1
+    else:
+        offset = (page - 1) * page_size
+    if diversify and offset < total_stories:
+        # Each story is already one dedup cluster, so only lead articles are compared.
+        embeddings = await _fetch_candidate_embeddings(
+            session, [lead_by_story_key[key].id for key in ordered_story_keys]
+        )
+        story_scores = np.array([final_score_by_story_key[key] for key in ordered_story_keys], dtype=np.float64)
+        page_indices = mmr_rerank(
+            story_scores,
+            embeddings,
+            page_size,
+            offset=offset,
+            lam=settings.ranking_diversity_lambda,
+        )
+        page_story_keys = [ordered_story_keys[i] for i in page_indices]
+    else:
+        page_story_keys = ordered_story_keys[offset : offset + page_size]
 
     if not page_story_keys:
-        return [], total_stories
+        return [], total_stories, None
+
+    next_cursor = None
+    if not diversify and offset + page_size < total_stories:
+        next_cursor = encode_cursor("stories", v=None, pos=offset + page_size - 1, key=page_story_keys[-1])
 
     stories = await _expand_ranked_stories(session, lead_by_story_key, page_story_keys)
-    return stories, total_stories
+    return stories, total_stories, next_cursor
@@ -25,7 +25,7 @@ from fundus_recommend.ingest.types import (
     PublisherRunDiagnostics,
 )
 from fundus_recommend.models.db import Article, CrawlRun, CrawlRunPublisher
-from fundus_recommend.services.article_body_store import BodyStoreError, build_body_key, put_body
+from fundus_recommend.services.article_body_store import build_body_key, put_body, upload_bodies
 
 
 def _adapter_for(adapter: AdapterType):
@@ -69,6 +69,8 @@ def _insert_candidates(candidates: list[CrawlArticleCandidate]) -> list[int]:
     inserted_ids: list[int] = []
     storage_mode = settings.article_body_storage_mode
     snippet_chars = max(1, settings.article_body_snippet_chars)
+    # (row, id, body key, candidate) for rows whose body goes to R2 after insert.
+    pending_uploads: list[tuple[Article, int, str, CrawlArticleCandidate]] = []
 
     with SyncSessionLocal() as session:
         for candidate in candidates:
@@ -96,26 +98,37 @@ def _insert_candidates(candidates: list[CrawlArticleCandidate]) -> list[int]:
                 session.rollback()
                 continue
 
-            if storage_mode in {"dual", "r2_primary"}:
-                body_key = build_body_key(int(db_article.id), candidate.url)
-                try:
-                    put_body(body_key, candidate.body)
-                    db_article.body_storage_key = body_key
-                    db_article.body_storage_provider = "r2"
-                    if storage_mode == "r2_primary":
-                        db_article.body = None
-                except BodyStoreError as exc:
-                    click.echo(
-                        f"[warn] r2 body upload failed article_id={db_article.id} "
-                        f"publisher={candidate.publisher} error={exc}"
-                    )
-
+            article_id = int(db_article.id)
             try:
                 session.commit()
             except IntegrityError:
                 session.rollback()
                 continue
-            inserted_ids.append(db_article.id)
+            inserted_ids.append(article_id)
+            if storage_mode in {"dual", "r2_primary"}:
+                pending_uploads.append((db_article, article_id, build_body_key(article_id, candidate.url), candidate))
+
+        if not pending_uploads:
+            return inserted_ids
+
+        # Upload the whole batch concurrently, then record keys in one commit;
+        # rows whose upload failed keep their PostgreSQL body.
+        results = upload_bodies(put_body, [(key, candidate.body) for _row, _id, key, candidate in pending_uploads])
+        uploaded = 0
+        for (db_article, article_id, body_key, candidate), error in zip(pending_uploads, results):
+            if error is not None:
+                click.echo(
+                    f"[warn] r2 body upload failed article_id={article_id} "
+                    f"publisher={candidate.publisher} error={error}"
+                )
+                continue
+            db_article.body_storage_key = body_key
+            db_article.body_storage_provider = "r2"
+            if storage_mode == "r2_primary":
+                db_article.body = None
+            uploaded += 1
+        if uploaded:
+            session.commit()
 
     return inserted_ids
 
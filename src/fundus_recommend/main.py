@@ -1,17 +1,74 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fundus_recommend.api import articles, preferences, recommendations, search
+from fundus_recommend.api.conditional import conditional_get, conditional_stats
 from fundus_recommend.config import settings
 from fundus_recommend.db.queries import get_article_count, get_embedded_count
-from fundus_recommend.db.session import get_async_session
+from fundus_recommend.db.session import AsyncSessionLocal, get_async_session
 from fundus_recommend.models.schemas import HealthResponse
+from fundus_recommend.services.body_cache import article_body_cache
+from fundus_recommend.services.embedding_batcher import embedding_batcher
+from fundus_recommend.services.query_embeddings import (
+    DEFAULT_QUERY_TOPICS,
+    preference_topics,
+    query_embedding_cache,
+)
+from fundus_recommend.services.result_cache import feed_result_cache
+from fundus_recommend.services.serialization import article_json_cache
+from fundus_recommend.services.view_sink import get_view_sink
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_query_embeddings() -> int:
+    """Pre-encode default and user-preference topics so first requests hit the cache."""
+    await asyncio.to_thread(query_embedding_cache.load)
+    topics = list(DEFAULT_QUERY_TOPICS)
+    try:
+        async with AsyncSessionLocal() as session:
+            topics.extend(await preference_topics(session))
+    except Exception as exc:
+        logger.warning("query_embedding_warm_topics_failed error=%s", exc)
+    return await asyncio.to_thread(query_embedding_cache.warm, topics)
+
 
-app = FastAPI(title="Fundus Recommend", version="0.1.0", description="News recommendation engine powered by Fundus")
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    view_sink = get_view_sink()
+    view_sink.start()
+    try:
+        await warm_query_embeddings()
+    except Exception as exc:
+        logger.warning("query_embedding_warm_failed error=%s", exc)
+    try:
+        yield
+    finally:
+        # Drain buffered view events before the process exits.
+        await view_sink.stop()
+        await embedding_batcher.stop()
+        await asyncio.to_thread(query_embedding_cache.save)
+
+
+app = FastAPI(
+    title="Fundus Recommend",
+    version="0.1.0",
+    description="News recommendation engine powered by Fundus",
+    lifespan=lifespan,
+)
 
 cors_origins = [o.strip() for o in settings.cors_origins.split(",")]
 
+# Registered before CORS so 304 responses still pass through CORSMiddleware.
+app.middleware("http")(conditional_get)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -28,9 +85,23 @@ app.include_router(preferences.router)
 
 
 @app.get("/health", response_model=HealthResponse, tags=["health"])
-async def health(session: AsyncSession = Depends(get_async_session)):
+async def health(exact: bool = False, session: AsyncSession = Depends(get_async_session)):
     return HealthResponse(
         status="ok",
-        article_count=await get_article_count(session),
-        embedded_count=await get_embedded_count(session),
+        article_count=await get_article_count(session, exact=exact),
+        embedded_count=await get_embedded_count(session, exact=exact),
     )
+
+
+@app.get("/metrics", tags=["health"])
+async def metrics() -> dict[str, dict[str, float]]:
+    """In-process cache and buffer counters for this API worker."""
+    return {
+        "article_bodies": article_body_cache.snapshot(),
+        "article_json": article_json_cache.snapshot(),
+        "conditional_get": asdict(conditional_stats),
+        "embedding_batcher": embedding_batcher.snapshot(),
+        "feed_cache": feed_result_cache.snapshot(),
+        "query_embeddings": query_embedding_cache.snapshot(),
+        "view_sink": asdict(get_view_sink().stats),
+    }
@@ -3,6 +3,7 @@ from datetime import datetime
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
     ARRAY,
+    BigInteger,
     DateTime,
     Float,
     ForeignKey,
@@ -12,6 +13,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -44,15 +46,25 @@ class Article(Base):
     cover_image_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     embedding = mapped_column(Vector(settings.embedding_dim), nullable=True)
     embedded_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    dedup_cluster_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    dedup_cluster_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
     title_en: Mapped[str | None] = mapped_column(Text, nullable=True)
     category: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True)
 
     __table_args__ = (
         Index("ix_articles_topics", "topics", postgresql_using="gin"),
         Index("ix_articles_publishing_date", "publishing_date"),
+        Index("ix_articles_publishing_date_id", text("publishing_date DESC NULLS LAST"), text("id DESC")),
         Index("ix_articles_publisher", "publisher"),
         Index("ix_articles_language", "language"),
+        Index("ix_articles_crawled_at", "crawled_at"),
+        Index("ix_articles_embedded_at_id", "embedded_at", "id"),
+        Index(
+            "ix_articles_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
     )
 
 
@@ -61,6 +73,7 @@ class User(Base):
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    profile_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     preferences: Mapped[list["UserPreference"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
@@ -72,6 +85,8 @@ class UserPreference(Base):
     user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     topic: Mapped[str] = mapped_column(String(255), nullable=False)
     weight: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
+    embedding = mapped_column(Vector(settings.embedding_dim), nullable=True)
+    embedding_model: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="preferences")
 
@@ -92,6 +107,96 @@ class ArticleView(Base):
     )
 
 
+class ArticleViewRollup(Base):
+    __tablename__ = "article_view_rollups"
+
+    article_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True
+    )
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_article_view_rollups_bucket_start", "bucket_start"),)
+
+
+class PipelineWatermark(Base):
+    __tablename__ = "pipeline_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArticleFilterCount(Base):
+    """Article counts per single filter value, maintained by the scheduler.
+
+    ``dimension`` is ``all`` (with an empty ``value``), ``publisher``,
+    ``language``, ``category`` or ``topic``.
+    """
+
+    __tablename__ = "article_filter_counts"
+
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, primary_key=True)
+    total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    embedded: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class StoryCluster(Base):
+    """One row per dedup cluster, maintained by ``run_dedup``.
+
+    Members are stored lead-first, then by publisher tier and recency.  The
+    lead is the most recent article from the best publisher tier present.
+    """
+
+    __tablename__ = "story_clusters"
+
+    cluster_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    member_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    tier_1_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tier_2_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tier_3_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    lead_article_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False
+    )
+    publishers: Mapped[list[str]] = mapped_column(ARRAY(String(255)), nullable=False, default=list)
+    languages: Mapped[list[str]] = mapped_column(ARRAY(String(10)), nullable=False, default=list)
+    categories: Mapped[list[str]] = mapped_column(ARRAY(String(50)), nullable=False, default=list)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_story_clusters_size", text("size DESC"), "cluster_id"),
+        Index("ix_story_clusters_publishers", "publishers", postgresql_using="gin"),
+        Index("ix_story_clusters_languages", "languages", postgresql_using="gin"),
+        Index("ix_story_clusters_categories", "categories", postgresql_using="gin"),
+    )
+
+
+class StorySnapshot(Base):
+    __tablename__ = "story_snapshots"
+
+    filter_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    generated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StorySnapshotItem(Base):
+    __tablename__ = "story_snapshot_items"
+
+    filter_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    story_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    lead_article_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False
+    )
+    dedup_cluster_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class CrawlRun(Base):
     __tablename__ = "crawl_runs"
 
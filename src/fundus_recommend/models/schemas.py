@@ -28,9 +28,15 @@ class ArticleDetail(ArticleSummary):
 
 class ArticleListResponse(BaseModel):
     items: list[ArticleSummary]
-    total: int
+    total: int | None
     page: int
     page_size: int
+    next_cursor: str | None = None
+
+
+class ArticleBatchResponse(BaseModel):
+    items: list[ArticleSummary]
+    missing_ids: list[int]
 
 
 class NewsStory(BaseModel):
@@ -46,6 +52,7 @@ class StoryListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: str | None = None
 
 
 class StoryRecommendationResult(BaseModel):
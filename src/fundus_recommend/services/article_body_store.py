@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from fundus_recommend.config import settings
@@ -16,8 +21,16 @@ except Exception:  # pragma: no cover
     BotoCoreError = Exception
     ClientError = Exception
 
+try:
+    import zstandard
+except ImportError:  # optional: pip install fundus-recommend[zstd]
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+CODEC_METADATA_KEY = "body-codec"
+DICTIONARY_METADATA_KEY = "body-dict"
+
 
 class BodyStoreError(RuntimeError):
     """Raised when body storage operations fail."""
@@ -32,6 +45,108 @@ class BodyStoreNotConfiguredError(BodyStoreError):
 
 
 _client: Any | None = None
+_client_lock = threading.Lock()
+
+
+class BodyCodec:
+    """Byte-level compression for stored bodies.
+
+    *dictionary* is the shared dictionary the object was written with, or
+    ``None``.  Subclass and :func:`register_codec` to add a codec.
+    """
+
+    name = "identity"
+    content_type = "text/plain; charset=utf-8"
+
+    def compress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        return data
+
+    def decompress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        return data
+
+    def train(self, samples: list[bytes], size: int) -> bytes:
+        raise BodyStoreError(f"Codec {self.name!r} does not use a dictionary")
+
+
+class ZlibCodec(BodyCodec):
+    """DEFLATE with an optional preset dictionary (``zdict``)."""
+
+    name = "zlib"
+    content_type = "application/octet-stream"
+    # DEFLATE only looks back 32 KiB, so a longer preset dictionary is wasted.
+    max_dictionary_size = 32 * 1024
+
+    def __init__(self, level: int = 9) -> None:
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        compressor = zlib.compressobj(self.level, zdict=dictionary) if dictionary else zlib.compressobj(self.level)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def train(self, samples: list[bytes], size: int) -> bytes:
+        # A preset dictionary is just text the compressor may back-reference:
+        # keep the word 4-grams that recur across documents (boilerplate,
+        # bylines, recurring phrases), most widespread last so they sit
+        # closest to the data.
+        size = min(size, self.max_dictionary_size)
+        document_frequency: Counter[bytes] = Counter()
+        for sample in samples:
+            words = sample.split()
+            document_frequency.update({b" ".join(words[i : i + 4]) for i in range(len(words) - 3)})
+        picked: list[bytes] = []
+        total = 0
+        for gram, count in document_frequency.most_common():
+            if count < 2 or total + len(gram) + 1 > size:
+                break
+            picked.append(gram)
+            total += len(gram) + 1
+        return b" ".join(reversed(picked))
+
+
+class ZstdCodec(BodyCodec):
+    name = "zstd"
+    content_type = "application/octet-stream"
+
+    def __init__(self, level: int = 9) -> None:
+        self.level = level
+
+    def _dictionary(self, dictionary: bytes | None) -> Any:
+        return zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+
+    def compress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level, dict_data=self._dictionary(dictionary)).compress(data)
+
+    def decompress(self, data: bytes, dictionary: bytes | None) -> bytes:
+        return zstandard.ZstdDecompressor(dict_data=self._dictionary(dictionary)).decompress(data)
+
+    def train(self, samples: list[bytes], size: int) -> bytes:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+
+
+_codecs: dict[str, BodyCodec] = {}
+_dictionaries: dict[tuple[str, str], bytes] = {}
+_dictionaries_lock = threading.Lock()
+
+
+def register_codec(codec: BodyCodec) -> None:
+    _codecs[codec.name] = codec
+
+
+register_codec(BodyCodec())
+register_codec(ZlibCodec())
+if zstandard is not None:
+    register_codec(ZstdCodec())
+
+
+def get_codec(name: str) -> BodyCodec:
+    codec = _codecs.get(name)
+    if codec is None:
+        raise BodyStoreError(f"Unknown body codec {name!r}; available: {', '.join(sorted(_codecs))}")
+    return codec
 
 
 def _resolve_endpoint() -> str:
@@ -63,19 +178,23 @@ def _get_client() -> Any:
         raise BodyStoreError("boto3 is required for Cloudflare R2 storage")
 
     _validate_configuration()
-    _client = boto3.client(
-        "s3",
-        endpoint_url=_resolve_endpoint(),
-        region_name=settings.r2_region,
-        aws_access_key_id=settings.r2_access_key_id,
-        aws_secret_access_key=settings.r2_secret_access_key,
-        config=BotoConfig(
-            signature_version="s3v4",
-            connect_timeout=settings.r2_timeout_seconds,
-            read_timeout=settings.r2_timeout_seconds,
-            retries={"max_attempts": 3, "mode": "standard"},
-        ),
-    )
+    # One client is shared by the upload threads; boto3 clients are thread-safe.
+    with _client_lock:
+        if _client is None:
+            _client = boto3.client(
+                "s3",
+                endpoint_url=_resolve_endpoint(),
+                region_name=settings.r2_region,
+                aws_access_key_id=settings.r2_access_key_id,
+                aws_secret_access_key=settings.r2_secret_access_key,
+                config=BotoConfig(
+                    signature_version="s3v4",
+                    connect_timeout=settings.r2_timeout_seconds,
+                    read_timeout=settings.r2_timeout_seconds,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    max_pool_connections=max(10, settings.article_body_upload_concurrency),
+                ),
+            )
     return _client
 
 
@@ -84,24 +203,14 @@ def build_body_key(article_id: int, url: str) -> str:
     return f"articles/{article_id}/{digest}.txt"
 
 
-def put_body(key: str, body: str) -> None:
-    client = _get_client()
-    try:
-        client.put_object(
-            Bucket=settings.r2_bucket,
-            Key=key,
-            Body=body.encode("utf-8"),
-            ContentType="text/plain; charset=utf-8",
-        )
-    except (BotoCoreError, ClientError) as exc:
-        logger.exception("article_body_put_failed key=%s bucket=%s error=%s", key, settings.r2_bucket, exc)
-        raise BodyStoreError("Failed to store article body in R2") from exc
+def dictionary_key(codec: str, version: str) -> str:
+    return f"dictionaries/{codec}/{version}.dict"
 
 
-def get_body(key: str) -> str:
+def _get_object(key: str) -> dict[str, Any]:
     client = _get_client()
     try:
-        response = client.get_object(Bucket=settings.r2_bucket, Key=key)
+        return client.get_object(Bucket=settings.r2_bucket, Key=key)
     except ClientError as exc:
         response_payload = getattr(exc, "response", None)
         if not isinstance(response_payload, dict):
@@ -117,11 +226,118 @@ def get_body(key: str) -> str:
         logger.exception("article_body_get_failed key=%s bucket=%s error=%s", key, settings.r2_bucket, exc)
         raise BodyStoreError("Failed to read article body from R2") from exc
 
-    payload = response["Body"].read()
+
+def put_dictionary(codec: str, version: str, dictionary: bytes) -> str:
+    """Upload a trained dictionary; returns its object key."""
+    key = dictionary_key(codec, version)
+    client = _get_client()
+    try:
+        client.put_object(
+            Bucket=settings.r2_bucket, Key=key, Body=dictionary, ContentType="application/octet-stream"
+        )
+    except (BotoCoreError, ClientError) as exc:
+        logger.exception("article_body_dict_put_failed key=%s bucket=%s error=%s", key, settings.r2_bucket, exc)
+        raise BodyStoreError("Failed to store body dictionary in R2") from exc
+    with _dictionaries_lock:
+        _dictionaries[(codec, version)] = dictionary
+    return key
+
+
+def get_dictionary(codec: str, version: str) -> bytes:
+    """Dictionary *version* for *codec*, read from R2 once per process."""
+    with _dictionaries_lock:
+        cached = _dictionaries.get((codec, version))
+    if cached is not None:
+        return cached
+    try:
+        dictionary = _get_object(dictionary_key(codec, version))["Body"].read()
+    except BodyNotFoundError as exc:
+        raise BodyStoreError(f"Body dictionary {codec}/{version} is missing") from exc
+    with _dictionaries_lock:
+        _dictionaries[(codec, version)] = dictionary
+    return dictionary
+
+
+def encode_body(body: str, codec: str | None = None, dict_version: str | None = None) -> tuple[bytes, dict[str, str]]:
+    """Encode *body* for storage; returns the payload and the object metadata describing it."""
+    codec_name = codec or settings.article_body_codec
+    body_codec = get_codec(codec_name)
+    data = body.encode("utf-8")
+    if body_codec.name == "identity":
+        return data, {}
+    version = dict_version if dict_version is not None else settings.article_body_dict_version
+    dictionary = get_dictionary(body_codec.name, version) if version else None
+    metadata = {CODEC_METADATA_KEY: body_codec.name}
+    if version:
+        metadata[DICTIONARY_METADATA_KEY] = version
+    return body_codec.compress(data, dictionary), metadata
+
+
+def decode_body(payload: bytes | str, metadata: Mapping[str, str] | None = None) -> str:
+    """Inverse of :func:`encode_body`; objects without codec metadata are plain UTF-8."""
     if isinstance(payload, str):
         return payload
+    metadata = metadata or {}
+    codec_name = metadata.get(CODEC_METADATA_KEY, "identity")
+    if codec_name != "identity":
+        body_codec = get_codec(codec_name)
+        version = metadata.get(DICTIONARY_METADATA_KEY)
+        dictionary = get_dictionary(codec_name, version) if version else None
+        try:
+            payload = body_codec.decompress(payload, dictionary)
+        except Exception as exc:
+            raise BodyStoreError(f"Stored article body is not valid {codec_name} data") from exc
     try:
         return payload.decode("utf-8")
     except UnicodeDecodeError as exc:
-        logger.exception("article_body_decode_failed key=%s bucket=%s", key, settings.r2_bucket)
         raise BodyStoreError("Stored article body is not valid UTF-8") from exc
+
+
+def put_body(key: str, body: str, codec: str | None = None) -> None:
+    payload, metadata = encode_body(body, codec)
+    client = _get_client()
+    try:
+        client.put_object(
+            Bucket=settings.r2_bucket,
+            Key=key,
+            Body=payload,
+            ContentType=get_codec(metadata.get(CODEC_METADATA_KEY, "identity")).content_type,
+            Metadata=metadata,
+        )
+    except (BotoCoreError, ClientError) as exc:
+        logger.exception("article_body_put_failed key=%s bucket=%s error=%s", key, settings.r2_bucket, exc)
+        raise BodyStoreError("Failed to store article body in R2") from exc
+
+
+def upload_bodies(
+    put: Callable[[str, str], None],
+    items: Sequence[tuple[str, str]],
+    max_workers: int | None = None,
+) -> list[BodyStoreError | None]:
+    """Run ``put(key, body)`` for each item on a bounded thread pool.
+
+    Returns one entry per item, in input order: ``None`` on success or the
+    :class:`BodyStoreError` the upload raised.
+    """
+
+    def attempt(item: tuple[str, str]) -> BodyStoreError | None:
+        try:
+            put(*item)
+        except BodyStoreError as exc:
+            return exc
+        return None
+
+    workers = min(len(items), max_workers or settings.article_body_upload_concurrency)
+    if workers <= 1:
+        return [attempt(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="body-upload") as executor:
+        return list(executor.map(attempt, items))
+
+
+def get_body(key: str) -> str:
+    response = _get_object(key)
+    try:
+        return decode_body(response["Body"].read(), response.get("Metadata"))
+    except BodyStoreError:
+        logger.exception("article_body_decode_failed key=%s bucket=%s", key, settings.r2_bucket)
+        raise
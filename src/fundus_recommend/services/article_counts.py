@@ -0,0 +1,113 @@
+"""Incrementally maintained article counts per filter value.
+
+List endpoints and ``/health`` used to run a filtered ``COUNT(*)`` over
+``articles`` on every request.  The scheduler instead folds newly inserted
+articles (``articles.id`` past a watermark) into ``article_filter_counts``,
+one row per publisher, language, category and topic plus an ``all`` row, and
+periodically rebuilds the table from scratch so later category or embedding
+changes on old rows cannot drift the counts for long.
+"""
+
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from fundus_recommend.config import settings
+from fundus_recommend.models.db import Article, ArticleFilterCount
+from fundus_recommend.services.watermarks import (
+    ARTICLE_COUNT_REBUILT_WATERMARK,
+    ARTICLE_COUNT_WATERMARK,
+    get_watermark,
+    set_watermark,
+)
+
+_COLUMNS = ["dimension", "value", "total", "embedded"]
+
+
+def _grouped_counts(*conditions):
+    """One (dimension, value, total, embedded) row per filter value among matching articles."""
+    embedded = func.count().filter(Article.embedding.is_not(None))
+    parts = [select(literal("all"), literal(""), func.count(), embedded).select_from(Article).where(*conditions)]
+    for dimension, column in (
+        ("publisher", Article.publisher),
+        ("language", Article.language),
+        ("category", Article.category),
+    ):
+        parts.append(
+            select(literal(dimension), column, func.count(), embedded)
+            .where(*conditions, column.is_not(None))
+            .group_by(column)
+        )
+
+    topics = (
+        select(
+            Article.id,
+            Article.embedding.is_not(None).label("has_embedding"),
+            func.unnest(Article.topics).label("topic"),
+        )
+        .where(*conditions)
+        .subquery("article_topics")
+    )
+    parts.append(
+        select(
+            literal("topic"),
+            topics.c.topic,
+            func.count(func.distinct(topics.c.id)),
+            func.count(func.distinct(topics.c.id)).filter(topics.c.has_embedding),
+        )
+        .where(topics.c.topic.is_not(None))
+        .group_by(topics.c.topic)
+    )
+    return union_all(*parts)
+
+
+def refresh_article_counts(session: Session, rebuild_interval_hours: float | None = None) -> int:
+    """Fold articles inserted since the last pass into the per-filter counts.
+
+    The table is rebuilt from scratch on the first pass and whenever the last
+    rebuild is older than *rebuild_interval_hours*.
+
+    Returns the number of articles folded (or counted, on a rebuild).
+    """
+    if rebuild_interval_hours is None:
+        rebuild_interval_hours = settings.article_count_rebuild_interval_hours
+
+    watermark = get_watermark(session, ARTICLE_COUNT_WATERMARK)
+    upper = session.execute(select(func.max(Article.id))).scalar_one_or_none()
+    if upper is None:
+        return 0
+
+    now = int(time.time())
+    rebuilt_at = get_watermark(session, ARTICLE_COUNT_REBUILT_WATERMARK)
+    if watermark == 0 or now - rebuilt_at >= rebuild_interval_hours * 3600:
+        session.execute(delete(ArticleFilterCount))
+        session.execute(insert(ArticleFilterCount).from_select(_COLUMNS, _grouped_counts(Article.id <= upper)))
+        set_watermark(session, ARTICLE_COUNT_REBUILT_WATERMARK, now)
+        lower = 0
+    elif upper > watermark:
+        stmt = insert(ArticleFilterCount).from_select(
+            _COLUMNS, _grouped_counts(Article.id > watermark, Article.id <= upper)
+        )
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ArticleFilterCount.dimension, ArticleFilterCount.value],
+                set_={
+                    "total": ArticleFilterCount.total + stmt.excluded.total,
+                    "embedded": ArticleFilterCount.embedded + stmt.excluded.embedded,
+                },
+            )
+        )
+        lower = watermark
+    else:
+        return 0
+
+    folded = session.execute(
+        select(func.count(Article.id)).where(Article.id > lower, Article.id <= upper)
+    ).scalar_one()
+    set_watermark(session, ARTICLE_COUNT_WATERMARK, int(upper))
+    session.commit()
+    return int(folded)
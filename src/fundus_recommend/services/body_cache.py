@@ -0,0 +1,258 @@
+"""Two-tier cache in front of the R2 article body store.
+
+``GET /articles/{id}`` used to call the synchronous boto3 ``get_body`` inside
+the async handler, blocking the event loop for up to ``r2_timeout_seconds``
+and re-downloading popular articles on every view.  :class:`BodyCache` keeps
+bodies in a byte-bounded in-memory LRU, then in an optional byte-bounded
+directory on local disk, keyed by ``body_storage_key``.  Disk reads and
+origin fetches run on a worker thread, concurrent misses for the same key
+share one fetch, and keys R2 reports as missing are remembered for
+``article_body_cache_negative_ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from fundus_recommend.config import settings
+from fundus_recommend.services.article_body_store import BodyNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BodyCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    negative_hits: int = 0
+    loads: int = 0
+    not_found: int = 0
+    errors: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    disk_entries: int = 0
+    disk_bytes: int = 0
+    disk_seconds: float = 0.0
+    load_seconds: float = 0.0
+
+
+class _DiskTier:
+    """Bodies as files named by the SHA-256 of their key, evicted oldest-first."""
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        existing = sorted(
+            (entry for entry in os.scandir(self.path) if entry.is_file() and entry.name.endswith(".txt")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in existing:
+            self._sizes[entry.name] = entry.stat().st_size
+            self.bytes += entry.stat().st_size
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".txt"
+
+    def get(self, key: str) -> str | None:
+        name = self._name(key)
+        with self._lock:
+            if name not in self._sizes:
+                return None
+            self._sizes.move_to_end(name)
+        try:
+            return (self.path / name).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as exc:
+            logger.warning("article_body_cache_disk_read_failed key=%s error=%s", key, exc)
+            with self._lock:
+                self.bytes -= self._sizes.pop(name, 0)
+            return None
+
+    def put(self, key: str, body: str) -> None:
+        data = body.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        name = self._name(key)
+        tmp_path = self.path / (name + ".tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.path / name)
+        except OSError as exc:
+            logger.warning("article_body_cache_disk_write_failed key=%s error=%s", key, exc)
+            return
+        with self._lock:
+            self.bytes += len(data) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            while self.bytes > self.max_bytes:
+                oldest, size = self._sizes.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+                (self.path / oldest).unlink(missing_ok=True)
+
+
+class BodyCache:
+    def __init__(
+        self,
+        *,
+        max_bytes: int | None = None,
+        disk_path: str | None = None,
+        disk_max_bytes: int | None = None,
+        negative_ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else settings.article_body_cache_max_bytes
+        self.disk_path = disk_path if disk_path is not None else settings.article_body_cache_dir
+        self.disk_max_bytes = (
+            disk_max_bytes if disk_max_bytes is not None else settings.article_body_cache_disk_max_bytes
+        )
+        self.negative_ttl_seconds = (
+            negative_ttl_seconds
+            if negative_ttl_seconds is not None
+            else settings.article_body_cache_negative_ttl_seconds
+        )
+        self._clock = clock
+        self._bodies: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._bytes = 0
+        self._missing: dict[str, float] = {}
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._disk: _DiskTier | None = None
+        self._disk_lock = threading.Lock()
+        self.stats = BodyCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def _disk_tier(self) -> _DiskTier | None:
+        if self._disk is None and self.disk_path and self.disk_max_bytes > 0:
+            with self._disk_lock:
+                if self._disk is None:
+                    self._disk = _DiskTier(Path(self.disk_path), self.disk_max_bytes)
+        return self._disk
+
+    def _remember(self, key: str, body: str) -> None:
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._bodies:
+            self._bytes -= self._bodies.pop(key)[1]
+        self._bodies[key] = (body, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _key, (_body, evicted) = self._bodies.popitem(last=False)
+            self._bytes -= evicted
+            self.stats.evictions += 1
+
+    def _fetch(self, key: str, loader: Callable[[str], str]) -> tuple[str, bool]:
+        """Disk tier, then origin; runs on a worker thread.  Returns the body and whether disk served it."""
+        disk = self._disk_tier()
+        if disk is not None:
+            body = disk.get(key)
+            if body is not None:
+                return body, True
+        body = loader(key)
+        if disk is not None:
+            disk.put(key, body)
+        return body, False
+
+    async def get(self, key: str, loader: Callable[[str], str]) -> str:
+        """Body stored under *key*, fetched with the blocking *loader* on a miss.
+
+        Raises whatever *loader* raises; :class:`BodyNotFoundError` is cached
+        negatively, other errors are not.
+        """
+        cached = self._bodies.get(key)
+        if cached is not None:
+            self._bodies.move_to_end(key)
+            self.stats.memory_hits += 1
+            return cached[0]
+
+        missing_until = self._missing.get(key)
+        if missing_until is not None:
+            if missing_until > self._clock():
+                self.stats.negative_hits += 1
+                raise BodyNotFoundError(f"Body key not found: {key}")
+            del self._missing[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        started = time.perf_counter()
+        try:
+            body, from_disk = await asyncio.to_thread(self._fetch, key, loader)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            self.stats.loads += 1
+            self.stats.load_seconds += time.perf_counter() - started
+            if isinstance(exc, BodyNotFoundError):
+                self.stats.not_found += 1
+                if self.negative_ttl_seconds > 0:
+                    self._missing[key] = self._clock() + self.negative_ttl_seconds
+            else:
+                self.stats.errors += 1
+            future.set_exception(exc)
+            future.exception()  # the caller re-raises it; waiters are optional
+            raise
+        finally:
+            del self._inflight[key]
+
+        elapsed = time.perf_counter() - started
+        if from_disk:
+            self.stats.disk_hits += 1
+            self.stats.disk_seconds += elapsed
+        else:
+            self.stats.loads += 1
+            self.stats.load_seconds += elapsed
+        self._remember(key, body)
+        future.set_result(body)
+        return body
+
+    def clear(self) -> None:
+        self._bodies.clear()
+        self._bytes = 0
+        self._missing.clear()
+
+    def snapshot(self) -> dict[str, float]:
+        self.stats.entries = len(self._bodies)
+        self.stats.bytes = self._bytes
+        if self._disk is not None:
+            self.stats.disk_entries = len(self._disk)
+            self.stats.disk_bytes = self._disk.bytes
+            self.stats.disk_evictions = self._disk.evictions
+        hits = self.stats.memory_hits + self.stats.disk_hits + self.stats.negative_hits
+        lookups = hits + self.stats.loads
+        stats = asdict(self.stats)
+        disk_seconds = stats.pop("disk_seconds")
+        load_seconds = stats.pop("load_seconds")
+        return {
+            **stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "mean_disk_ms": round(disk_seconds * 1000 / self.stats.disk_hits, 3) if self.stats.disk_hits else 0.0,
+            "mean_load_ms": round(load_seconds * 1000 / self.stats.loads, 3) if self.stats.loads else 0.0,
+        }
+
+
+article_body_cache = BodyCache()
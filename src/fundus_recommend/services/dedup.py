@@ -1,12 +1,425 @@
+import logging
 import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 import numpy as np
-from sqlalchemy import select, update
+from sqlalchemy import Integer, and_, column, delete, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from fundus_recommend.config import settings
-from fundus_recommend.models.db import Article
+from fundus_recommend.models.db import Article, StoryCluster
+from fundus_recommend.services.embedding_store import get_embedding_store
+from fundus_recommend.services.publisher_authority import publisher_tier
+from fundus_recommend.services.quantization import QuantizedMatrix
+from fundus_recommend.services.watermarks import STORY_CLUSTERS_WATERMARK, get_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+_STORY_CLUSTER_UPSERT_BATCH = 500
+# Two bind parameters per row keeps each statement well under PostgreSQL's 65535 limit.
+_ASSIGNMENT_UPDATE_BATCH = 10000
+
+
+def _story_cluster_values(cluster_id: int, members: list[tuple]) -> dict:
+    """``story_clusters`` row for one cluster from its (id, publisher, language, category, publishing_date) rows."""
+    tiers = [publisher_tier(m[1]) for m in members]
+
+    def recency(i: int) -> tuple[float, int]:
+        published = members[i][4]
+        if published is not None and published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return (published.timestamp() if published is not None else float("-inf"), members[i][0])
+
+    best_tier = min(tiers)
+    lead = max((i for i, tier in enumerate(tiers) if tier == best_tier), key=recency)
+    supporters = sorted(
+        (i for i in range(len(members)) if i != lead),
+        key=lambda i: (tiers[i], -recency(i)[0], -members[i][0]),
+    )
+    return {
+        "cluster_id": cluster_id,
+        "size": len(members),
+        "member_ids": [members[i][0] for i in [lead, *supporters]],
+        "tier_1_count": tiers.count(1),
+        "tier_2_count": tiers.count(2),
+        "tier_3_count": tiers.count(3),
+        "lead_article_id": members[lead][0],
+        "publishers": sorted({m[1] for m in members if m[1]}),
+        "languages": sorted({m[2] for m in members if m[2]}),
+        "categories": sorted({m[3] for m in members if m[3]}),
+    }
+
+
+def refresh_story_clusters(session: Session, cluster_ids: set[int] | None = None) -> int:
+    """Recompute ``story_clusters`` rows for *cluster_ids* (all clusters if ``None``).
+
+    Clusters that no longer have members are deleted.  The first call on a
+    database (no ``story_clusters_rebuilt`` watermark yet) always rebuilds
+    the whole table.  Does not commit.
+
+    Returns the number of rows written.
+    """
+    full = cluster_ids is None or get_watermark(session, STORY_CLUSTERS_WATERMARK) == 0
+    if not full and not cluster_ids:
+        return 0
+
+    query = select(
+        Article.dedup_cluster_id,
+        Article.id,
+        Article.publisher,
+        Article.language,
+        Article.category,
+        Article.publishing_date,
+    ).where(Article.dedup_cluster_id.is_not(None))
+    if not full:
+        query = query.where(Article.dedup_cluster_id.in_(sorted(cluster_ids)))
+
+    members_by_cluster: dict[int, list[tuple]] = {}
+    for row in session.execute(query).all():
+        members_by_cluster.setdefault(row[0], []).append(tuple(row[1:]))
+
+    if full:
+        session.execute(delete(StoryCluster))
+    else:
+        emptied = sorted(set(cluster_ids) - members_by_cluster.keys())
+        if emptied:
+            session.execute(delete(StoryCluster).where(StoryCluster.cluster_id.in_(emptied)))
+
+    values = [_story_cluster_values(cid, members) for cid, members in sorted(members_by_cluster.items())]
+    for start in range(0, len(values), _STORY_CLUSTER_UPSERT_BATCH):
+        stmt = insert(StoryCluster).values(values[start : start + _STORY_CLUSTER_UPSERT_BATCH])
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[StoryCluster.cluster_id],
+                set_={
+                    **{column: stmt.excluded[column] for column in values[0] if column != "cluster_id"},
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    if full:
+        set_watermark(session, STORY_CLUSTERS_WATERMARK, int(datetime.now(timezone.utc).timestamp()))
+    return len(values)
+
+
+def rebuild_story_clusters_if_due(session: Session, rebuild_interval_hours: float | None = None) -> int:
+    """Rebuild the whole ``story_clusters`` table when the last rebuild is too old.
+
+    Dedup only refreshes the clusters it touches, so category and date
+    changes, and deleted members, would otherwise leave rows stale.  Commits
+    when it rebuilds.
+
+    Returns the number of rows written, or 0 when no rebuild was due.
+    """
+    if rebuild_interval_hours is None:
+        rebuild_interval_hours = settings.story_cluster_rebuild_interval_hours
+
+    rebuilt_at = get_watermark(session, STORY_CLUSTERS_WATERMARK)
+    if rebuilt_at and datetime.now(timezone.utc).timestamp() - rebuilt_at < rebuild_interval_hours * 3600:
+        return 0
+    written = refresh_story_clusters(session)
+    session.commit()
+    return written
+
+
+class _DisjointClusters:
+    """Union-find over cluster ids with member counts kept at each root.
+
+    A root is always the smallest cluster id in its set, so merges keep the
+    repo's min-id convention for ``dedup_cluster_id``.
+    """
+
+    def __init__(self, cluster_ids) -> None:
+        self._parent: dict[int, int] = {}
+        self._size: dict[int, int] = {}
+        for cid in cluster_ids:
+            if cid is not None:
+                self._parent[cid] = cid
+                self._size[cid] = self._size.get(cid, 0) + 1
+
+    def add(self, cid: int) -> int:
+        """Register *cid* as an empty cluster if unknown; returns its root."""
+        if cid not in self._parent:
+            self._parent[cid] = cid
+            self._size[cid] = 0
+        return self.find(cid)
+
+    def find(self, cid: int) -> int:
+        root = cid
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[cid] != root:  # path compression
+            self._parent[cid], cid = root, self._parent[cid]
+        return root
+
+    def size(self, cid: int) -> int:
+        return self._size[self.find(cid)]
+
+    def grow(self, root: int, count: int) -> None:
+        self._size[root] += count
+
+    def union(self, a: int, b: int) -> int:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        root, child = min(root_a, root_b), max(root_a, root_b)
+        self._parent[child] = root
+        self._size[root] += self._size.pop(child)
+        return root
+
+
+def _write_assignments(session: Session, assignments: dict[int, int], merges: dict[int, int]) -> int:
+    """Write cluster assignments with ``UPDATE ... FROM (VALUES ...)`` batches.
+
+    *assignments* maps newly clustered article ids to their cluster;
+    *merges* maps merged-away cluster ids to their new root and is applied by
+    cluster id, so members that were not loaded (e.g. articles whose
+    embedding was cleared) follow the merge too.  Each batch runs in a
+    savepoint and is retried on deadlock — concurrent processes (e.g.
+    re-categorization) may lock overlapping rows — without losing the
+    batches already written.  Returns the number of rows updated.
+    """
+    statements = []
+    for pairs, name, match, key, target in (
+        (sorted(merges.items()), "merges", Article.dedup_cluster_id, "cluster_id", "root"),
+        (sorted(assignments.items()), "assignments", Article.id, "id", "cluster_id"),
+    ):
+        for start in range(0, len(pairs), _ASSIGNMENT_UPDATE_BATCH):
+            batch = values(column(key, Integer), column(target, Integer), name=name).data(
+                pairs[start : start + _ASSIGNMENT_UPDATE_BATCH]
+            )
+            statements.append(update(Article).where(match == batch.c[key]).values(dedup_cluster_id=batch.c[target]))
+
+    updated = 0
+    for stmt in statements:
+        for attempt in range(3):
+            try:
+                with session.begin_nested():
+                    updated += session.execute(stmt).rowcount
+                break
+            except OperationalError:
+                if attempt == 2:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+    return updated
+
+
+@dataclass
+class _Corpus:
+    """New articles and the candidate corpus they are compared against.
+
+    ``new_blocks`` / ``blocks`` are integer block codes: rows are only
+    compared when their codes match (``-1`` never matches).  ``vectors`` and
+    ``quantized`` may be whole memory maps of the embedding store, with
+    ``source_rows`` giving each corpus row's position in them.  When
+    ``quantized`` is set it is scanned and ``vectors`` only serves the exact
+    re-check.
+    """
+
+    new_ids: list[int]
+    new_vectors: np.ndarray
+    new_blocks: np.ndarray
+    ids: list[int]
+    vectors: np.ndarray
+    blocks: np.ndarray
+    cluster_of: dict[int, int | None]
+    source_rows: np.ndarray | None = None
+    quantized: QuantizedMatrix | None = None
+
+    def rows(self, cols: slice | np.ndarray) -> slice | np.ndarray:
+        """Positions in ``vectors`` / ``quantized`` of corpus rows *cols*."""
+        return cols if self.source_rows is None else self.source_rows[cols]
+
+    def exact(self, cols: np.ndarray) -> np.ndarray:
+        return np.asarray(self.vectors[self.rows(cols)], dtype=np.float32)
+
+
+def _block_columns() -> list:
+    columns = []
+    if settings.dedup_block_by_language:
+        columns.append(Article.language)
+    if settings.dedup_block_by_category:
+        columns.append(Article.category)
+    return columns
+
+
+def _window_clause(dates: list[datetime]):
+    """Corpus filter for articles dated within ``dedup_window_days`` of any of *dates*.
+
+    Undated articles are placed by ``crawled_at``.  Overlapping windows are
+    merged, so a cycle of recent articles yields one range.  ``None`` when
+    the window is disabled.
+    """
+    if settings.dedup_window_days <= 0:
+        return None
+    window = timedelta(days=settings.dedup_window_days)
+    ranges: list[list[datetime]] = []
+    for date in sorted(dates):
+        if ranges and date - window <= ranges[-1][1]:
+            ranges[-1][1] = date + window
+        else:
+            ranges.append([date - window, date + window])
+    return or_(
+        *(
+            or_(
+                Article.publishing_date.between(low, high),
+                and_(Article.publishing_date.is_(None), Article.crawled_at.between(low, high)),
+            )
+            for low, high in ranges
+        )
+    )
+
+
+def _load_corpus(session: Session, new_article_ids: list[int]) -> _Corpus | None:
+    """New articles, their candidate corpus, and current cluster assignments.
+
+    The corpus is limited to the publishing-date window around the new
+    articles (see :func:`_window_clause`); every member of a cluster seen in
+    the window is still loaded into ``cluster_of`` so sizes and merges stay
+    exact.  Vectors come from the local embedding store when one is
+    configured, so only ids and cluster assignments are read from
+    PostgreSQL.  Returns ``None`` when no new article is embedded.
+    """
+    store = get_embedding_store()
+    block_columns = _block_columns()
+    date = func.coalesce(Article.publishing_date, Article.crawled_at)
+    new_columns = [Article.id, date] if store is not None else [Article.id, date, Article.embedding]
+    new_rows = session.execute(
+        select(*new_columns, *block_columns)
+        .where(Article.id.in_(new_article_ids), Article.embedding.is_not(None))
+        .order_by(Article.id)
+    ).all()
+    if not new_rows:
+        return None
+    key_width = len(block_columns)
+    new_keys = [tuple(r[len(r) - key_width :]) if key_width else () for r in new_rows]
+
+    window = _window_clause([r[1] for r in new_rows])
+    corpus_columns = [Article.id, Article.dedup_cluster_id]
+    if store is None:
+        corpus_columns.append(Article.embedding)
+    corpus_query = select(*corpus_columns, *block_columns).where(Article.embedding.is_not(None))
+    if window is not None:
+        corpus_query = corpus_query.where(window)
+    corpus_rows = session.execute(corpus_query.order_by(Article.id)).all()
+    cluster_of: dict[int, int | None] = {r[0]: r[1] for r in corpus_rows}
+    key_of = {r[0]: tuple(r[len(r) - key_width :]) if key_width else () for r in corpus_rows}
+
+    if window is not None:
+        window_clusters = {cid for cid in cluster_of.values() if cid is not None}
+        if window_clusters:
+            members = session.execute(
+                select(Article.id, Article.dedup_cluster_id).where(
+                    Article.dedup_cluster_id.in_(sorted(window_clusters)), Article.embedding.is_not(None)
+                )
+            ).all()
+            for aid, cid in members:
+                cluster_of.setdefault(aid, cid)
+
+    codes: dict[tuple, int] = {}
+    for key in new_keys:
+        codes.setdefault(key, len(codes))
+
+    def encode(keys) -> np.ndarray:
+        return np.fromiter((codes.get(key, -1) for key in keys), dtype=np.int64)
+
+    source_rows = None
+    quantized = None
+    if store is None:
+        new_ids = [r[0] for r in new_rows]
+        new_vectors = np.asarray([r[2] for r in new_rows], dtype=np.float32)
+        ids = [r[0] for r in corpus_rows]
+        vectors = np.asarray([r[2] for r in corpus_rows], dtype=np.float32)
+        if settings.dedup_score_dtype != "float32":
+            logger.warning("dedup_quantized_scoring_needs_embedding_store dtype=%s", settings.dedup_score_dtype)
+    else:
+        store.sync(session)
+        snapshot = store.load()
+        positions = snapshot.positions([r[0] for r in new_rows])
+        new_ids = [r[0] for r, pos in zip(new_rows, positions) if pos >= 0]
+        new_keys = [key for key, pos in zip(new_keys, positions) if pos >= 0]
+        if not new_ids:
+            return None
+        new_vectors = np.asarray(snapshot.vectors[positions[positions >= 0]], dtype=np.float32)
+        # Scan the memory maps in place; a window only selects their rows.
+        vectors = snapshot.vectors
+        quantized = snapshot.quantized
+        if window is None:
+            ids = snapshot.ids.tolist()
+        else:
+            source_rows = snapshot.positions([r[0] for r in corpus_rows])
+            source_rows = np.sort(source_rows[source_rows >= 0])
+            ids = snapshot.ids[source_rows].tolist()
+
+    return _Corpus(
+        new_ids=new_ids,
+        new_vectors=new_vectors,
+        new_blocks=encode(new_keys),
+        ids=ids,
+        vectors=vectors,
+        blocks=encode(key_of.get(aid) for aid in ids),
+        cluster_of=cluster_of,
+        source_rows=source_rows,
+        quantized=quantized,
+    )
+
+
+def _neighbours(corpus: _Corpus, threshold: float, tile_bytes: int, margin: float = 0.0) -> list[np.ndarray]:
+    """Corpus row indices with similarity >= *threshold* for each new article.
+
+    Rows are compared only within their block, and the products are computed
+    in tiles of at most *tile_bytes* of float32 scores, so memory stays
+    bounded however large the corpus is.  With a quantized corpus, tiles keep
+    pairs scoring at least ``threshold - margin`` and those candidates are
+    re-checked against the exact vectors.
+    """
+    quantized = corpus.quantized
+    cutoff = threshold - margin if quantized is not None else threshold
+    hit_rows: list[np.ndarray] = []
+    hit_cols: list[np.ndarray] = []
+    single_block = bool((corpus.blocks == 0).all()) and bool((corpus.new_blocks == 0).all())
+
+    for code in np.unique(corpus.new_blocks):
+        rows = np.flatnonzero(corpus.new_blocks == code)
+        cols = None if single_block else np.flatnonzero(corpus.blocks == code)
+        n_cols = len(corpus.ids) if cols is None else len(cols)
+        if not n_cols:
+            continue
+        row_step = max(1, min(len(rows), tile_bytes // (4 * 1024)))
+        for row_start in range(0, len(rows), row_step):
+            row_index = rows[row_start : row_start + row_step]
+            queries = corpus.new_vectors[row_index]
+            col_step = max(1, tile_bytes // (4 * len(row_index)))
+            for col_start in range(0, n_cols, col_step):
+                if cols is None:
+                    col_index = np.arange(col_start, min(col_start + col_step, n_cols))
+                    selection = slice(col_start, col_start + col_step)
+                else:
+                    col_index = selection = cols[col_start : col_start + col_step]
+                if quantized is not None:
+                    scores = quantized.scores(queries, corpus.rows(selection))
+                else:
+                    scores = queries @ np.asarray(corpus.vectors[corpus.rows(selection)], dtype=np.float32).T
+                r, c = np.nonzero(scores >= cutoff)
+                hit_rows.append(row_index[r])
+                hit_cols.append(col_index[c])
+
+    found: list[list[int]] = [[] for _ in corpus.new_ids]
+    if not hit_rows:
+        return [np.array(hits, dtype=np.int64) for hits in found]
+    pair_rows, pair_cols = np.concatenate(hit_rows), np.concatenate(hit_cols)
+    if quantized is not None and len(pair_rows):
+        unique_cols, inverse = np.unique(pair_cols, return_inverse=True)
+        exact = corpus.exact(unique_cols)
+        keep = np.einsum("ij,ij->i", corpus.new_vectors[pair_rows], exact[inverse]) >= threshold
+        pair_rows, pair_cols = pair_rows[keep], pair_cols[keep]
+    for r, c in zip(pair_rows.tolist(), pair_cols.tolist()):
+        found[r].append(c)
+    return [np.array(sorted(hits), dtype=np.int64) for hits in found]
 
 
 def run_dedup(
@@ -14,9 +427,12 @@ def run_dedup(
     new_article_ids: list[int] | None = None,
     max_cluster_size: int = 200,
 ) -> int:
-    """Incremental dedup: compare new articles against the full corpus.
+    """Incremental dedup: compare new articles against recent corpus articles.
 
-    Only articles listed in *new_article_ids* are checked for similarity.
+    Only articles listed in *new_article_ids* are checked for similarity,
+    against articles dated within ``dedup_window_days`` of them and, when
+    ``dedup_block_by_language`` / ``dedup_block_by_category`` are set, of
+    the same language / category.
     For each new article we find all neighbours above the cosine-similarity
     threshold and either join an existing cluster or create a new one.
     When a new article bridges two previously separate clusters the smaller
@@ -26,132 +442,75 @@ def run_dedup(
     transitive-chain growth.  Neighbours in oversized clusters are ignored,
     and merges that would exceed the cap are skipped.
 
+    Cluster membership is tracked with a union-find keyed by cluster id, and
+    the final assignments are written with bulk ``UPDATE`` statements: new
+    members by article id, merged-away clusters by cluster id.
+    ``story_clusters`` rows for every cluster that gained members or was
+    merged away are refreshed in the same transaction.
+
     Returns the number of articles whose cluster assignment changed.
     """
     if not new_article_ids:
         return 0
 
-    # --- load new-article embeddings ---
-    new_stmt = (
-        select(Article.id, Article.embedding)
-        .where(Article.id.in_(new_article_ids), Article.embedding.is_not(None))
-        .order_by(Article.id)
-    )
-    new_rows = session.execute(new_stmt).all()
-    if not new_rows:
+    corpus = _load_corpus(session, new_article_ids)
+    if corpus is None:
         return 0
+    cluster_of = corpus.cluster_of
+    all_ids = corpus.ids
 
-    new_ids = [r[0] for r in new_rows]
-    new_embeddings = np.array([r[1] for r in new_rows])
+    clusters = _DisjointClusters(cluster_of.values())
 
-    # --- load full corpus embeddings + existing cluster assignments ---
-    all_stmt = (
-        select(Article.id, Article.embedding, Article.dedup_cluster_id)
-        .where(Article.embedding.is_not(None))
-        .order_by(Article.id)
+    # --- similarity: new × corpus, blocked and tiled (cosine; embeddings are L2-normalised) ---
+    neighbours = _neighbours(
+        corpus, settings.dedup_threshold, settings.dedup_tile_bytes, settings.dedup_quantized_margin
     )
-    all_rows = session.execute(all_stmt).all()
-    all_ids = [r[0] for r in all_rows]
-    all_embeddings = np.array([r[1] for r in all_rows])
-    # current cluster state (article_id -> cluster_id)
-    cluster_of: dict[int, int | None] = {r[0]: r[2] for r in all_rows}
-
-    # --- cluster size tracking ---
-    cluster_size: dict[int, int] = {}
-    for r in all_rows:
-        cid = r[2]
-        if cid is not None:
-            cluster_size[cid] = cluster_size.get(cid, 0) + 1
-
-    # --- similarity: new × all  (cosine; embeddings are L2-normalised) ---
-    sim_matrix = new_embeddings @ all_embeddings.T  # shape (len(new), len(all))
 
-    threshold = settings.dedup_threshold
-    changed: set[int] = set()
+    assigned: dict[int, int] = {}
+    merged_away: set[int] = set()
 
-    for i, new_id in enumerate(new_ids):
-        neighbor_indices = np.where(sim_matrix[i] >= threshold)[0]
-        neighbor_ids = [all_ids[int(j)] for j in neighbor_indices if all_ids[int(j)] != new_id]
-
-        if not neighbor_ids:
-            continue
+    for new_id, neighbor_indices in zip(corpus.new_ids, neighbours):
+        # Store rows for deleted or un-embedded articles are not in cluster_of.
+        neighbor_ids = [
+            all_ids[int(j)] for j in neighbor_indices if all_ids[int(j)] != new_id and all_ids[int(j)] in cluster_of
+        ]
 
         # Ignore neighbours in clusters already at the size cap — these are
         # likely transitive-chain artefacts, not genuine duplicates.
-        frozen = {cid for cid, sz in cluster_size.items() if sz >= max_cluster_size}
         neighbor_ids = [
             aid for aid in neighbor_ids
-            if cluster_of.get(aid) not in frozen
+            if cluster_of[aid] is None or clusters.size(cluster_of[aid]) < max_cluster_size
         ]
         if not neighbor_ids:
             continue
 
         # Gather everyone in this group: the new article + its neighbours
         group = [new_id] + neighbor_ids
-
-        # Collect existing cluster IDs present in the group
-        cluster_ids_in_group: set[int] = set()
-        for aid in group:
-            cid = cluster_of.get(aid)
-            if cid is not None:
-                cluster_ids_in_group.add(cid)
+        unclustered = [aid for aid in group if cluster_of.get(aid) is None]
+        roots = {clusters.find(cluster_of[aid]) for aid in group if cluster_of.get(aid) is not None}
 
         # Check if merging would exceed the cap
-        combined = sum(cluster_size.get(cid, 0) for cid in cluster_ids_in_group)
-        combined += sum(1 for aid in group if cluster_of.get(aid) is None)
-        if combined > max_cluster_size:
+        if sum(clusters.size(root) for root in roots) + len(unclustered) > max_cluster_size:
             continue
 
         # Target cluster = smallest existing cluster id, or smallest article id
-        target_cluster = min(cluster_ids_in_group) if cluster_ids_in_group else min(group)
-
-        # Assign unclustered members of the group
-        for aid in group:
-            if cluster_of.get(aid) is None:
-                cluster_of[aid] = target_cluster
-                cluster_size[target_cluster] = cluster_size.get(target_cluster, 0) + 1
-                changed.add(aid)
+        target_cluster = min(roots) if roots else clusters.add(min(group))
+        for aid in unclustered:
+            cluster_of[aid] = target_cluster
+            assigned[aid] = target_cluster
+        clusters.grow(target_cluster, len(unclustered))
 
         # Merge any other clusters into target (smaller id wins)
-        for old_cluster in cluster_ids_in_group:
-            if old_cluster == target_cluster:
-                continue
-            old_size = cluster_size.pop(old_cluster, 0)
-            cluster_size[target_cluster] = cluster_size.get(target_cluster, 0) + old_size
-            # Bulk-update in DB (retry on deadlock)
-            for attempt in range(3):
-                try:
-                    session.execute(
-                        update(Article)
-                        .where(Article.dedup_cluster_id == old_cluster)
-                        .values(dedup_cluster_id=target_cluster)
-                    )
-                    break
-                except OperationalError:
-                    session.rollback()
-                    if attempt == 2:
-                        raise
-                    time.sleep(0.1 * (attempt + 1))
-            # Keep local map in sync
-            for aid in list(cluster_of):
-                if cluster_of[aid] == old_cluster:
-                    cluster_of[aid] = target_cluster
-                    changed.add(aid)
-
-    # Persist new assignments for articles that weren't covered by the merge UPDATE.
-    # Retry on deadlock — concurrent processes (e.g. re-categorization) may lock
-    # overlapping rows.
-    for aid in changed:
-        cid = cluster_of[aid]
-        for attempt in range(3):
-            try:
-                session.execute(update(Article).where(Article.id == aid).values(dedup_cluster_id=cid))
-                break
-            except OperationalError:
-                session.rollback()
-                if attempt == 2:
-                    raise
-                time.sleep(0.1 * (attempt + 1))
+        for old_cluster in roots - {target_cluster}:
+            clusters.union(target_cluster, old_cluster)
+            merged_away.add(old_cluster)
+
+    # Final assignments: newly clustered articles by id, resolved to their
+    # root, and merged-away clusters by cluster id.
+    changed = {aid: clusters.find(cid) for aid, cid in assigned.items()}
+    merges = {cid: clusters.find(cid) for cid in merged_away}
+    updated = _write_assignments(session, changed, merges)
 
+    refresh_story_clusters(session, set(changed.values()) | set(merges.values()) | merged_away)
     session.commit()
-    return len(changed)
+    return updated
@@ -0,0 +1,144 @@
+"""Micro-batching executor for query embeddings in the API.
+
+SentenceTransformer inference is CPU-bound and used to run inline in async
+handlers, blocking the event loop and serializing concurrent searches.
+:class:`EmbeddingBatcher` queues query texts, waits up to
+``embedding_batch_window_ms`` for concurrent requests to join, and encodes
+each batch with one ``model.encode`` call on a dedicated worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from fundus_recommend.config import settings
+from fundus_recommend.services.embeddings import embed_texts
+
+
+@dataclass
+class EmbeddingBatchStats:
+    batches: int = 0
+    texts: int = 0
+    failed_batches: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    encode_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        encode: Callable[[list[str]], np.ndarray] = embed_texts,
+        *,
+        window_ms: float | None = None,
+        max_batch_size: int | None = None,
+        max_queue: int | None = None,
+    ) -> None:
+        self._encode = encode
+        self.window_seconds = (window_ms if window_ms is not None else settings.embedding_batch_window_ms) / 1000
+        self.max_batch_size = max_batch_size or settings.embedding_batch_max_size
+        self.max_queue = max_queue or settings.embedding_queue_max_size
+        self.stats = EmbeddingBatchStats()
+        # One inference thread: the model is not safe to call concurrently and
+        # batching already recovers the parallelism.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[tuple[str, float, asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Encode *text* as part of the next batch; waits if the queue is full."""
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, time.perf_counter(), future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> list[tuple[str, float, asyncio.Future]]:
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect(queue)
+            # Identical concurrent queries are encoded once.
+            unique_texts = list(dict.fromkeys(text for text, _enqueued, _future in batch))
+            started = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, unique_texts)
+            except Exception as exc:
+                self.stats.failed_batches += 1
+                for _text, _enqueued, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            finished = time.perf_counter()
+            vector_by_text = dict(zip(unique_texts, vectors))
+            for text, enqueued, future in batch:
+                self.stats.wait_seconds += started - enqueued
+                if not future.done():
+                    future.set_result(vector_by_text[text])
+
+            self.stats.batches += 1
+            self.stats.texts += len(batch)
+            self.stats.last_batch_size = len(batch)
+            self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+            self.stats.encode_seconds += finished - started
+
+    def snapshot(self) -> dict[str, float]:
+        batches = self.stats.batches
+        return {
+            "batches": batches,
+            "texts": self.stats.texts,
+            "failed_batches": self.stats.failed_batches,
+            "queue_depth": self.queue_depth,
+            "last_batch_size": self.stats.last_batch_size,
+            "max_batch_size": self.stats.max_batch_size,
+            "mean_batch_size": round(self.stats.texts / batches, 2) if batches else 0.0,
+            "mean_encode_ms": round(self.stats.encode_seconds * 1000 / batches, 3) if batches else 0.0,
+            "mean_wait_ms": round(self.stats.wait_seconds * 1000 / self.stats.texts, 3) if self.stats.texts else 0.0,
+        }
+
+
+embedding_batcher = EmbeddingBatcher()
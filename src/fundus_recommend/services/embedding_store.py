@@ -0,0 +1,325 @@
+"""Local, memory-mapped copy of article embeddings for batch jobs.
+
+Dedup and backfills used to select every embedding in the corpus on each
+run, shipping gigabytes of pgvector text through psycopg and parsing it into
+Python lists.  :class:`EmbeddingStore` keeps a row-major matrix
+(``vectors.bin``, float32 or float16) and a parallel ``ids.bin`` (int64)
+under ``embedding_store_dir``, memory-maps them read-only for readers, and
+:meth:`EmbeddingStore.sync` copies only rows embedded since the last sync,
+keyed on an ``(embedded_at, id)`` watermark.  Re-embedded articles pass the
+watermark again and are overwritten in place.  ``meta.json`` records the row
+count and watermark and is replaced atomically after the data files are
+flushed, so an interrupted sync is simply redone.  Rows whose article was
+deleted or lost its embedding stay in the files; readers filter by the ids
+they care about.
+
+When ``dedup_score_dtype`` is ``float16`` or ``int8`` the store also keeps
+the quantized rows (``codes.bin``, plus per-row ``scales.bin`` for int8),
+written by the same sync that writes ``vectors.bin``, so dedup scans a
+pre-quantized memory map instead of re-quantizing the corpus every pass.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from fundus_recommend.config import settings
+from fundus_recommend.models.db import Article
+from fundus_recommend.services.quantization import QuantizedMatrix, quantize
+
+logger = logging.getLogger(__name__)
+
+_LOCK_FILE = ".lock"
+_META_FILE = "meta.json"
+_IDS_FILE = "ids.bin"
+_VECTORS_FILE = "vectors.bin"
+_CODES_FILE = "codes.bin"
+_SCALES_FILE = "scales.bin"
+
+
+@dataclass
+class EmbeddingSnapshot:
+    """Read-only view of the store; ``vectors`` is a memory map, not a copy."""
+
+    ids: np.ndarray
+    vectors: np.ndarray
+    quantized: QuantizedMatrix | None = None
+    _index: tuple[np.ndarray, np.ndarray] | None = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, article_ids: list[int] | np.ndarray) -> np.ndarray:
+        """Row index of each id in *article_ids*, or -1 where the store has none.
+
+        If an id was appended twice (re-embedded while a sync was running),
+        the later, newer row wins.
+        """
+        wanted = np.asarray(article_ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(wanted), -1, dtype=np.int64)
+        if self._index is None:
+            order = np.argsort(self.ids, kind="stable")
+            self._index = (order, self.ids[order])
+        order, sorted_ids = self._index
+        found = np.maximum(np.searchsorted(sorted_ids, wanted, side="right") - 1, 0)
+        return np.where(sorted_ids[found] == wanted, order[found], -1)
+
+
+@dataclass
+class EmbeddingSyncStats:
+    appended: int = 0
+    updated: int = 0
+    rebuilt: bool = False
+
+
+class EmbeddingStore:
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        dim: int | None = None,
+        dtype: str | None = None,
+        model: str | None = None,
+        quantized: str | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.dim = dim or settings.embedding_dim
+        self.dtype = np.dtype(dtype or settings.embedding_store_dtype)
+        self.model = model or settings.embedding_model
+        if quantized is None and settings.dedup_score_dtype != "float32":
+            quantized = settings.dedup_score_dtype
+        self.quantized = quantized if quantized != "float32" else None
+
+    # --- files -------------------------------------------------------------
+
+    def _fresh_meta(self) -> dict:
+        return {
+            "model": self.model,
+            "dim": self.dim,
+            "dtype": self.dtype.name,
+            "count": 0,
+            "quantized": self.quantized,
+            "embedded_at": None,
+            "embedded_id": 0,
+            "legacy_id": 0,
+        }
+
+    def _read_meta(self) -> dict | None:
+        try:
+            meta = json.loads((self.path / _META_FILE).read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("embedding_store_meta_unreadable path=%s error=%s", self.path, exc)
+            return None
+        if (meta.get("model"), meta.get("dim"), meta.get("dtype")) != (self.model, self.dim, self.dtype.name):
+            return None
+        return meta
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp_path = self.path / (_META_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.path / _META_FILE)
+
+    def _reset(self) -> dict:
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name in (_META_FILE, _IDS_FILE, _VECTORS_FILE, _CODES_FILE, _SCALES_FILE):
+            (self.path / name).unlink(missing_ok=True)
+        meta = self._fresh_meta()
+        self._write_meta(meta)
+        return meta
+
+    def load(self) -> EmbeddingSnapshot:
+        """Zero-copy snapshot of the committed rows."""
+        meta = self._read_meta()
+        count = meta["count"] if meta else 0
+        if not count:
+            return EmbeddingSnapshot(np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=self.dtype))
+        ids = np.memmap(self.path / _IDS_FILE, dtype=np.int64, mode="r", shape=(count,))
+        vectors = np.memmap(self.path / _VECTORS_FILE, dtype=self.dtype, mode="r", shape=(count, self.dim))
+        quantized = None
+        if self.quantized is not None and meta.get("quantized") == self.quantized:
+            codes = np.memmap(self.path / _CODES_FILE, dtype=self._code_dtype, mode="r", shape=(count, self.dim))
+            scales = None
+            if self.quantized == "int8":
+                scales = np.memmap(self.path / _SCALES_FILE, dtype=np.float32, mode="r", shape=(count,))
+            quantized = QuantizedMatrix(codes, scales)
+        return EmbeddingSnapshot(ids, vectors, quantized)
+
+    @property
+    def _code_dtype(self) -> np.dtype:
+        return np.dtype(np.float16 if self.quantized == "float16" else np.int8)
+
+    def _requantize(self, meta: dict) -> None:
+        """(Re)build the quantized files from ``vectors.bin`` after the setting changed."""
+        for name in (_CODES_FILE, _SCALES_FILE):
+            (self.path / name).unlink(missing_ok=True)
+        if self.quantized is not None and meta["count"]:
+            vectors = np.memmap(
+                self.path / _VECTORS_FILE, dtype=self.dtype, mode="r", shape=(meta["count"], self.dim)
+            )
+            matrix = quantize(vectors, self.quantized, self.dim)
+            self._write_rows(_CODES_FILE, 0, matrix.codes)
+            if matrix.inverse_scales is not None:
+                self._write_rows(_SCALES_FILE, 0, matrix.inverse_scales)
+        meta["quantized"] = self.quantized
+        self._write_meta(meta)
+
+    def _write_rows(self, name: str, offset_rows: int, data: np.ndarray) -> None:
+        """Write *data* starting at row *offset_rows*, dropping anything past it."""
+        row_bytes = data.dtype.itemsize * (data.shape[1] if data.ndim == 2 else 1)
+        path = self.path / name
+        with open(path, "r+b" if offset_rows and path.exists() else "wb") as fh:
+            fh.seek(offset_rows * row_bytes)
+            fh.write(np.ascontiguousarray(data).tobytes())
+            fh.truncate()
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _overwrite_rows(self, name: str, dtype: np.dtype, shape: tuple, positions: np.ndarray, data) -> None:
+        matrix = np.memmap(self.path / name, dtype=dtype, mode="r+", shape=shape)
+        matrix[positions] = data
+        matrix.flush()
+        del matrix
+
+    # --- sync --------------------------------------------------------------
+
+    def _apply(
+        self,
+        meta: dict,
+        initial: EmbeddingSnapshot,
+        ids: list[int],
+        vectors: np.ndarray,
+        stats: EmbeddingSyncStats,
+    ) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        count = meta["count"]
+        # Each keyset pass yields a row at most once and *initial* is reloaded
+        # between passes, so only rows stored before the pass can be present.
+        positions = initial.positions(ids)
+
+        existing = positions >= 0
+        appended = ~existing
+        quantized = quantize(vectors, self.quantized, self.dim) if self.quantized is not None else None
+        if existing.any():
+            rows = positions[existing]
+            self._overwrite_rows(_VECTORS_FILE, self.dtype, (len(initial), self.dim), rows, vectors[existing])
+            if quantized is not None:
+                self._overwrite_rows(
+                    _CODES_FILE, self._code_dtype, (len(initial), self.dim), rows, quantized.codes[existing]
+                )
+                if quantized.inverse_scales is not None:
+                    self._overwrite_rows(
+                        _SCALES_FILE, np.dtype(np.float32), (len(initial),), rows, quantized.inverse_scales[existing]
+                    )
+            stats.updated += int(existing.sum())
+
+        if appended.any():
+            # Bytes past ``count`` left by an interrupted sync are overwritten.
+            self._write_rows(_IDS_FILE, count, np.asarray(ids, dtype=np.int64)[appended])
+            self._write_rows(_VECTORS_FILE, count, vectors[appended])
+            if quantized is not None:
+                self._write_rows(_CODES_FILE, count, quantized.codes[appended])
+                if quantized.inverse_scales is not None:
+                    self._write_rows(_SCALES_FILE, count, quantized.inverse_scales[appended])
+            meta["count"] = count + int(appended.sum())
+            stats.appended += int(appended.sum())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the store directory (blocks other syncs)."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / _LOCK_FILE, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def sync(self, session: Session, batch_size: int = 5000) -> EmbeddingSyncStats:
+        """Copy rows embedded since the last sync into the store.
+
+        Concurrent syncs (the scheduler, ``fr-embed --with-dedup`` and
+        ``fr-classify``) are serialized by a lock file in the store directory.
+        ``embedded_at`` is stamped before the embedding transaction commits, so
+        a row can become visible behind the watermark; each sync therefore
+        re-reads ``embedding_store_sync_overlap_seconds`` behind it and
+        overwrites those rows in place.
+        """
+        with self._locked():
+            return self._sync(session, batch_size)
+
+    def _sync(self, session: Session, batch_size: int) -> EmbeddingSyncStats:
+        stats = EmbeddingSyncStats()
+        meta = self._read_meta()
+        if meta is None or (meta["count"] and not (self.path / _VECTORS_FILE).exists()):
+            meta = self._reset()
+            stats.rebuilt = True
+        if meta.get("quantized") != self.quantized:
+            self._requantize(meta)
+        initial = self.load()
+
+        # Rows embedded before ``embedded_at`` was recorded, by id.
+        while True:
+            rows = session.execute(
+                select(Article.id, Article.embedding)
+                .where(
+                    Article.embedding.is_not(None),
+                    Article.embedded_at.is_(None),
+                    Article.id > meta["legacy_id"],
+                )
+                .order_by(Article.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            self._apply(meta, initial, [row[0] for row in rows], np.stack([row[1] for row in rows]), stats)
+            meta["legacy_id"] = int(rows[-1][0])
+            self._write_meta(meta)
+
+        # Newly embedded and re-embedded rows, by (embedded_at, id), starting
+        # one overlap window behind the stored watermark.
+        if stats.appended:
+            initial = self.load()
+        after = None
+        if meta["embedded_at"] is not None:
+            overlap = timedelta(seconds=settings.embedding_store_sync_overlap_seconds)
+            after = (datetime.fromisoformat(meta["embedded_at"]) - overlap, 0)
+        while True:
+            query = select(Article.id, Article.embedding, Article.embedded_at).where(
+                Article.embedding.is_not(None), Article.embedded_at.is_not(None)
+            )
+            if after is not None:
+                query = query.where(tuple_(Article.embedded_at, Article.id) > tuple_(*after))
+            rows = session.execute(query.order_by(Article.embedded_at, Article.id).limit(batch_size)).all()
+            if not rows:
+                break
+            self._apply(meta, initial, [row[0] for row in rows], np.stack([row[1] for row in rows]), stats)
+            after = (rows[-1][2], int(rows[-1][0]))
+            # Rows inside the overlap never move the watermark backwards.
+            stored = meta["embedded_at"]
+            if stored is None or after > (datetime.fromisoformat(stored), meta["embedded_id"]):
+                meta["embedded_at"] = after[0].isoformat()
+                meta["embedded_id"] = after[1]
+            self._write_meta(meta)
+
+        return stats
+
+def get_embedding_store() -> EmbeddingStore | None:
+    """The configured store, or ``None`` when ``embedding_store_dir`` is unset."""
+    if not settings.embedding_store_dir:
+        return None
+    return EmbeddingStore(settings.embedding_store_dir)
@@ -0,0 +1,73 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor is URL-safe base64 of a small JSON object holding the sort key of
+the last row served plus a ``kind`` tag, so a token minted for one listing
+cannot be replayed against another.  Clients treat it as an opaque string and
+echo ``next_cursor`` back as ``cursor``.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    """The cursor is malformed or was issued for a different listing."""
+
+
+_INT = "int"
+_NUMBER = "number"
+_STR = "str"
+_DATE = "date"
+_OPTIONAL = "optional"
+
+# Required fields per cursor kind; every one must be present with this type.
+_CURSOR_FIELDS: dict[str, dict[str, tuple[str, ...]]] = {
+    "recent": {"id": (_INT,), "date": (_DATE, _OPTIONAL)},
+    "ranked": {"now": (_NUMBER,), "score": (_NUMBER,), "id": (_INT,)},
+    "stories": {"v": (_INT, _OPTIONAL), "pos": (_INT,), "key": (_STR,)},
+}
+
+
+def _valid_field(value: Any, types: tuple[str, ...]) -> bool:
+    if value is None:
+        return _OPTIONAL in types
+    if isinstance(value, bool):
+        return False
+    if _INT in types and isinstance(value, int):
+        return True
+    if _NUMBER in types and isinstance(value, (int, float)):
+        return math.isfinite(value)
+    if _STR in types and isinstance(value, str):
+        return True
+    if _DATE in types and isinstance(value, str):
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def encode_cursor(kind: str, **values: Any) -> str:
+    payload = json.dumps({"k": kind, **values}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, kind: str) -> dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if not isinstance(payload, dict) or payload.pop("k", None) != kind:
+        raise InvalidCursorError(f"Cursor was not issued for {kind!r} pagination")
+    for name, types in _CURSOR_FIELDS.get(kind, {}).items():
+        if name not in payload or not _valid_field(payload[name], types):
+            raise InvalidCursorError(f"Cursor field {name!r} is missing or invalid")
+    return payload
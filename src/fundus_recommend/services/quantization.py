@@ -0,0 +1,99 @@
+"""Quantized embedding matrices for threshold screening.
+
+Dedup only needs to know which pairs reach ``dedup_threshold``, so the
+candidate corpus can be held as float16 (2 bytes per component) or int8
+with one float32 scale per row (1 byte per component) instead of float32.
+NumPy has no fast int8 or float16 matrix product, so :meth:`scores`
+upcasts one bounded tile at a time to float32 and runs the BLAS product on
+that; the saving is in the resident matrix and in the bytes read per tile.
+Quantized scores are approximate: callers screen at ``threshold - margin``
+and re-check the survivors against the exact vectors.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+QuantizedDtype = Literal["float16", "int8"]
+
+_QUANTIZE_CHUNK_ROWS = 8192
+
+
+@dataclass
+class QuantizedMatrix:
+    """Row-quantized copy of an embedding matrix.
+
+    For ``int8`` each row is stored as ``rint(row * scale)`` with
+    ``scale = 127 / max(|row|)``; ``inverse_scales`` undo that in the
+    product.  ``float16`` rows need no scale.
+    """
+
+    codes: np.ndarray
+    inverse_scales: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.inverse_scales.nbytes if self.inverse_scales is not None else 0)
+
+    def scores(self, queries: np.ndarray, rows: slice | np.ndarray) -> np.ndarray:
+        """Approximate ``queries @ matrix[rows].T`` in float32."""
+        tile = self.codes[rows].astype(np.float32)
+        product = np.asarray(queries, dtype=np.float32) @ tile.T
+        if self.inverse_scales is not None:
+            product *= self.inverse_scales[rows]
+        return product
+
+
+def quantize(
+    vectors: Iterable[np.ndarray] | np.ndarray,
+    dtype: QuantizedDtype,
+    dim: int,
+    rows: np.ndarray | None = None,
+) -> QuantizedMatrix:
+    """Quantize *vectors* (an array, memory map or iterable of rows) chunk by chunk.
+
+    With *rows*, only those rows of the array are quantized, in that order.
+    Only one float32 chunk is materialized at a time, so quantizing a memory
+    map or a list of database rows never holds a second full-precision copy.
+    """
+    codes: list[np.ndarray] = []
+    inverse_scales: list[np.ndarray] = []
+    for chunk in _chunks(vectors, dim, rows):
+        if dtype == "float16":
+            codes.append(chunk.astype(np.float16))
+            continue
+        peak = np.abs(chunk).max(axis=1)
+        scale = np.where(peak > 0, 127.0 / np.where(peak > 0, peak, 1.0), 1.0).astype(np.float32)
+        codes.append(np.rint(chunk * scale[:, None]).astype(np.int8))
+        inverse_scales.append((1.0 / scale).astype(np.float32))
+
+    code_dtype = np.float16 if dtype == "float16" else np.int8
+    stacked = np.concatenate(codes) if codes else np.empty((0, dim), dtype=code_dtype)
+    if dtype == "float16":
+        return QuantizedMatrix(stacked)
+    return QuantizedMatrix(stacked, np.concatenate(inverse_scales) if inverse_scales else np.empty(0, dtype=np.float32))
+
+
+def _chunks(vectors: Iterable[np.ndarray] | np.ndarray, dim: int, rows: np.ndarray | None) -> Iterable[np.ndarray]:
+    if isinstance(vectors, np.ndarray):
+        total = len(vectors) if rows is None else len(rows)
+        for start in range(0, total, _QUANTIZE_CHUNK_ROWS):
+            stop = start + _QUANTIZE_CHUNK_ROWS
+            chunk = vectors[start:stop] if rows is None else vectors[rows[start:stop]]
+            yield np.asarray(chunk, dtype=np.float32).reshape(-1, dim)
+        return
+    batch: list[np.ndarray] = []
+    for row in vectors:
+        batch.append(row)
+        if len(batch) == _QUANTIZE_CHUNK_ROWS:
+            yield np.asarray(batch, dtype=np.float32).reshape(-1, dim)
+            batch = []
+    if batch:
+        yield np.asarray(batch, dtype=np.float32).reshape(-1, dim)
@@ -0,0 +1,161 @@
+"""Cache of query-text embeddings for search and topic recommendations.
+
+Search and recommendation requests re-encode the same short strings
+("latest news", preference topics, popular searches) over and over.  Vectors
+are kept in a bounded LRU keyed on the normalized query text, pre-warmed at
+API startup, and optionally persisted to ``query_embedding_cache_path`` so a
+restart does not start cold.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fundus_recommend.config import settings
+from fundus_recommend.models.db import UserPreference
+from fundus_recommend.services.embedding_batcher import embedding_batcher
+from fundus_recommend.services.embeddings import embed_texts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_TOPICS = ("latest news",)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for *text*: NFKC-normalized, case-folded, whitespace-collapsed."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+@dataclass
+class QueryEmbeddingStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries: int | None = None, path: str | None = None) -> None:
+        self.max_entries = max_entries if max_entries is not None else settings.query_embedding_cache_size
+        self.path = Path(path) if path else None
+        self._vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.stats = QueryEmbeddingStats()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def get(self, text: str) -> np.ndarray | None:
+        key = normalize_query(text)
+        vector = self._vectors.get(key)
+        if vector is None:
+            self.stats.misses += 1
+            return None
+        self._vectors.move_to_end(key)
+        self.stats.hits += 1
+        return vector
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        key = normalize_query(text)
+        self._vectors[key] = np.asarray(vector, dtype=np.float32)
+        self._vectors.move_to_end(key)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+            self.stats.evictions += 1
+
+    def warm(self, texts: list[str]) -> int:
+        """Encode every uncached text in *texts* with one batch; returns how many were added."""
+        missing = list(dict.fromkeys(key for key in map(normalize_query, texts) if key and key not in self._vectors))
+        if not missing:
+            return 0
+        for key, vector in zip(missing, embed_texts(missing)):
+            self.put(key, vector)
+        return len(missing)
+
+    def load(self) -> int:
+        """Load persisted vectors written for the current embedding model."""
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model"]) != settings.embedding_model:
+                    return 0
+                for key, vector in zip(data["keys"].tolist(), data["vectors"]):
+                    self.put(key, vector)
+                return len(data["keys"])
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("query_embedding_cache_load_failed path=%s error=%s", self.path, exc)
+            return 0
+
+    def save(self) -> None:
+        if self.path is None or not self._vectors:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as fh:
+                np.savez(
+                    fh,
+                    model=np.array(settings.embedding_model),
+                    keys=np.array(list(self._vectors)),
+                    vectors=np.stack(list(self._vectors.values())),
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning("query_embedding_cache_save_failed path=%s error=%s", self.path, exc)
+
+    def snapshot(self) -> dict[str, float]:
+        self.stats.entries = len(self._vectors)
+        lookups = self.stats.hits + self.stats.misses
+        return {**asdict(self.stats), "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0}
+
+
+query_embedding_cache = QueryEmbeddingCache(path=settings.query_embedding_cache_path)
+
+
+async def embed_query(text: str) -> np.ndarray:
+    """Cached query embedding; misses are encoded by the shared micro-batcher."""
+    vector = query_embedding_cache.get(text)
+    if vector is None:
+        vector = np.asarray(await embedding_batcher.embed(normalize_query(text)), dtype=np.float32)
+        query_embedding_cache.put(text, vector)
+    return vector
+
+
+async def embed_queries(texts: list[str]) -> list[np.ndarray]:
+    """Cached embeddings for several queries.
+
+    Misses are submitted to the micro-batcher together, so they are encoded
+    in a single ``model.encode`` call.
+    """
+    vectors: list[np.ndarray | None] = [query_embedding_cache.get(text) for text in texts]
+    missing = list(dict.fromkeys(normalize_query(text) for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        encoded = await asyncio.gather(*(embedding_batcher.embed(key) for key in missing))
+        encoded_by_key = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, encoded)}
+        for key, vector in encoded_by_key.items():
+            query_embedding_cache.put(key, vector)
+        vectors = [
+            vector if vector is not None else encoded_by_key[normalize_query(text)]
+            for text, vector in zip(texts, vectors)
+        ]
+    return vectors
+
+
+async def preference_topics(session: AsyncSession, limit: int = 1000) -> list[str]:
+    result = await session.execute(select(UserPreference.topic).distinct().limit(limit))
+    return [topic for topic in result.scalars().all() if topic]
@@ -41,6 +41,66 @@ def prominence_score(cluster_size: int, max_cluster_size: int) -> float:
     return math.log(1 + cluster_size) / math.log(1 + max_cluster_size)
 
 
+def epoch_seconds(dates: list[datetime | None]) -> np.ndarray:
+    """Convert datetimes to a float64 array of UTC epoch seconds (NaN for missing)."""
+    out = np.full(len(dates), np.nan)
+    for i, dt in enumerate(dates):
+        if dt is None:
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        out[i] = dt.timestamp()
+    return out
+
+
+def freshness_scores(publish_ts: np.ndarray, now_ts: float, half_life_hours: float) -> np.ndarray:
+    """Array form of :func:`freshness_score` over epoch seconds; NaN scores 0."""
+    ts = np.asarray(publish_ts, dtype=np.float64)
+    missing = np.isnan(ts)
+    age_hours = np.maximum((now_ts - np.where(missing, now_ts, ts)) / 3600.0, 0.0)
+    decay_rate = math.log(2) / half_life_hours
+    return np.where(missing, 0.0, np.exp(-decay_rate * age_hours))
+
+
+def _log_ratio_scores(values: np.ndarray, max_value: float, min_max: float) -> np.ndarray:
+    if max_value <= min_max:
+        return np.zeros(len(values))
+    return np.log1p(values) / math.log1p(max_value)
+
+
+def composite_scores_from_arrays(
+    publish_ts: np.ndarray,
+    views: np.ndarray,
+    weights: RankingWeights,
+    cluster_sizes: np.ndarray | None = None,
+    authorities: np.ndarray | None = None,
+    now_ts: float | None = None,
+) -> np.ndarray:
+    """Score candidates from parallel arrays with whole-array NumPy expressions.
+
+    *publish_ts* holds UTC epoch seconds (NaN when the date is unknown).
+    Produces the same values as :func:`composite_scores` without a Python
+    loop per candidate, so thousands of candidates score in well under a
+    millisecond.
+    """
+    if now_ts is None:
+        now_ts = datetime.now(timezone.utc).timestamp()
+
+    views = np.asarray(views, dtype=np.float64)
+    n = len(views)
+    if n == 0:
+        return np.zeros(0)
+
+    scores = weights.freshness * freshness_scores(publish_ts, now_ts, weights.half_life_hours)
+    scores += weights.engagement * _log_ratio_scores(views, float(views.max()), 0.0)
+    if cluster_sizes is not None and len(cluster_sizes):
+        sizes = np.asarray(cluster_sizes, dtype=np.float64)
+        scores += weights.prominence * _log_ratio_scores(sizes, float(sizes.max()), 1.0)
+    if authorities is not None and len(authorities):
+        scores += weights.authority * np.asarray(authorities, dtype=np.float64)
+    return scores
+
+
 def composite_scores(
     dates: list[datetime | None],
     views: list[int],
@@ -48,20 +108,13 @@ def composite_scores(
     cluster_sizes: list[int] | None = None,
     authorities: list[float] | None = None,
 ) -> np.ndarray:
-    now = datetime.now(timezone.utc)
-    n = len(dates)
-    scores = np.zeros(n)
-    max_views = max(views) if views else 0
-    max_cluster = max(cluster_sizes) if cluster_sizes else 1
-
-    for i in range(n):
-        f = freshness_score(dates[i], now, weights.half_life_hours)
-        e = engagement_score(views[i], max_views)
-        p = prominence_score(cluster_sizes[i], max_cluster) if cluster_sizes else 0.0
-        a = authorities[i] if authorities else 0.0
-        scores[i] = weights.freshness * f + weights.prominence * p + weights.authority * a + weights.engagement * e
-
-    return scores
+    return composite_scores_from_arrays(
+        epoch_seconds(dates),
+        np.asarray(views, dtype=np.float64),
+        weights,
+        np.asarray(cluster_sizes, dtype=np.float64) if cluster_sizes else None,
+        np.asarray(authorities, dtype=np.float64) if authorities else None,
+    )
 
 
 def mmr_rerank(
@@ -72,61 +125,52 @@ def mmr_rerank(
     lam: float = 0.3,
     cluster_ids: list[int | None] | None = None,
 ) -> list[int]:
+    """Greedy MMR selection of the first ``offset + page_size`` candidates.
+
+    Only the similarity row of each newly selected candidate is computed, so
+    memory stays O(n) instead of materializing the full n x n matrix.  Pairs
+    in the same dedup cluster are masked to zero similarity so same-story
+    coverage from different publishers isn't penalized.
+    """
     n = len(scores)
     if n == 0:
         return []
 
     k = min(offset + page_size, n)
 
-    # Normalize embeddings for dot-product similarity
-    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-    norms = np.where(norms == 0, 1, norms)
-    normed = embeddings / norms
+    # Normalize embeddings for dot-product similarity; float16 inputs are
+    # upcast so the accumulation happens in float32.
+    normed = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(normed, axis=1, keepdims=True)
+    normed = normed / np.where(norms == 0, 1, norms)
 
-    # Precompute NxN similarity matrix
-    sim_matrix = normed @ normed.T
-
-    # Zero out similarity between articles in the same dedup cluster
-    # so same-story coverage from different publishers isn't penalized
     if cluster_ids is not None:
-        for i in range(n):
-            if cluster_ids[i] is None:
-                continue
-            for j in range(i + 1, n):
-                if cluster_ids[j] == cluster_ids[i]:
-                    sim_matrix[i, j] = 0.0
-                    sim_matrix[j, i] = 0.0
+        has_cluster = np.array([cid is not None for cid in cluster_ids], dtype=bool)
+        cluster_codes = np.array([cid if cid is not None else 0 for cid in cluster_ids], dtype=np.int64)
 
     # Normalize scores to [0, 1]
+    scores = np.asarray(scores, dtype=np.float64)
     score_min = scores.min()
     score_max = scores.max()
     if score_max > score_min:
-        norm_scores = (scores - score_min) / (score_max - score_min)
+        relevance = lam * (scores - score_min) / (score_max - score_min)
     else:
-        norm_scores = np.ones(n)
+        relevance = np.full(n, lam)
 
     selected: list[int] = []
-    candidates = set(range(n))
-    max_sim_to_selected = np.full(n, -np.inf)
+    available = np.ones(n, dtype=bool)
+    # Max similarity to the selected set, clipped at 0.
+    penalty = np.zeros(n, dtype=np.float32)
 
     for _ in range(k):
-        best_idx = -1
-        best_val = -np.inf
-
-        for idx in candidates:
-            sim_penalty = max(max_sim_to_selected[idx], 0.0) if selected else 0.0
-            val = lam * norm_scores[idx] - (1 - lam) * sim_penalty
-            if val > best_val:
-                best_val = val
-                best_idx = idx
-
-        if best_idx == -1:
-            break
-
+        values = np.where(available, relevance - (1 - lam) * penalty, -np.inf)
+        best_idx = int(np.argmax(values))
         selected.append(best_idx)
-        candidates.discard(best_idx)
+        available[best_idx] = False
 
-        # Update max similarity to selected set
-        np.maximum(max_sim_to_selected, sim_matrix[best_idx], out=max_sim_to_selected)
+        sims = normed @ normed[best_idx]
+        if cluster_ids is not None and has_cluster[best_idx]:
+            sims[has_cluster & (cluster_codes == cluster_codes[best_idx])] = 0.0
+        np.maximum(penalty, sims, out=penalty)
 
     return selected[offset:]
@@ -0,0 +1,156 @@
+"""In-process cache for ranked feed responses.
+
+Ranked ``/articles`` and ``/stories`` pages are identical for every reader
+between scheduler cycles, so each API process keeps a bounded LRU of built
+responses (encoded JSON bodies or models) keyed on the endpoint and its
+filter tuple.  Entries are tagged with
+the ``feed_version`` watermark the scheduler bumps at the end of every cycle
+and are dropped once it moves, after ``feed_cache_ttl_seconds``, or when the
+byte budget is exceeded.  The watermark itself is re-read at most every
+``feed_cache_watermark_ttl_seconds``, so a warm cache does not touch Postgres.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fundus_recommend.config import settings
+from fundus_recommend.models.db import PipelineWatermark
+from fundus_recommend.services.watermarks import FEED_VERSION_WATERMARK
+
+T = TypeVar("T", bytes, BaseModel)
+
+
+@dataclass
+class ResultCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    watermark: int
+    expires_at: float
+    size: int
+
+
+class FeedResultCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        watermark_ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries if max_entries is not None else settings.feed_cache_max_entries
+        self.max_bytes = max_bytes if max_bytes is not None else settings.feed_cache_max_bytes
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.feed_cache_ttl_seconds
+        self.watermark_ttl_seconds = (
+            watermark_ttl_seconds if watermark_ttl_seconds is not None else settings.feed_cache_watermark_ttl_seconds
+        )
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._watermark: int | None = None
+        self._watermark_checked_at = float("-inf")
+        self.stats = ResultCacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    async def current_watermark(self, session: AsyncSession) -> int:
+        now = self._clock()
+        if self._watermark is None or now - self._watermark_checked_at >= self.watermark_ttl_seconds:
+            value = (
+                await session.execute(
+                    select(PipelineWatermark.value).where(PipelineWatermark.name == FEED_VERSION_WATERMARK)
+                )
+            ).scalar_one_or_none()
+            self._watermark = int(value or 0)
+            self._watermark_checked_at = now
+        return self._watermark
+
+    def get(self, key: Hashable, watermark: int) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        if entry.watermark != watermark:
+            self._drop(key)
+            self.stats.invalidations += 1
+            self.stats.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._drop(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, watermark: int, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = _Entry(value, watermark, self._clock() + self.ttl_seconds, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self._watermark = None
+
+    async def get_or_build(
+        self,
+        session: AsyncSession,
+        key: Hashable,
+        build: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return the cached response for *key*, building and storing it on a miss."""
+        if not self.enabled:
+            return await build()
+
+        watermark = await self.current_watermark(session)
+        cached = self.get(key, watermark)
+        if cached is not None:
+            return cached
+
+        response = await build()
+        size = len(response) if isinstance(response, bytes) else len(response.model_dump_json())
+        self.put(key, watermark, response, size)
+        return response
+
+    def snapshot(self) -> dict[str, int]:
+        self.stats.entries = len(self._entries)
+        self.stats.bytes = self._bytes
+        return asdict(self.stats)
+
+
+feed_result_cache = FeedResultCache()
@@ -0,0 +1,165 @@
+"""Pre-serialized JSON for article-bearing responses.
+
+List, story and recommendation responses used to validate every ORM row into
+an ``ArticleSummary`` and serialize the whole response tree on every request,
+and ``/stories`` serialized each lead article twice.  Instead, each article's
+summary JSON is encoded once, cached per worker keyed on its id and row
+version, and responses are assembled by splicing those fragments into a
+small envelope.  Fragments are produced by ``ArticleSummary`` itself, so the
+bytes match the pydantic path exactly; the envelope uses ``orjson`` when it
+is installed.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+from fastapi import Response
+
+from fundus_recommend.config import settings
+from fundus_recommend.models.schemas import ArticleSummary
+
+try:
+    import orjson
+except ImportError:  # optional: pip install fundus-recommend[perf]
+    orjson = None
+
+_ORJSON_FRAGMENT = getattr(orjson, "Fragment", None)
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+class JSONFragment:
+    """Already-encoded JSON embedded verbatim by :func:`dumps`."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+def _numpy_scalar(value: Any) -> Any:
+    # Scores computed with NumPy reach payloads as np.float32 / np.int64.
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps_scalar(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_numpy_scalar).encode("utf-8")
+
+
+def _assemble(value: Any) -> bytes:
+    if isinstance(value, JSONFragment):
+        return value.data
+    if isinstance(value, dict):
+        return b"{" + b",".join(_dumps_scalar(key) + b":" + _assemble(item) for key, item in value.items()) + b"}"
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(_assemble(item) for item in value) + b"]"
+    return _dumps_scalar(value)
+
+
+def _to_orjson(value: Any) -> Any:
+    if isinstance(value, JSONFragment):
+        return _ORJSON_FRAGMENT(value.data)
+    if isinstance(value, dict):
+        return {key: _to_orjson(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_orjson(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """Encode dicts, lists and JSON scalars, splicing :class:`JSONFragment` bytes in place."""
+    if _ORJSON_FRAGMENT is not None:
+        return orjson.dumps(_to_orjson(value), option=_ORJSON_OPTIONS)
+    return _assemble(value)
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def _row_version(article: Any) -> tuple:
+    # Columns the pipeline rewrites after insert (translation, dedup,
+    # categorization, date fixes); everything else in a summary is immutable.
+    return (article.title_en, article.dedup_cluster_id, article.category, article.publishing_date)
+
+
+@dataclass
+class ArticleJSONStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+
+class ArticleJSONCache:
+    def __init__(self, max_entries: int | None = None) -> None:
+        self.max_entries = max_entries if max_entries is not None else settings.article_json_cache_size
+        self._fragments: OrderedDict[int, tuple[tuple, JSONFragment]] = OrderedDict()
+        self.stats = ArticleJSONStats()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def fragment(self, article: Any) -> JSONFragment:
+        """Encoded ``ArticleSummary`` JSON for *article*, reused while its row version is unchanged."""
+        version = _row_version(article)
+        cached = self._fragments.get(article.id)
+        if cached is not None and cached[0] == version:
+            self._fragments.move_to_end(article.id)
+            self.stats.hits += 1
+            return cached[1]
+
+        self.stats.misses += 1
+        fragment = JSONFragment(ArticleSummary.model_validate(article).model_dump_json().encode("utf-8"))
+        if self.max_entries > 0:
+            self._fragments[article.id] = (version, fragment)
+            self._fragments.move_to_end(article.id)
+            while len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+                self.stats.evictions += 1
+        return fragment
+
+    def clear(self) -> None:
+        self._fragments.clear()
+
+    def snapshot(self) -> dict[str, float]:
+        self.stats.entries = len(self._fragments)
+        lookups = self.stats.hits + self.stats.misses
+        return {**asdict(self.stats), "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0}
+
+
+article_json_cache = ArticleJSONCache()
+
+
+def story_payload(story: Any, cache: ArticleJSONCache | None = None) -> dict[str, Any]:
+    """``NewsStory`` fields for a ranked story, with article fragments."""
+    if cache is None:
+        cache = article_json_cache
+    return {
+        "story_id": story.story_id,
+        "dedup_cluster_id": story.dedup_cluster_id,
+        "source_count": len(story.articles),
+        "lead_article": cache.fragment(story.lead_article),
+        "articles": [cache.fragment(article) for article in story.articles],
+    }
+
+
+def scored_article_payloads(results: Iterable[tuple[Any, float]]) -> list[dict[str, Any]]:
+    """``SearchResult`` fields for (article, score) pairs."""
+    return [
+        {"article": article_json_cache.fragment(article), "score": round(score, 4)} for article, score in results
+    ]
+
+
+def scored_story_payloads(results: Iterable[tuple[Any, float]]) -> list[dict[str, Any]]:
+    """``StoryRecommendationResult`` fields for (story, score) pairs."""
+    return [{"story": story_payload(story), "score": round(score, 4)} for story, score in results]
@@ -0,0 +1,143 @@
+"""Materialized story-ranking snapshots.
+
+The scheduler ranks the default story feed plus every single language and
+category filter once per cycle and stores the resulting ordering, so
+``GET /stories`` can serve a page with one indexed read instead of re-running
+the full ranking for every request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fundus_recommend.db.queries import rank_story_feed, story_snapshot_key
+from fundus_recommend.db.session import AsyncSessionLocal, async_engine
+from fundus_recommend.models.db import Article, StorySnapshot, StorySnapshotItem
+
+
+async def _snapshot_filters(session: AsyncSession) -> list[tuple[str | None, str | None]]:
+    """Return the (language, category) combinations worth materializing."""
+    languages = (
+        await session.execute(
+            select(Article.language)
+            .where(Article.language.is_not(None), Article.embedding.is_not(None))
+            .distinct()
+        )
+    ).scalars().all()
+    categories = (
+        await session.execute(
+            select(Article.category)
+            .where(Article.category.is_not(None), Article.embedding.is_not(None))
+            .distinct()
+        )
+    ).scalars().all()
+
+    filters: list[tuple[str | None, str | None]] = [(None, None)]
+    filters.extend((language, None) for language in sorted(languages) if language)
+    filters.extend((None, category) for category in sorted(categories) if category)
+    return filters
+
+
+async def materialize_story_snapshot(
+    session: AsyncSession,
+    *,
+    version: int,
+    watermark: datetime | None,
+    language: str | None = None,
+    category: str | None = None,
+) -> int:
+    """Rank one filter combination and replace its snapshot with *version*.
+
+    Returns the number of stories written.
+    """
+    filter_key = story_snapshot_key(language=language, category=category)
+    if filter_key is None:
+        return 0
+
+    ordered_story_keys, lead_by_story_key, final_score_by_story_key = await rank_story_feed(
+        session,
+        language=language,
+        category=category,
+    )
+
+    rows = [
+        {
+            "filter_key": filter_key,
+            "version": version,
+            "position": position,
+            "story_key": story_key,
+            "lead_article_id": lead_by_story_key[story_key].id,
+            "dedup_cluster_id": lead_by_story_key[story_key].dedup_cluster_id,
+            "score": float(final_score_by_story_key[story_key]),
+        }
+        for position, story_key in enumerate(ordered_story_keys)
+    ]
+    if rows:
+        await session.execute(insert(StorySnapshotItem), rows)
+
+    header = insert(StorySnapshot).values(
+        filter_key=filter_key,
+        version=version,
+        watermark=watermark,
+        total=len(rows),
+        generated_at=func.now(),
+    )
+    await session.execute(
+        header.on_conflict_do_update(
+            index_elements=[StorySnapshot.filter_key],
+            set_={
+                "version": header.excluded.version,
+                "watermark": header.excluded.watermark,
+                "total": header.excluded.total,
+                "generated_at": header.excluded.generated_at,
+            },
+        )
+    )
+    await session.execute(
+        delete(StorySnapshotItem).where(
+            StorySnapshotItem.filter_key == filter_key,
+            StorySnapshotItem.version != version,
+        )
+    )
+    await session.commit()
+    return len(rows)
+
+
+async def refresh_story_snapshots() -> tuple[int, int]:
+    """Materialize snapshots for every tracked filter combination.
+
+    Returns ``(filters_materialized, stories_written)``.
+    """
+    version = time.time_ns() // 1_000_000
+    filters_materialized = 0
+    stories_written = 0
+
+    try:
+        async with AsyncSessionLocal() as session:
+            watermark = (await session.execute(select(func.max(Article.crawled_at)))).scalar_one_or_none()
+            for language, category in await _snapshot_filters(session):
+                stories_written += await materialize_story_snapshot(
+                    session,
+                    version=version,
+                    watermark=watermark,
+                    language=language,
+                    category=category,
+                )
+                filters_materialized += 1
+    finally:
+        # Pooled asyncpg connections are bound to this event loop; drop them so
+        # the next scheduler cycle starts from a clean pool.
+        await async_engine.dispose()
+
+    return filters_materialized, stories_written
+
+
+def run_story_snapshot_refresh() -> tuple[int, int]:
+    """Synchronous entry point for the scheduler."""
+    return asyncio.run(refresh_story_snapshots())
@@ -0,0 +1,218 @@
+"""Write-behind buffering for article view events.
+
+``POST /articles/{id}/view`` used to load the full article row and commit a
+single-row INSERT per view.  :class:`ViewSink` instead acknowledges views
+immediately, buffers them in process, and flushes them with one multi-row
+INSERT when the buffer reaches ``view_sink_batch_size`` or every
+``view_sink_flush_interval_seconds``.  Article ids are validated against
+:class:`ArticleIdCache`, which remembers ids it has already confirmed with a
+primary-key-only lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError, StatementError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fundus_recommend.config import settings
+from fundus_recommend.db.session import AsyncSessionLocal
+from fundus_recommend.models.db import Article, ArticleView
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient(exc: StatementError) -> bool:
+    """Whether retrying the same rows later can succeed (lost connection, server restart)."""
+    return isinstance(exc, (OperationalError, InterfaceError)) or getattr(exc, "connection_invalidated", False)
+
+
+class ArticleIdCache:
+    """Bounded LRU of article ids confirmed to exist.
+
+    Misses are not cached: an id that does not exist yet may be inserted by
+    the next crawl, and a primary-key lookup for it is cheap anyway.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self._max_entries = max_entries
+        self._ids: OrderedDict[int, None] = OrderedDict()
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._ids
+
+    def add(self, article_id: int) -> None:
+        self._ids[article_id] = None
+        self._ids.move_to_end(article_id)
+        while len(self._ids) > self._max_entries:
+            self._ids.popitem(last=False)
+
+    def forget(self, article_ids: list[int]) -> None:
+        for article_id in article_ids:
+            self._ids.pop(article_id, None)
+
+    async def exists(self, session: AsyncSession, article_id: int) -> bool:
+        if article_id in self._ids:
+            self._ids.move_to_end(article_id)
+            return True
+
+        found = (
+            await session.execute(select(Article.id).where(Article.id == article_id))
+        ).scalar_one_or_none()
+        if found is None:
+            return False
+        self.add(article_id)
+        return True
+
+
+@dataclass
+class ViewSinkStats:
+    accepted: int = 0
+    flushed: int = 0
+    dropped: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+
+
+class ViewSink:
+    """In-process buffer that writes article views in bulk."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        batch_size: int | None = None,
+        flush_interval_seconds: float | None = None,
+        max_buffer: int | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.view_sink_batch_size
+        self.flush_interval_seconds = flush_interval_seconds or settings.view_sink_flush_interval_seconds
+        self.max_buffer = max_buffer or settings.view_sink_max_buffer
+        self.stats = ViewSinkStats()
+        self._buffer: list[dict[str, int | str]] = []
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and drain everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    def record(self, article_id: int, session_id: str) -> None:
+        """Buffer a view; never blocks on the database."""
+        if len(self._buffer) >= self.max_buffer:
+            self.stats.dropped += 1
+            return
+        self._buffer.append({"article_id": article_id, "session_id": session_id})
+        self.stats.accepted += 1
+        self.start()
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while await self.flush() and len(self._buffer) >= self.batch_size:
+                pass
+
+    async def flush(self) -> bool:
+        """Write up to ``batch_size`` buffered views; returns False on failure."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return True
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+
+            try:
+                written = await self._write(batch)
+            except Exception as exc:
+                self.stats.failed_flushes += 1
+                logger.warning("view_sink_flush_failed rows=%d error=%s", len(batch), exc)
+                # Put the batch back unless that would overflow the buffer.
+                room = self.max_buffer - len(self._buffer)
+                self._buffer[:0] = batch[:room]
+                self.stats.dropped += max(0, len(batch) - room)
+                return False
+
+            self.stats.flushes += 1
+            self.stats.flushed += written
+            self.stats.dropped += len(batch) - written
+            return True
+
+    async def _write(self, batch: list[dict[str, int | str]]) -> int:
+        """Insert *batch*; returns the number of rows written.
+
+        Transient errors propagate so :meth:`flush` keeps the batch for the
+        next attempt.  Any other statement error (e.g. ``DataError`` for a
+        value the column rejects) would fail again on every retry, so the
+        batch is split in halves until the offending rows are isolated and
+        dropped.
+        """
+        try:
+            return await self._insert(batch)
+        except StatementError as exc:
+            if _is_transient(exc):
+                raise
+            if len(batch) == 1:
+                logger.warning("view_sink_row_rejected article_id=%s error=%s", batch[0]["article_id"], exc)
+                return 0
+            middle = len(batch) // 2
+            return await self._write(batch[:middle]) + await self._write(batch[middle:])
+
+    async def _insert(self, batch: list[dict[str, int | str]]) -> int:
+        async with self._session_factory() as session:
+            try:
+                await session.execute(insert(ArticleView), batch)
+                await session.commit()
+                return len(batch)
+            except IntegrityError:
+                # An article was deleted after its id was cached; keep the rest.
+                await session.rollback()
+                ids = sorted({int(row["article_id"]) for row in batch})
+                existing = set(
+                    (await session.execute(select(Article.id).where(Article.id.in_(ids)))).scalars().all()
+                )
+                article_id_cache.forget([aid for aid in ids if aid not in existing])
+                kept = [row for row in batch if row["article_id"] in existing]
+                if kept:
+                    await session.execute(insert(ArticleView), kept)
+                    await session.commit()
+                return len(kept)
+
+article_id_cache = ArticleIdCache()
+_view_sink: ViewSink | None = None
+
+
+def get_view_sink() -> ViewSink:
+    global _view_sink
+    if _view_sink is None:
+        _view_sink = ViewSink(AsyncSessionLocal)
+    return _view_sink
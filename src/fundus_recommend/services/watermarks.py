@@ -0,0 +1,50 @@
+"""Named monotonic watermarks shared between the scheduler and the API.
+
+Each watermark is one row in ``pipeline_watermarks``.  The scheduler
+advances them as derived data is refreshed; readers use them as cheap
+primary-key lookups to decide whether cached or incremental state is stale.
+"""
+
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from fundus_recommend.models.db import PipelineWatermark
+
+# Unix time up to which article_views are counted into article_view_rollups.
+VIEW_ROLLUP_WATERMARK = "article_view_rollups_until"
+# Last articles.id folded into article_filter_counts.
+ARTICLE_COUNT_WATERMARK = "article_filter_counts"
+# Unix time of the last full article_filter_counts rebuild.
+ARTICLE_COUNT_REBUILT_WATERMARK = "article_filter_counts_rebuilt"
+# Unix time of the last full story_clusters rebuild; 0 until the first one.
+STORY_CLUSTERS_WATERMARK = "story_clusters_rebuilt"
+# Bumped at the end of every scheduler cycle; invalidates cached feeds.
+FEED_VERSION_WATERMARK = "feed_version"
+
+
+def get_watermark(session: Session, name: str) -> int:
+    value = session.execute(select(PipelineWatermark.value).where(PipelineWatermark.name == name)).scalar_one_or_none()
+    return int(value or 0)
+
+
+def set_watermark(session: Session, name: str, value: int) -> None:
+    stmt = insert(PipelineWatermark).values(name=name, value=value, updated_at=func.now())
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PipelineWatermark.name],
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+    )
+
+
+def bump_feed_version(session: Session) -> int:
+    """Advance the feed version to the current time in milliseconds."""
+    version = time.time_ns() // 1_000_000
+    set_watermark(session, FEED_VERSION_WATERMARK, version)
+    session.commit()
+    return version
@@ -20,6 +20,24 @@ class _FakeClient:
         return {"Body": io.BytesIO(self.get_payload)}
 
 
+class _MemoryClient:
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+
+    def put_object(self, **kwargs):
+        self.objects[kwargs["Key"]] = kwargs
+
+    def get_object(self, **kwargs):
+        stored = self.objects[kwargs["Key"]]
+        return {"Body": io.BytesIO(stored["Body"]), "Metadata": stored.get("Metadata", {})}
+
+
+NEWS_BODY = (
+    "WASHINGTON (Reuters) - The U.S. Federal Reserve held interest rates steady on Wednesday, "
+    "saying it would keep watching inflation data. Reporting by Jane Doe; Editing by John Smith. "
+) * 4
+
+
 class ArticleBodyStoreTests(unittest.TestCase):
     def test_build_body_key_is_deterministic(self) -> None:
         url = "https://example.com/news/abc"
@@ -72,5 +90,59 @@ class ArticleBodyStoreTests(unittest.TestCase):
                 store.get_body("articles/1/key.txt")
 
 
+
+class BodyCodecTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = _MemoryClient()
+        for p in (
+            patch("fundus_recommend.services.article_body_store._get_client", return_value=self.client),
+            patch.dict(store._dictionaries, clear=True),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_zlib_body_round_trips_and_records_codec(self) -> None:
+        store.put_body("articles/1/key.txt", NEWS_BODY, codec="zlib")
+
+        stored = self.client.objects["articles/1/key.txt"]
+        self.assertEqual(stored["Metadata"], {store.CODEC_METADATA_KEY: "zlib"})
+        self.assertLess(len(stored["Body"]), len(NEWS_BODY.encode("utf-8")) // 3)
+        self.assertEqual(store.get_body("articles/1/key.txt"), NEWS_BODY)
+
+    def test_identity_codec_writes_plain_text(self) -> None:
+        with patch.object(store.settings, "article_body_codec", "identity"):
+            store.put_body("articles/1/key.txt", "héllo")
+
+        stored = self.client.objects["articles/1/key.txt"]
+        self.assertEqual(stored["Body"], "héllo".encode("utf-8"))
+        self.assertEqual(stored["ContentType"], "text/plain; charset=utf-8")
+
+    def test_legacy_objects_without_metadata_decode_as_utf8(self) -> None:
+        self.client.objects["articles/1/key.txt"] = {"Body": "legacy body".encode("utf-8")}
+
+        self.assertEqual(store.get_body("articles/1/key.txt"), "legacy body")
+
+    def test_dictionary_version_is_loaded_for_encode_and_decode(self) -> None:
+        codec = store.get_codec("zlib")
+        dictionary = codec.train([NEWS_BODY.encode("utf-8"), NEWS_BODY.upper().encode("utf-8")] * 3, 4096)
+        store.put_dictionary("zlib", "v1", dictionary)
+
+        with patch.object(store.settings, "article_body_dict_version", "v1"):
+            store.put_body("articles/1/key.txt", NEWS_BODY, codec="zlib")
+        store._dictionaries.clear()
+
+        stored = self.client.objects["articles/1/key.txt"]
+        self.assertEqual(stored["Metadata"][store.DICTIONARY_METADATA_KEY], "v1")
+        self.assertEqual(store.get_body("articles/1/key.txt"), NEWS_BODY)
+
+    def test_corrupt_or_unknown_payloads_raise_store_error(self) -> None:
+        self.client.objects["a"] = {"Body": b"not zlib", "Metadata": {store.CODEC_METADATA_KEY: "zlib"}}
+        self.client.objects["b"] = {"Body": b"x", "Metadata": {store.CODEC_METADATA_KEY: "brotli"}}
+
+        for key in ("a", "b"):
+            with self.assertRaises(store.BodyStoreError):
+                store.get_body(key)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,128 @@
+import time
+import unittest
+from unittest.mock import AsyncMock
+
+from fundus_recommend.db.queries import count_articles
+from fundus_recommend.services.article_counts import refresh_article_counts
+
+
+class _FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def scalar_one(self):
+        return self._value
+
+    def one_or_none(self):
+        return self._value
+
+
+class _FakeSession:
+    def __init__(self, watermark, upper, rebuilt_at=0, folded=0):
+        self._select_values = [watermark, upper, rebuilt_at, folded]
+        self.statements: list[str] = []
+        self.committed = False
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        if getattr(statement, "is_select", False):
+            return _FakeResult(self._select_values.pop(0))
+        return _FakeResult(None)
+
+    def commit(self):
+        self.committed = True
+
+
+class RefreshArticleCountsTests(unittest.TestCase):
+    def test_empty_table_is_a_no_op(self) -> None:
+        session = _FakeSession(watermark=0, upper=None)
+
+        self.assertEqual(refresh_article_counts(session), 0)
+        self.assertFalse(session.committed)
+
+    def test_first_pass_rebuilds_from_scratch(self) -> None:
+        session = _FakeSession(watermark=0, upper=120, folded=118)
+
+        folded = refresh_article_counts(session, rebuild_interval_hours=24)
+
+        self.assertEqual(folded, 118)
+        self.assertTrue(session.committed)
+        self.assertTrue(any(sql.startswith("DELETE FROM article_filter_counts") for sql in session.statements))
+        rebuild = next(sql for sql in session.statements if sql.startswith("INSERT INTO article_filter_counts"))
+        self.assertNotIn("ON CONFLICT", rebuild)
+        self.assertIn("unnest(articles.topics)", rebuild)
+
+    def test_incremental_pass_adds_new_articles_to_existing_counts(self) -> None:
+        session = _FakeSession(watermark=100, upper=120, rebuilt_at=int(time.time()), folded=20)
+
+        folded = refresh_article_counts(session, rebuild_interval_hours=24)
+
+        self.assertEqual(folded, 20)
+        self.assertFalse(any(sql.startswith("DELETE") for sql in session.statements))
+        upsert = next(sql for sql in session.statements if sql.startswith("INSERT INTO article_filter_counts"))
+        self.assertIn("ON CONFLICT (dimension, value) DO UPDATE", upsert)
+        self.assertIn("article_filter_counts.total + excluded.total", upsert)
+
+    def test_stale_rebuild_watermark_forces_rebuild(self) -> None:
+        session = _FakeSession(watermark=100, upper=120, rebuilt_at=int(time.time()) - 2 * 3600, folded=120)
+
+        refresh_article_counts(session, rebuild_interval_hours=1)
+
+        self.assertTrue(any(sql.startswith("DELETE FROM article_filter_counts") for sql in session.statements))
+
+    def test_no_new_articles_leaves_watermark_untouched(self) -> None:
+        session = _FakeSession(watermark=120, upper=120, rebuilt_at=int(time.time()))
+
+        self.assertEqual(refresh_article_counts(session, rebuild_interval_hours=24), 0)
+        self.assertFalse(session.committed)
+
+
+class CountArticlesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_single_filter_reads_maintained_count(self) -> None:
+        session = AsyncMock()
+        session.execute.return_value = _FakeResult((950, 37))
+
+        total = await count_articles(session, publisher="Reuters")
+
+        self.assertEqual(total, 37)
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.await_args.args[0])
+        self.assertIn("article_filter_counts", sql)
+        self.assertNotIn("count(", sql)
+
+    async def test_missing_filter_value_counts_as_zero(self) -> None:
+        session = AsyncMock()
+        session.execute.return_value = _FakeResult((950, None))
+
+        self.assertEqual(await count_articles(session, topic="unknown"), 0)
+
+    async def test_unbuilt_table_falls_back_to_planner_estimate(self) -> None:
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeResult(None), _FakeResult((1000.0, 0.25))]
+
+        self.assertEqual(await count_articles(session), 1000)
+        session.execute.side_effect = [_FakeResult(None), _FakeResult((1000.0, 0.25))]
+        self.assertEqual(await count_articles(session, embedded_only=True), 750)
+
+    async def test_never_analyzed_table_falls_back_to_exact_count(self) -> None:
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeResult(None), _FakeResult((-1.0, None)), _FakeResult(12)]
+
+        self.assertEqual(await count_articles(session), 12)
+        self.assertIn("count(articles.id)", str(session.execute.await_args.args[0]))
+
+    async def test_exact_and_combined_filters_run_count_query(self) -> None:
+        for kwargs in ({"exact": True}, {"publisher": "Reuters", "language": "en"}):
+            session = AsyncMock()
+            session.execute.return_value = _FakeResult(4)
+
+            self.assertEqual(await count_articles(session, **kwargs), 4)
+            session.execute.assert_awaited_once()
+            self.assertIn("count(articles.id)", str(session.execute.await_args.args[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
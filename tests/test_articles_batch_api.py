@@ -0,0 +1,95 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from fundus_recommend.api import articles
+from fundus_recommend.db.queries import get_articles_by_ids
+from fundus_recommend.services.serialization import article_json_cache
+
+
+def _article(article_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=article_id,
+        url=f"https://example.com/{article_id}",
+        title=f"Title {article_id}",
+        title_en=None,
+        authors=["Reporter"],
+        topics=["news"],
+        publisher="Reuters",
+        language="en",
+        publishing_date=datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc),
+        cover_image_url=None,
+        dedup_cluster_id=None,
+        category="General",
+    )
+
+
+class _FakeScalarResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeExecuteResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return _FakeScalarResult(self._rows)
+
+
+class ArticlesBatchApiTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        article_json_cache.clear()
+
+    async def test_returns_summaries_in_request_order_with_missing_ids(self) -> None:
+        fetch = AsyncMock(return_value=[_article(7), _article(3)])
+
+        with patch("fundus_recommend.api.articles.get_articles_by_ids", fetch):
+            response = await articles.get_articles_batch("7, 99,3,7", session=AsyncMock())
+
+        fetch.assert_awaited_once()
+        self.assertEqual(fetch.await_args.args[1], [7, 99, 3])
+        payload = json.loads(response.body)
+        self.assertEqual([item["id"] for item in payload["items"]], [7, 3])
+        self.assertEqual(payload["missing_ids"], [99])
+
+    async def test_rejects_malformed_empty_and_oversized_requests(self) -> None:
+        too_many = ",".join(str(i) for i in range(articles.MAX_BATCH_IDS + 1))
+        for ids in ("1,abc", " , ", too_many):
+            with self.assertRaises(HTTPException) as exc:
+                await articles.get_articles_batch(ids, session=AsyncMock())
+            self.assertEqual(exc.exception.status_code, 400)
+
+    async def test_lookup_is_one_primary_key_query_without_body_or_embedding(self) -> None:
+        session = AsyncMock()
+        session.execute.return_value = _FakeExecuteResult([_article(2), _article(1)])
+
+        rows = await get_articles_by_ids(session, [1, 5, 2])
+
+        self.assertEqual([row.id for row in rows], [1, 2])
+        session.execute.assert_awaited_once()
+        sql = str(
+            session.execute.await_args.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        self.assertIn("articles.id IN (1, 5, 2)", sql)
+        self.assertNotIn("articles.body,", sql)
+        self.assertNotIn("articles.embedding", sql)
+
+    def test_batch_route_is_matched_before_article_id(self) -> None:
+        paths = [route.path for route in articles.router.routes]
+
+        self.assertLess(paths.index("/articles/batch"), paths.index("/articles/{article_id}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
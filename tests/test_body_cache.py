@@ -0,0 +1,113 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from fundus_recommend.services.article_body_store import BodyNotFoundError, BodyStoreError
+from fundus_recommend.services.body_cache import BodyCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BodyCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_hit_skips_loader(self) -> None:
+        cache = BodyCache(max_bytes=1024, disk_path="", negative_ttl_seconds=60)
+        loader = MagicMock(return_value="body")
+
+        self.assertEqual(await cache.get("articles/1/a.txt", loader), "body")
+        self.assertEqual(await cache.get("articles/1/a.txt", loader), "body")
+
+        loader.assert_called_once_with("articles/1/a.txt")
+        snapshot = cache.snapshot()
+        self.assertEqual((snapshot["memory_hits"], snapshot["loads"]), (1, 1))
+        self.assertEqual(snapshot["hit_rate"], 0.5)
+
+    async def test_loader_runs_off_the_event_loop(self) -> None:
+        cache = BodyCache(max_bytes=1024, disk_path="", negative_ttl_seconds=60)
+        loop_thread = threading.get_ident()
+        threads: list[int] = []
+
+        def loader(key: str) -> str:
+            threads.append(threading.get_ident())
+            return key
+
+        await cache.get("k", loader)
+
+        self.assertNotEqual(threads, [loop_thread])
+
+    async def test_memory_tier_is_byte_bounded(self) -> None:
+        cache = BodyCache(max_bytes=10, disk_path="", negative_ttl_seconds=60)
+
+        await cache.get("a", lambda key: "x" * 6)
+        await cache.get("b", lambda key: "y" * 6)
+        await cache.get("huge", lambda key: "z" * 11)
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.snapshot()["evictions"], 1)
+
+    async def test_disk_tier_survives_a_new_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            await BodyCache(max_bytes=1024, disk_path=tmp, negative_ttl_seconds=60).get("k", lambda key: "cached")
+            restarted = BodyCache(max_bytes=1024, disk_path=tmp, negative_ttl_seconds=60)
+            loader = MagicMock(side_effect=AssertionError("origin should not be read"))
+
+            self.assertEqual(await restarted.get("k", loader), "cached")
+            self.assertEqual(restarted.snapshot()["disk_hits"], 1)
+
+    async def test_disk_tier_evicts_oldest_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = BodyCache(max_bytes=0, disk_path=tmp, disk_max_bytes=10, negative_ttl_seconds=60)
+            await cache.get("a", lambda key: "x" * 6)
+            await cache.get("b", lambda key: "y" * 6)
+
+            snapshot = cache.snapshot()
+            self.assertEqual((snapshot["disk_entries"], snapshot["disk_evictions"]), (1, 1))
+
+    async def test_missing_keys_are_cached_negatively_until_ttl(self) -> None:
+        clock = _Clock()
+        cache = BodyCache(max_bytes=1024, disk_path="", negative_ttl_seconds=60, clock=clock)
+        loader = MagicMock(side_effect=BodyNotFoundError("gone"))
+
+        for _ in range(2):
+            with self.assertRaises(BodyNotFoundError):
+                await cache.get("k", loader)
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(cache.snapshot()["negative_hits"], 1)
+
+        clock.now = 61
+        with self.assertRaises(BodyNotFoundError):
+            await cache.get("k", loader)
+        self.assertEqual(loader.call_count, 2)
+
+    async def test_transient_errors_are_not_cached(self) -> None:
+        cache = BodyCache(max_bytes=1024, disk_path="", negative_ttl_seconds=60)
+        loader = MagicMock(side_effect=[BodyStoreError("timeout"), "body"])
+
+        with self.assertRaises(BodyStoreError):
+            await cache.get("k", loader)
+
+        self.assertEqual(await cache.get("k", loader), "body")
+        self.assertEqual(cache.snapshot()["errors"], 1)
+
+    async def test_concurrent_misses_share_one_fetch(self) -> None:
+        cache = BodyCache(max_bytes=1024, disk_path="", negative_ttl_seconds=60)
+        release = threading.Event()
+        loader = MagicMock(side_effect=lambda key: release.wait(5) and "body")
+
+        tasks = [asyncio.create_task(cache.get("k", loader)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(*tasks), ["body"] * 5)
+        loader.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -71,14 +71,15 @@ class ClassifyCliTests(unittest.TestCase):
 
         with patch("fundus_recommend.cli.classify.SyncSessionLocal", side_effect=fake_session_local), patch(
             "fundus_recommend.cli.classify.assign_category", side_effect=fake_assign_category
-        ):
+        ), patch("fundus_recommend.cli.classify.refresh_story_clusters") as refresh:
             total, counts = classify.classify_all_articles(batch_size=2)
 
         self.assertEqual(total, 3)
         self.assertEqual(counts["Technology"], 2)
         self.assertEqual(counts["General"], 1)
         self.assertEqual(fake_session.update_statements, 3)
-        self.assertEqual(fake_session.commit_calls, 2)
+        refresh.assert_called_once_with(fake_session)
+        self.assertEqual(fake_session.commit_calls, 3)
 
     def test_cli_prints_summary(self) -> None:
         runner = CliRunner()
@@ -86,10 +87,13 @@ class ClassifyCliTests(unittest.TestCase):
         with patch("fundus_recommend.cli.classify.Base.metadata.create_all"), patch(
             "fundus_recommend.cli.classify.classify_all_articles",
             return_value=(5, Counter({"Technology": 3, "General": 2})),
-        ):
+        ), patch("fundus_recommend.cli.classify.SyncSessionLocal"), patch(
+            "fundus_recommend.cli.classify.bump_feed_version"
+        ) as bump:
             result = runner.invoke(classify.main, ["--batch-size", "10"])
 
         self.assertEqual(result.exit_code, 0, msg=result.output)
+        bump.assert_called_once()
         self.assertIn("Done. Reclassified 5 articles.", result.output)
         self.assertIn("Technology: 3", result.output)
         self.assertIn("General assignments: 2", result.output)
@@ -0,0 +1,213 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from fundus_recommend.api.conditional import build_validators, conditional_get
+
+FEED_VERSION = 1_792_195_200_000
+
+
+CRAWLED_AT = datetime(2026, 10, 16, 23, 0, tzinfo=timezone.utc)
+
+
+class _FakeResult:
+    def __init__(self, value, data):
+        self._value = value
+        self._data = data
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def one(self):
+        return self._data
+
+
+def _session_factory(profile_updated_at=None, data=None):
+    """Session whose profile lookup returns *profile_updated_at* and whose
+    change-time query returns *data* (a mutable list, so tests can move it)."""
+    data = data if data is not None else [CRAWLED_AT, None]
+    session = AsyncMock()
+    session.execute.side_effect = lambda statement: _FakeResult(
+        profile_updated_at, data[: len(statement.selected_columns)]
+    )
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    return factory
+
+
+def _app(calls: list[str]) -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(conditional_get)
+
+    @app.get("/articles")
+    async def articles():
+        calls.append("articles")
+        return {"items": []}
+
+    @app.get("/feed/{user_id}")
+    async def feed(user_id: str):
+        calls.append(user_id)
+        return {"results": []}
+
+    @app.get("/articles/latest-timestamp")
+    async def latest():
+        calls.append("latest")
+        return {"latest_crawled_at": None}
+
+    @app.get("/articles/{article_id}")
+    async def article(article_id: int):
+        calls.append(f"article-{article_id}")
+        if article_id == 404:
+            return JSONResponse({"detail": "Article not found"}, status_code=404)
+        return {"id": article_id}
+
+    return app
+
+
+class BuildValidatorsTests(unittest.TestCase):
+    def test_etag_tracks_watermark_and_filter_tuple(self) -> None:
+        base = build_validators("/articles", [("publisher", "Reuters"), ("page", "1")], FEED_VERSION)
+
+        self.assertEqual(base, build_validators("/articles", [("page", "1"), ("publisher", "Reuters")], FEED_VERSION))
+        self.assertNotEqual(base.etag, build_validators("/articles", [("page", "2")], FEED_VERSION).etag)
+        bumped = build_validators("/articles", [("publisher", "Reuters"), ("page", "1")], FEED_VERSION + 1)
+        self.assertNotEqual(base.etag, bumped.etag)
+        self.assertTrue(base.etag.startswith('W/"'))
+        self.assertEqual(base.last_modified, datetime(2026, 10, 17, tzinfo=timezone.utc))
+
+    def test_data_change_times_move_validators(self) -> None:
+        base = build_validators("/articles", [], FEED_VERSION, data_updated_at=[CRAWLED_AT, None])
+        embedded = datetime(2026, 10, 17, 6, 0, tzinfo=timezone.utc)
+
+        after = build_validators("/articles", [], FEED_VERSION, data_updated_at=[CRAWLED_AT, embedded])
+
+        self.assertNotEqual(base.etag, after.etag)
+        self.assertEqual(after.last_modified, embedded)
+
+    def test_profile_update_changes_personalized_validators(self) -> None:
+        updated = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+        before = build_validators("/feed/u1", [], FEED_VERSION)
+        after = build_validators("/feed/u1", [], FEED_VERSION, updated)
+
+        self.assertNotEqual(before.etag, after.etag)
+        self.assertEqual(after.last_modified, updated)
+
+
+class ConditionalGetMiddlewareTests(unittest.TestCase):
+    def _client(self, calls, factory=None, feed_version=FEED_VERSION):
+        patches = [
+            patch("fundus_recommend.api.conditional.AsyncSessionLocal", factory or _session_factory()),
+            patch(
+                "fundus_recommend.api.conditional.feed_result_cache.current_watermark",
+                AsyncMock(return_value=feed_version),
+            ),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        return TestClient(_app(calls))
+
+    def test_matching_etag_returns_304_without_running_endpoint(self) -> None:
+        calls: list[str] = []
+        client = self._client(calls)
+
+        first = client.get("/articles", params={"sort": "ranked"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+
+        second = client.get("/articles", params={"sort": "ranked"}, headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["etag"], first.headers["etag"])
+        self.assertEqual(calls, ["articles"])
+
+    def test_stale_etag_or_other_filters_rebuild(self) -> None:
+        calls: list[str] = []
+        client = self._client(calls)
+        etag = client.get("/articles", params={"page": "1"}).headers["etag"]
+
+        other_page = client.get("/articles", params={"page": "2"}, headers={"If-None-Match": etag})
+        self.assertEqual(other_page.status_code, 200)
+        self.assertEqual(client.get("/articles", headers={"If-None-Match": 'W/"0-0"'}).status_code, 200)
+        self.assertEqual(len(calls), 3)
+
+    def test_if_modified_since(self) -> None:
+        calls: list[str] = []
+        client = self._client(calls)
+        last_modified = client.get("/articles").headers["last-modified"]
+
+        self.assertEqual(client.get("/articles", headers={"If-Modified-Since": last_modified}).status_code, 304)
+        older = "Thu, 01 Jan 2026 00:00:00 GMT"
+        self.assertEqual(client.get("/articles", headers={"If-Modified-Since": older}).status_code, 200)
+        self.assertEqual(client.get("/articles", headers={"If-Modified-Since": "garbage"}).status_code, 200)
+
+    def test_personalized_feed_reads_profile_version(self) -> None:
+        calls: list[str] = []
+        factory = _session_factory(profile_updated_at=datetime(2026, 10, 18, tzinfo=timezone.utc))
+        client = self._client(calls, factory)
+
+        response = client.get("/feed/u1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["last-modified"], "Sun, 18 Oct 2026 00:00:00 GMT")
+        # Profile version plus the data change times.
+        self.assertEqual(factory.return_value.__aenter__.return_value.execute.await_count, 2)
+
+    def test_out_of_cycle_crawl_invalidates_validators(self) -> None:
+        calls: list[str] = []
+        data = [CRAWLED_AT, None]
+        client = self._client(calls, _session_factory(data=data))
+        first = client.get("/articles", params={"sort": "recent"})
+
+        data[0] = datetime(2026, 10, 17, 9, 0, tzinfo=timezone.utc)  # fr-crawl inserted rows
+        second = client.get(
+            "/articles",
+            params={"sort": "recent"},
+            headers={"If-None-Match": first.headers["etag"], "If-Modified-Since": first.headers["last-modified"]},
+        )
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(calls), 2)
+
+    def test_recorded_views_alone_do_not_change_validators(self) -> None:
+        calls: list[str] = []
+        factory = _session_factory()
+        client = self._client(calls, factory)
+        ranked = client.get("/articles")
+        feed = client.get("/feed/u1")
+
+        # Views are inserted between polls; only a new feed_version may change ranked pages.
+        again = [
+            client.get("/articles", headers={"If-None-Match": ranked.headers["etag"]}),
+            client.get("/feed/u1", headers={"If-None-Match": feed.headers["etag"]}),
+        ]
+
+        self.assertEqual([response.status_code for response in again], [304, 304])
+        session = factory.return_value.__aenter__.return_value
+        statements = [str(call.args[0]) for call in session.execute.await_args_list]
+        self.assertFalse(any("article_views" in sql for sql in statements))
+
+    def test_wildcard_if_none_match_only_matches_existing_resources(self) -> None:
+        calls: list[str] = []
+        client = self._client(calls)
+
+        self.assertEqual(client.get("/articles/7", headers={"If-None-Match": "*"}).status_code, 304)
+        self.assertEqual(client.get("/articles/404", headers={"If-None-Match": "*"}).status_code, 404)
+        self.assertEqual(calls, ["article-7", "article-404"])
+
+    def test_unversioned_feed_and_other_paths_pass_through(self) -> None:
+        calls: list[str] = []
+        client = self._client(calls, feed_version=0)
+
+        self.assertNotIn("etag", client.get("/articles").headers)
+        self.assertNotIn("etag", client.get("/articles/latest-timestamp").headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
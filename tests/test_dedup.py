@@ -1,54 +1,95 @@
+import re
 import unittest
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from unittest.mock import patch
 
 import numpy as np
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
 
 from fundus_recommend.config import settings
-from fundus_recommend.services.dedup import run_dedup
+from fundus_recommend.services.dedup import _Corpus, _DisjointClusters, _neighbours, run_dedup
+from fundus_recommend.services.quantization import quantize
+
+PUBLISHED = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
 
 
 class _FakeResult:
-    def __init__(self, rows):
+    def __init__(self, rows, rowcount=0):
         self._rows = rows
+        self.rowcount = rowcount
 
     def all(self):
         return self._rows
 
 
 class _FakeSession:
-    def __init__(self, rows):
-        self._rows = rows
-        self.clear_called = 0
-        self.clear_value = "unset"
-        self.updates: dict[int, int | None] = {}
-        self.operations: list[tuple[str, int | None, int | None]] = []
+    """Answers the new-article and corpus selects; records the assignment UPDATEs.
+
+    ``updates`` maps article ids to clusters set by id; ``merges`` maps
+    cluster ids to the root they were merged into.  *fail_updates* raises a
+    deadlock for that many UPDATEs before they succeed.
+    """
+
+    def __init__(self, rows, new_ids=None, clusters=None, extra_selects=(), fail_updates=0):
+        self.clusters = dict(clusters or {})
+        new_ids = set(new_ids if new_ids is not None else [r[0] for r in rows])
+        self._selects = [
+            [(aid, PUBLISHED, vec) for aid, vec in rows if aid in new_ids],
+            [(aid, self.clusters.get(aid), vec) for aid, vec in rows],
+            *extra_selects,
+        ]
+        self.select_sql: list[str] = []
+        self.update_sql: list[str] = []
+        self.updates: dict[int, int] = {}
+        self.merges: dict[int, int] = {}
+        self.savepoints = 0
+        self.fail_updates = fail_updates
         self.committed = False
 
     def execute(self, statement):
         if getattr(statement, "is_select", False):
-            return _FakeResult(self._rows)
-
+            self.select_sql.append(
+                str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            )
+            return _FakeResult(self._selects.pop(0) if self._selects else [])
         if getattr(statement, "is_update", False):
-            value = next(iter(statement._values.values())).value
-            criterion = statement._where_criteria[0]
-            left_key = getattr(criterion.left, "key", None)
-
-            if left_key == "embedding":
-                self.clear_called += 1
-                self.clear_value = value
-                self.operations.append(("clear", None, value))
-            elif left_key == "id":
-                article_id = criterion.right.value
-                self.updates[article_id] = value
-                self.operations.append(("update", article_id, value))
-
+            if self.fail_updates:
+                self.fail_updates -= 1
+                raise OperationalError("UPDATE articles", {}, Exception("deadlock detected"))
+            sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            self.update_sql.append(sql)
+            pairs = {int(key): int(value) for key, value in re.findall(r"\((\d+), (\d+)\)", sql)}
+            if "AS merges" in sql:
+                self.merges.update(pairs)
+                return _FakeResult([], sum(1 for cid in self.clusters.values() if cid in pairs))
+            self.updates.update(pairs)
+            return _FakeResult([], len(pairs))
         return _FakeResult([])
 
+    @contextmanager
+    def begin_nested(self):
+        self.savepoints += 1
+        yield
+
+    def rollback(self):
+        raise AssertionError("a failed batch must only roll back its savepoint")
+
     def commit(self):
         self.committed = True
 
 
 class DedupeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        refresh = patch("fundus_recommend.services.dedup.refresh_story_clusters")
+        self.refresh = refresh.start()
+        self.addCleanup(refresh.stop)
+
+    def _run(self, session, new_ids, threshold, **kwargs) -> int:
+        with patch.object(settings, "dedup_threshold", threshold):
+            return run_dedup(session, new_ids, **kwargs)
+
     def test_transitive_chain_clusters_into_single_component(self) -> None:
         # Similarity chain:
         # 1~2 = 0.80, 2~3 = 0.80, 1~3 = 0.28  -> all should cluster together.
@@ -59,30 +100,24 @@ class DedupeTests(unittest.TestCase):
         ]
         session = _FakeSession(rows)
 
-        with patch.object(settings, "dedup_threshold", 0.75):
-            clustered = run_dedup(session)
+        clustered = self._run(session, [1, 2, 3], 0.75)
 
         self.assertEqual(clustered, 3)
-        self.assertEqual(session.clear_called, 1)
-        self.assertIsNone(session.clear_value)
-        self.assertEqual(session.operations[0][0], "clear")
         self.assertEqual(session.updates, {1: 1, 2: 1, 3: 1})
         self.assertTrue(session.committed)
+        self.refresh.assert_called_once_with(session, {1})
 
-    def test_stale_clusters_are_cleared_and_singletons_remain_unclustered(self) -> None:
+    def test_singletons_remain_unclustered_without_writes(self) -> None:
         rows = [
             (10, np.array([1.0, 0.0])),
             (11, np.array([0.0, 1.0])),
         ]
         session = _FakeSession(rows)
 
-        with patch.object(settings, "dedup_threshold", 0.90):
-            clustered = run_dedup(session)
+        clustered = self._run(session, [10, 11], 0.90)
 
         self.assertEqual(clustered, 0)
-        self.assertEqual(session.clear_called, 1)
-        self.assertIsNone(session.clear_value)
-        self.assertEqual(session.updates, {})
+        self.assertEqual(session.update_sql, [])
         self.assertTrue(session.committed)
 
     def test_threshold_sensitivity_changes_pair_clustering(self) -> None:
@@ -93,19 +128,200 @@ class DedupeTests(unittest.TestCase):
         ]
 
         low_session = _FakeSession(rows)
-        with patch.object(settings, "dedup_threshold", 0.70):
-            low_clustered = run_dedup(low_session)
-
-        self.assertEqual(low_clustered, 2)
+        self.assertEqual(self._run(low_session, [20, 21], 0.70), 2)
         self.assertEqual(low_session.updates, {20: 20, 21: 20})
 
         high_session = _FakeSession(rows)
-        with patch.object(settings, "dedup_threshold", 0.80):
-            high_clustered = run_dedup(high_session)
-
-        self.assertEqual(high_clustered, 0)
+        self.assertEqual(self._run(high_session, [20, 21], 0.80), 0)
         self.assertEqual(high_session.updates, {})
 
+    def test_bridging_article_merges_clusters_by_cluster_id(self) -> None:
+        left, right = np.array([1.0, 0.0]), np.array([0.0, 1.0])
+        bridge = np.array([0.7071, 0.7071])
+        rows = [(10, left), (11, left), (20, right), (21, right), (30, bridge)]
+        session = _FakeSession(rows, new_ids=[30], clusters={10: 10, 11: 10, 20: 20, 21: 20})
+        # Article 22 lost its embedding, so only the cluster-id UPDATE reaches it.
+        session.clusters[22] = 20
+
+        clustered = self._run(session, [30], 0.70)
+
+        self.assertEqual(clustered, 4)
+        self.assertEqual(session.merges, {20: 10})
+        self.assertEqual(session.updates, {30: 10})
+        merge_sql, assign_sql = session.update_sql
+        self.assertIn("SET dedup_cluster_id=merges.root FROM (VALUES (20, 10))", merge_sql)
+        self.assertIn("WHERE articles.dedup_cluster_id = merges.cluster_id", merge_sql)
+        self.assertIn("FROM (VALUES (30, 10)) AS assignments (id, cluster_id)", assign_sql)
+        self.refresh.assert_called_once_with(session, {10, 20})
+
+    def test_deadlocked_batch_is_retried_in_its_own_savepoint(self) -> None:
+        left, right = np.array([1.0, 0.0]), np.array([0.0, 1.0])
+        bridge = np.array([0.7071, 0.7071])
+        rows = [(10, left), (20, right), (30, bridge)]
+        session = _FakeSession(rows, new_ids=[30], clusters={10: 10, 20: 20}, fail_updates=1)
+
+        with patch("fundus_recommend.services.dedup.time.sleep"):
+            clustered = self._run(session, [30], 0.70)
+
+        self.assertEqual(clustered, 2)
+        self.assertEqual((session.merges, session.updates), ({20: 10}, {30: 10}))
+        self.assertEqual(session.savepoints, 3)
+        self.assertTrue(session.committed)
+
+    def test_later_merge_resolves_earlier_merges_to_the_same_root(self) -> None:
+        a, b, c = np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0])
+        rows = [
+            (5, c),
+            (10, a),
+            (20, b),
+            (30, (a + b) / np.sqrt(2)),  # joins clusters 10 and 20
+            (40, (b + c) / np.sqrt(2)),  # then joins that cluster with 5
+        ]
+        session = _FakeSession(rows, new_ids=[30, 40], clusters={5: 5, 10: 10, 20: 20})
+
+        clustered = self._run(session, [30, 40], 0.70)
+
+        self.assertEqual(clustered, 4)
+        self.assertEqual(session.merges, {10: 5, 20: 5})
+        self.assertEqual(session.updates, {30: 5, 40: 5})
+        self.refresh.assert_called_once_with(session, {5, 10, 20})
+
+    def test_clusters_at_the_size_cap_are_ignored(self) -> None:
+        vec = np.array([1.0, 0.0])
+        rows = [(1, vec), (2, vec), (3, vec)]
+        session = _FakeSession(rows, new_ids=[3], clusters={1: 1, 2: 1})
+
+        self.assertEqual(self._run(session, [3], 0.90, max_cluster_size=2), 0)
+        self.assertEqual(session.updates, {})
+
+
+    def test_corpus_is_limited_to_the_publishing_window(self) -> None:
+        rows = [(1, np.array([1.0, 0.0])), (2, np.array([1.0, 0.0]))]
+        session = _FakeSession(rows, new_ids=[2])
+
+        with patch.object(settings, "dedup_window_days", 3):
+            self._run(session, [2], 0.90)
+
+        self.assertIn(
+            "articles.publishing_date BETWEEN '2026-10-14 12:00:00+00:00' AND '2026-10-20 12:00:00+00:00'",
+            session.select_sql[1],
+        )
+        self.assertIn("articles.publishing_date IS NULL AND articles.crawled_at BETWEEN", session.select_sql[1])
+
+        unbounded = _FakeSession(rows, new_ids=[2])
+        with patch.object(settings, "dedup_window_days", 0):
+            self._run(unbounded, [2], 0.90)
+        self.assertNotIn("BETWEEN", unbounded.select_sql[1])
+
+
+    def test_quantized_scoring_without_a_store_falls_back_to_float32(self) -> None:
+        rows = [
+            (20, np.array([1.0, 0.0])),
+            (21, np.array([0.75, 0.6614378277661477])),
+        ]
+        session = _FakeSession(rows)
+
+        with patch.object(settings, "dedup_score_dtype", "int8"), self.assertLogs("fundus_recommend.services.dedup"):
+            clustered = self._run(session, [20, 21], 0.70)
+
+        self.assertEqual(clustered, 2)
+
+class NeighboursTests(unittest.TestCase):
+    def _corpus(self, new_blocks, blocks, n_new=20, n_corpus=500) -> _Corpus:
+        rng = np.random.default_rng(7)
+        vectors = rng.normal(size=(n_corpus, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        new_vectors = vectors[:n_new] + rng.normal(scale=0.05, size=(n_new, 16)).astype(np.float32)
+        return _Corpus(
+            new_ids=list(range(n_new)),
+            new_vectors=new_vectors,
+            new_blocks=np.asarray(new_blocks, dtype=np.int64),
+            ids=list(range(n_corpus)),
+            vectors=vectors,
+            blocks=np.asarray(blocks, dtype=np.int64),
+            cluster_of={},
+        )
+
+    def test_small_tiles_match_the_dense_product(self) -> None:
+        corpus = self._corpus(np.zeros(20), np.zeros(500))
+        dense = corpus.new_vectors @ corpus.vectors.T
+
+        tiled = _neighbours(corpus, 0.3, tile_bytes=4 * 1024 * 3)
+
+        for row, hits in enumerate(tiled):
+            np.testing.assert_array_equal(hits, np.flatnonzero(dense[row] >= 0.3))
+
+    def test_quantized_scoring_matches_the_exact_pass(self) -> None:
+        corpus = self._corpus(np.zeros(20), np.zeros(500))
+        expected = _neighbours(corpus, 0.3, tile_bytes=64 * 1024)
+
+        for dtype in ("float16", "int8"):
+            corpus.quantized = quantize(corpus.vectors, dtype, 16)
+            found = _neighbours(corpus, 0.3, tile_bytes=64 * 1024, margin=0.03)
+            for hits, exact_hits in zip(found, expected):
+                np.testing.assert_array_equal(hits, exact_hits)
+
+    def test_source_rows_select_a_window_of_the_memory_map(self) -> None:
+        expected = _neighbours(self._corpus(np.zeros(20), np.zeros(250), n_corpus=250), 0.3, tile_bytes=64 * 1024)
+        corpus = self._corpus(np.zeros(20), np.zeros(250), n_corpus=250)
+        # Corpus row k is row 2k of the stored matrix.
+        corpus.vectors = np.repeat(corpus.vectors, 2, axis=0)
+        corpus.source_rows = np.arange(0, 500, 2)
+        corpus.quantized = quantize(corpus.vectors, "int8", 16)
+
+        found = _neighbours(corpus, 0.3, tile_bytes=64 * 1024, margin=0.03)
+
+        for hits, exact_hits in zip(found, expected):
+            np.testing.assert_array_equal(hits, exact_hits)
+
+        found = _neighbours(corpus, 0.3, tile_bytes=64 * 1024, margin=0.03)
+
+        for hits, exact_hits in zip(found, expected):
+            np.testing.assert_array_equal(hits, exact_hits)
+
+    def test_rows_are_only_compared_within_their_block(self) -> None:
+        corpus = self._corpus(np.arange(20) % 2, np.r_[np.arange(20) % 2, np.full(480, -1)])
+
+        neighbours = _neighbours(corpus, 0.8, tile_bytes=64 * 1024 * 1024)
+
+        for row, hits in enumerate(neighbours):
+            self.assertIn(row, hits.tolist())
+            self.assertTrue(all(corpus.blocks[j] == row % 2 for j in hits))
+
+
+class QuantizeTests(unittest.TestCase):
+    def test_int8_rows_keep_per_row_scale_and_error_stays_small(self) -> None:
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(50, 384)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        matrix = quantize(vectors, "int8", 384, rows=np.arange(0, 50, 2))
+
+        self.assertEqual((matrix.codes.dtype, len(matrix)), (np.int8, 25))
+        self.assertEqual(matrix.nbytes, 25 * 384 + 25 * 4)
+        error = np.abs(matrix.scores(vectors[:5], slice(None)) - vectors[:5] @ vectors[::2].T)
+        self.assertLess(float(error.max()), 0.01)
+
+    def test_iterable_rows_and_zero_vectors(self) -> None:
+        rows = [np.zeros(4), np.array([0.5, -0.5, 0.5, -0.5])]
+
+        matrix = quantize(iter(rows), "int8", 4)
+
+        np.testing.assert_array_equal(matrix.codes, [[0, 0, 0, 0], [127, -127, 127, -127]])
+        self.assertEqual(quantize([], "float16", 4).codes.shape, (0, 4))
+
+
+class DisjointClustersTests(unittest.TestCase):
+    def test_union_keeps_smallest_id_as_root_and_sums_sizes(self) -> None:
+        clusters = _DisjointClusters([7, 7, 3, 9, None])
+
+        self.assertEqual(clusters.union(9, 7), 7)
+        self.assertEqual(clusters.union(9, 3), 3)
+        self.assertEqual(clusters.find(7), 3)
+        self.assertEqual(clusters.size(9), 4)
+        self.assertEqual(clusters.add(12), 12)
+        self.assertEqual(clusters.size(12), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+
+from fundus_recommend.services.embedding_batcher import EmbeddingBatcher
+
+
+class _RecordingEncoder:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self.threads: set[int] = set()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        self.calls.append(list(texts))
+        self.threads.add(threading.get_ident())
+        return np.array([[float(len(text)), 0.0] for text in texts], dtype=np.float32)
+
+
+class EmbeddingBatcherTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_queries_share_one_encode_call_off_the_loop(self) -> None:
+        encoder = _RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, window_ms=50, max_batch_size=16, max_queue=16)
+
+        vectors = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "ccc", "bb"]))
+        await batcher.stop()
+
+        self.assertEqual(encoder.calls, [["a", "bb", "ccc"]])
+        self.assertNotIn(threading.get_ident(), encoder.threads)
+        self.assertEqual([float(v[0]) for v in vectors], [1.0, 2.0, 3.0, 2.0])
+        snapshot = batcher.snapshot()
+        self.assertEqual(snapshot["batches"], 1)
+        self.assertEqual(snapshot["texts"], 4)
+        self.assertEqual(snapshot["max_batch_size"], 4)
+
+    async def test_batches_are_capped_at_max_batch_size(self) -> None:
+        encoder = _RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, window_ms=50, max_batch_size=2, max_queue=16)
+
+        await asyncio.gather(*(batcher.embed(f"q{i}") for i in range(5)))
+        await batcher.stop()
+
+        self.assertEqual([len(call) for call in encoder.calls], [2, 2, 1])
+
+    async def test_encode_failure_is_raised_to_every_waiter(self) -> None:
+        def _fail(_texts):
+            raise RuntimeError("model unavailable")
+
+        batcher = EmbeddingBatcher(_fail, window_ms=10, max_batch_size=8, max_queue=8)
+
+        results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+        await batcher.stop()
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(batcher.snapshot()["failed_batches"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
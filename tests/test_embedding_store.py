@@ -0,0 +1,236 @@
+import fcntl
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from fundus_recommend.config import settings
+from fundus_recommend.services.dedup import _load_corpus
+from fundus_recommend.services.embedding_store import EmbeddingStore, EmbeddingSyncStats
+from fundus_recommend.services.quantization import quantize
+
+T1 = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+T2 = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _vec(*values: float) -> np.ndarray:
+    return np.array(values, dtype=np.float32)
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    """Returns queued result sets in call order and records the SQL."""
+
+    def __init__(self, *results):
+        self._results = list(results)
+        self.statements: list[str] = []
+
+    def execute(self, statement):
+        self.statements.append(
+            str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        )
+        return _FakeResult(self._results.pop(0) if self._results else [])
+
+
+class EmbeddingStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = tmp.name
+
+    def _store(self, **kwargs) -> EmbeddingStore:
+        return EmbeddingStore(self.path, dim=3, model=kwargs.pop("model", "test-model"), **kwargs)
+
+    def _initial_sync(self, store: EmbeddingStore) -> None:
+        session = _FakeSession(
+            [(1, _vec(1, 0, 0)), (2, _vec(0, 1, 0))],  # legacy rows (no embedded_at)
+            [],
+            [(3, _vec(0, 0, 1), T1)],  # rows with embedded_at
+            [],
+        )
+        stats = store.sync(session, batch_size=2)
+        self.assertEqual((stats.appended, stats.updated, stats.rebuilt), (3, 0, True))
+
+    def test_initial_sync_builds_memory_mapped_matrix(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+
+        snapshot = store.load()
+
+        self.assertIsInstance(snapshot.vectors, np.memmap)
+        self.assertEqual(snapshot.ids.tolist(), [1, 2, 3])
+        np.testing.assert_array_equal(snapshot.vectors[2], _vec(0, 0, 1))
+        meta = json.loads((store.path / "meta.json").read_text())
+        self.assertEqual((meta["legacy_id"], meta["embedded_id"]), (2, 3))
+
+    def test_incremental_sync_appends_new_rows_and_overwrites_reembedded_ones(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+        session = _FakeSession([], [(2, _vec(0.5, 0.5, 0), T2), (4, _vec(1, 1, 1), T2)], [])
+
+        stats = store.sync(session)
+
+        self.assertEqual((stats.appended, stats.updated, stats.rebuilt), (1, 1, False))
+        # The keyset starts one overlap window behind the stored watermark.
+        self.assertIn("(articles.embedded_at, articles.id) > ('2026-10-16 11:55:00+00:00', 0)", session.statements[1])
+        snapshot = store.load()
+        self.assertEqual(snapshot.ids.tolist(), [1, 2, 3, 4])
+        np.testing.assert_array_equal(snapshot.vectors[snapshot.positions([2])[0]], _vec(0.5, 0.5, 0))
+
+    def test_sync_picks_up_rows_committed_behind_the_watermark(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+        # Article 4 was stamped before article 3 but committed after the last sync;
+        # article 3 is re-read from the overlap window.
+        late = T1 - timedelta(seconds=30)
+        session = _FakeSession([], [(4, _vec(1, 1, 0), late), (3, _vec(0, 0, 1), T1)], [])
+
+        stats = store.sync(session)
+
+        self.assertEqual((stats.appended, stats.updated), (1, 1))
+        snapshot = store.load()
+        self.assertEqual(snapshot.ids.tolist(), [1, 2, 3, 4])
+        meta = json.loads((store.path / "meta.json").read_text())
+        self.assertEqual((meta["embedded_at"], meta["embedded_id"]), (T1.isoformat(), 3))
+
+    def test_overlap_rows_do_not_move_the_watermark_back(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+
+        store.sync(_FakeSession([], [(2, _vec(0, 1, 0), T1 - timedelta(seconds=30))], []))
+
+        meta = json.loads((store.path / "meta.json").read_text())
+        self.assertEqual((meta["embedded_at"], meta["embedded_id"]), (T1.isoformat(), 3))
+
+    def test_sync_holds_an_exclusive_lock_on_the_store(self) -> None:
+        store = self._store()
+        held = []
+
+        def probe(session, batch_size):
+            with open(store.path / ".lock", "a") as fh:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    held.append(True)
+            return EmbeddingSyncStats()
+
+        with patch.object(store, "_sync", side_effect=probe):
+            store.sync(_FakeSession())
+
+        self.assertEqual(held, [True])
+
+    def test_model_change_rebuilds_store(self) -> None:
+        self._initial_sync(self._store())
+
+        store = self._store(model="other-model")
+        self.assertEqual(len(store.load()), 0)
+        stats = store.sync(_FakeSession([], [(9, _vec(1, 0, 0), T1)], []))
+
+        self.assertTrue(stats.rebuilt)
+        self.assertEqual(store.load().ids.tolist(), [9])
+
+    def test_float16_store_and_missing_ids(self) -> None:
+        store = self._store(dtype="float16")
+        self._initial_sync(store)
+        snapshot = store.load()
+
+        self.assertEqual(snapshot.vectors.dtype, np.float16)
+        self.assertEqual(snapshot.positions([3, 99, 1]).tolist(), [2, -1, 0])
+
+    def test_dedup_reads_vectors_from_store_and_skips_stale_rows(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+        # New-article rows, corpus rows (article 2 lost its embedding), then the store sync.
+        session = _FakeSession([(3, T1)], [(1, None), (3, 7)], [], [])
+
+        with (
+            patch("fundus_recommend.services.dedup.get_embedding_store", return_value=store),
+            patch.object(settings, "dedup_window_days", 0),
+        ):
+            corpus = _load_corpus(session, [2, 3])
+
+        self.assertEqual(corpus.new_ids, [3])
+        np.testing.assert_array_equal(corpus.new_vectors, [_vec(0, 0, 1)])
+        self.assertEqual(corpus.ids, [1, 2, 3])
+        self.assertIsInstance(corpus.vectors, np.memmap)
+        self.assertEqual(corpus.cluster_of, {1: None, 3: 7})
+        self.assertFalse(any("articles.embedding," in sql for sql in session.statements[:2]))
+
+    def test_windowed_dedup_gathers_only_corpus_rows_from_store(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+        session = _FakeSession([(3, T1)], [(2, 7), (3, None)], [(2, 7), (1, 7)], [], [])
+
+        with patch("fundus_recommend.services.dedup.get_embedding_store", return_value=store):
+            corpus = _load_corpus(session, [3])
+
+        self.assertEqual(corpus.ids, [2, 3])
+        # The window is a list of rows into the memory map, not a gathered copy.
+        self.assertIsInstance(corpus.vectors, np.memmap)
+        self.assertEqual(corpus.source_rows.tolist(), [1, 2])
+        np.testing.assert_array_equal(corpus.exact(np.arange(2)), [_vec(0, 1, 0), _vec(0, 0, 1)])
+        # Out-of-window members of a cluster in the window are still tracked.
+        self.assertEqual(corpus.cluster_of, {2: 7, 3: None, 1: 7})
+        self.assertIn("articles.publishing_date BETWEEN '2026-10-09 12:00:00+00:00'", session.statements[1])
+
+    def test_quantized_dedup_reads_codes_from_the_store(self) -> None:
+        store = self._store(quantized="int8")
+        self._initial_sync(store)
+        self.assertTrue((store.path / "codes.bin").exists())
+        session = _FakeSession([(3, T1)], [(1, None), (2, None), (3, None)], [], [])
+
+        with (
+            patch("fundus_recommend.services.dedup.get_embedding_store", return_value=store),
+            patch.object(settings, "dedup_window_days", 0),
+        ):
+            corpus = _load_corpus(session, [3])
+
+        self.assertIsInstance(corpus.quantized.codes, np.memmap)
+        self.assertEqual(corpus.quantized.codes.dtype, np.int8)
+        np.testing.assert_array_equal(corpus.quantized.codes[1], [0, 127, 0])
+        np.testing.assert_array_equal(corpus.exact(np.array([1])), [_vec(0, 1, 0)])
+
+    def test_sync_quantizes_only_the_rows_it_writes(self) -> None:
+        store = self._store(quantized="int8")
+        self._initial_sync(store)
+        # Article 2 is re-embedded and article 4 is new.
+        updated = [(2, _vec(0.6, 0.8, 0), T1), (4, _vec(0, 0, -1), T1)]
+
+        with patch("fundus_recommend.services.embedding_store.quantize", wraps=quantize) as spy:
+            store.sync(_FakeSession([], updated, []))
+
+        self.assertEqual(sum(len(call.args[0]) for call in spy.call_args_list), 2)
+        snapshot = store.load()
+        self.assertEqual(snapshot.ids.tolist(), [1, 2, 3, 4])
+        np.testing.assert_allclose(
+            snapshot.quantized.scores(np.eye(3, dtype=np.float32), slice(None)).T,
+            [_vec(1, 0, 0), _vec(0.6, 0.8, 0), _vec(0, 0, 1), _vec(0, 0, -1)],
+            atol=0.01,
+        )
+
+    def test_changing_the_score_dtype_requantizes_the_store(self) -> None:
+        store = self._store()
+        self._initial_sync(store)
+        self.assertIsNone(store.load().quantized)
+
+        store = self._store(quantized="float16")
+        store.sync(_FakeSession([], [], []))
+
+        snapshot = store.load()
+        self.assertEqual(snapshot.quantized.codes.dtype, np.float16)
+        self.assertEqual(len(snapshot.quantized), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ class _FakeArticle:
     url: str
     publishing_date: datetime | None
     crawled_at: datetime | None
+    dedup_cluster_id: int | None = None
 
 
 class _FakeScalarResult:
@@ -48,6 +49,9 @@ class _FakeSession:
             return _FakeResult(self.articles)
         return _FakeResult(self.articles)
 
+    def flush(self):
+        pass
+
     def commit(self):
         self.commit_counter["count"] += 1
 
@@ -81,6 +85,7 @@ class FixDatesCliTests(unittest.TestCase):
                 url="https://example.com/a",
                 publishing_date=datetime(2026, 6, 2, tzinfo=timezone.utc),
                 crawled_at=datetime(2026, 2, 6, 12, tzinfo=timezone.utc),
+                dedup_cluster_id=40,
             ),
             _FakeArticle(
                 id=2,
@@ -112,6 +117,7 @@ class FixDatesCliTests(unittest.TestCase):
                 url="https://example.com/a",
                 publishing_date=datetime(2026, 6, 2, tzinfo=timezone.utc),
                 crawled_at=datetime(2026, 2, 6, 12, tzinfo=timezone.utc),
+                dedup_cluster_id=40,
             ),
             _FakeArticle(
                 id=2,
@@ -126,11 +132,15 @@ class FixDatesCliTests(unittest.TestCase):
 
         with patch("fundus_recommend.cli.fix_dates.Base.metadata.create_all"), patch(
             "fundus_recommend.cli.fix_dates.SyncSessionLocal", side_effect=factory
-        ):
+        ), patch("fundus_recommend.cli.fix_dates.bump_feed_version") as bump, patch(
+            "fundus_recommend.cli.fix_dates.refresh_story_clusters"
+        ) as refresh:
             result = runner.invoke(fix_dates.main, ["--apply"])
 
         self.assertEqual(result.exit_code, 0, msg=result.output)
         self.assertIn("Updated 1 row(s).", result.output)
+        bump.assert_called_once()
+        self.assertEqual(refresh.call_args.args[1], {40})
         self.assertEqual(factory.commit_counter["count"], 1)
         self.assertEqual(articles[0].publishing_date, datetime(2026, 2, 6, tzinfo=timezone.utc))
         self.assertEqual(articles[1].publishing_date, datetime(2026, 2, 5, tzinfo=timezone.utc))
@@ -55,10 +55,10 @@ class _FakeSessionContext:
 
 
 class IngestBodyStorageTests(unittest.TestCase):
-    def _candidate(self) -> CrawlArticleCandidate:
+    def _candidate(self, suffix: str = "1") -> CrawlArticleCandidate:
         return CrawlArticleCandidate(
-            url="https://example.com/a1",
-            title="A1",
+            url=f"https://example.com/a{suffix}",
+            title=f"A{suffix}",
             body="Body content",
             publisher="Reuters",
             language="en",
@@ -81,7 +81,8 @@ class IngestBodyStorageTests(unittest.TestCase):
             inserted_ids = pipeline._insert_candidates([self._candidate()])
 
         self.assertEqual(inserted_ids, [100])
-        self.assertEqual(fake_session.commits, 1)
+        # One commit for the insert, one for the batch's storage keys.
+        self.assertEqual(fake_session.commits, 2)
         self.assertEqual(len(fake_session.added), 1)
         row = fake_session.added[0]
         self.assertEqual(row.body, "Body content")
@@ -124,6 +125,31 @@ class IngestBodyStorageTests(unittest.TestCase):
         self.assertEqual(row.body_storage_provider, "r2")
         self.assertEqual(row.body_storage_key, "articles/100/key.txt")
 
+    def test_insert_candidates_uploads_batch_and_commits_keys_once(self) -> None:
+        fake_session = _FakeSession(select_scalars=[None, None, None])
+
+        def put(key, _body):
+            if key == "articles/101/key.txt":
+                raise BodyStoreError("boom")
+
+        with (
+            patch("fundus_recommend.ingest.pipeline.SyncSessionLocal", return_value=_FakeSessionContext(fake_session)),
+            patch.object(pipeline.settings, "article_body_storage_mode", "r2_primary"),
+            patch.object(pipeline.settings, "article_body_upload_concurrency", 4),
+            patch(
+                "fundus_recommend.ingest.pipeline.build_body_key",
+                side_effect=lambda article_id, _url: f"articles/{article_id}/key.txt",
+            ),
+            patch("fundus_recommend.ingest.pipeline.put_body", side_effect=put) as put_mock,
+        ):
+            inserted_ids = pipeline._insert_candidates([self._candidate(str(i)) for i in range(3)])
+
+        self.assertEqual(inserted_ids, [100, 101, 102])
+        self.assertEqual(put_mock.call_count, 3)
+        self.assertEqual(fake_session.commits, 4)
+        self.assertEqual([row.body_storage_provider for row in fake_session.added], ["r2", "db", "r2"])
+        self.assertEqual([row.body is None for row in fake_session.added], [True, False, True])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,7 @@
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
 from fundus_recommend.cli import migrate_bodies
@@ -77,7 +80,7 @@ class MigrateBodiesCliTests(unittest.TestCase):
                 side_effect=[None, BodyStoreError("upload failed")],
             ),
         ):
-            stats = migrate_bodies.migrate_bodies(prune_db_body=True, max_errors=5)
+            stats = migrate_bodies.migrate_bodies(prune_db_body=True, max_errors=5, concurrency=1)
 
         self.assertEqual(stats["processed"], 2)
         self.assertEqual(stats["uploaded"], 1)
@@ -107,6 +110,75 @@ class MigrateBodiesCliTests(unittest.TestCase):
         self.assertEqual(second_run["processed"], 0)
         put_mock.assert_called_once()
 
+    def test_batch_uploads_commit_once_and_write_checkpoint(self) -> None:
+        rows = [(article_id, f"https://example.com/{article_id}", f"Body {article_id}") for article_id in range(1, 6)]
+        session = _FakeSession([rows, []])
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch("fundus_recommend.cli.migrate_bodies.SyncSessionLocal", return_value=_FakeSessionContext(session)),
+            patch(
+                "fundus_recommend.cli.migrate_bodies.build_body_key",
+                side_effect=lambda article_id, _url: f"articles/{article_id}/key.txt",
+            ),
+            patch("fundus_recommend.cli.migrate_bodies.put_body") as put_mock,
+        ):
+            checkpoint = Path(tmp) / "checkpoint.json"
+            stats = migrate_bodies.migrate_bodies(concurrency=4, checkpoint_path=str(checkpoint))
+            saved = json.loads(checkpoint.read_text())
+
+        self.assertEqual(stats["uploaded"], 5)
+        self.assertEqual(put_mock.call_count, 5)
+        self.assertEqual(session.commit_calls, 1)
+        self.assertEqual(
+            [params["body_storage_key"] for params in session.update_params],
+            [f"articles/{article_id}/key.txt" for article_id in range(1, 6)],
+        )
+        self.assertEqual(saved["last_id"], 5)
+
+    def test_checkpoint_stops_before_the_first_failed_upload(self) -> None:
+        batches = [
+            [(article_id, f"https://example.com/{article_id}", f"Body {article_id}") for article_id in (1, 2, 3)],
+            [(article_id, f"https://example.com/{article_id}", f"Body {article_id}") for article_id in (4, 5)],
+            [],
+        ]
+        session = _FakeSession(batches)
+
+        def put(key, _body, _codec):
+            if key == "articles/2/key.txt":
+                raise BodyStoreError("upload failed")
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch("fundus_recommend.cli.migrate_bodies.SyncSessionLocal", return_value=_FakeSessionContext(session)),
+            patch(
+                "fundus_recommend.cli.migrate_bodies.build_body_key",
+                side_effect=lambda article_id, _url: f"articles/{article_id}/key.txt",
+            ),
+            patch("fundus_recommend.cli.migrate_bodies.put_body", side_effect=put),
+        ):
+            checkpoint = Path(tmp) / "checkpoint.json"
+            stats = migrate_bodies.migrate_bodies(batch_size=3, concurrency=1, checkpoint_path=str(checkpoint))
+            saved = json.loads(checkpoint.read_text())
+
+        self.assertEqual((stats["uploaded"], stats["errors"], stats["last_id"]), (4, 1, 5))
+        # Later batches succeed, but a resumed run must still retry article 2.
+        self.assertEqual(saved["last_id"], 1)
+        self.assertEqual(saved["uploaded"], 4)
+
+    def test_checkpoint_sets_resume_point(self) -> None:
+        session = _FakeSession([[]])
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch("fundus_recommend.cli.migrate_bodies.SyncSessionLocal", return_value=_FakeSessionContext(session)),
+        ):
+            checkpoint = Path(tmp) / "checkpoint.json"
+            checkpoint.write_text(json.dumps({"last_id": 1234}))
+            stats = migrate_bodies.migrate_bodies(checkpoint_path=str(checkpoint))
+
+        self.assertEqual(stats["last_id"], 1234)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from fundus_recommend.db.queries import get_ranked_articles, list_articles
+from fundus_recommend.services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def _article(article_id: int, hour: int | None) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=article_id,
+        dedup_cluster_id=None,
+        publisher="Reuters",
+        publishing_date=datetime(2026, 2, 10, hour, 0, tzinfo=timezone.utc) if hour is not None else None,
+        category=None,
+    )
+
+
+class _FakeScalarResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeExecuteResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return _FakeScalarResult(self._rows)
+
+    def scalar_one(self):
+        return self._rows[0]
+
+    def all(self):
+        return self._rows
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class CursorTokenTests(unittest.TestCase):
+    def test_round_trip_is_opaque_and_url_safe(self) -> None:
+        token = encode_cursor("recent", date="2026-02-10T12:00:00+00:00", id=42)
+
+        self.assertNotIn("=", token)
+        self.assertNotIn("42", token)
+        self.assertEqual(decode_cursor(token, "recent"), {"date": "2026-02-10T12:00:00+00:00", "id": 42})
+
+    def test_rejects_garbage_and_foreign_cursors(self) -> None:
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor("not a cursor!", "recent")
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(encode_cursor("stories", pos=3), "recent")
+
+    def test_rejects_tampered_payloads(self) -> None:
+        tampered = [
+            ("recent", {"date": None}),
+            ("recent", {"date": "yesterday", "id": 4}),
+            ("recent", {"date": None, "id": "4"}),
+            ("recent", {"date": None, "id": True}),
+            ("ranked", {"now": 1.0, "id": 4}),
+            ("ranked", {"now": float("inf"), "score": 0.5, "id": 4}),
+            ("ranked", {"now": 1.0, "score": float("nan"), "id": 4}),
+            ("ranked", {"now": "1.0", "score": 0.5, "id": 4}),
+            ("stories", {"v": 1, "pos": 3, "key": ["a"]}),
+            ("stories", {"v": "1", "pos": 3, "key": "c:1"}),
+            ("stories", {"v": None, "key": "c:1"}),
+        ]
+        for kind, values in tampered:
+            with self.subTest(kind=kind, values=values), self.assertRaises(InvalidCursorError):
+                decode_cursor(encode_cursor(kind, **values), kind)
+
+    def test_accepts_every_issued_shape(self) -> None:
+        self.assertEqual(decode_cursor(encode_cursor("recent", date=None, id=4), "recent"), {"date": None, "id": 4})
+        decode_cursor(encode_cursor("ranked", now=1.5, score=0, id=4), "ranked")
+        decode_cursor(encode_cursor("stories", v=None, pos=0, key="a:1"), "stories")
+
+
+class RecentKeysetTests(unittest.IsolatedAsyncioTestCase):
+    async def test_tampered_cursor_is_rejected_before_querying(self) -> None:
+        session = AsyncMock()
+        cursor = encode_cursor("recent", date="2026-02-10T12:00:00+00:00")
+
+        with self.assertRaises(InvalidCursorError):
+            await list_articles(session, page=1, page_size=2, cursor=cursor, include_total=False)
+        session.execute.assert_not_awaited()
+
+    async def test_cursor_page_uses_keyset_instead_of_offset_and_count(self) -> None:
+        rows = [_article(9, 11), _article(8, 10), _article(7, 9)]
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeExecuteResult(rows)]
+        cursor = encode_cursor("recent", date="2026-02-10T12:00:00+00:00", id=10)
+
+        articles, total, next_cursor = await list_articles(
+            session, page=50, page_size=2, language="en", cursor=cursor, include_total=False
+        )
+
+        self.assertEqual([a.id for a in articles], [9, 8])
+        self.assertIsNone(total)
+        self.assertEqual(decode_cursor(next_cursor, "recent"), {"date": "2026-02-10T10:00:00+00:00", "id": 8})
+        sql = _sql(session.execute.await_args.args[0])
+        self.assertIn("(articles.publishing_date, articles.id) < ('2026-02-10 12:00:00+00:00', 10)", sql)
+        self.assertNotIn("OFFSET", sql)
+        self.assertIn("LIMIT 3", sql)
+
+    async def test_last_page_has_no_next_cursor(self) -> None:
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeExecuteResult([_article(1, None)])]
+
+        with patch("fundus_recommend.db.queries.count_articles", return_value=5):
+            articles, total, next_cursor = await list_articles(session, page=1, page_size=2)
+
+        self.assertEqual((len(articles), total, next_cursor), (1, 5, None))
+
+
+class RankedKeysetTests(unittest.IsolatedAsyncioTestCase):
+    async def _ranked_page(self, scores: np.ndarray, cursor: str | None, page_size: int = 2):
+        candidates = [_article(article_id, 12) for article_id in range(1, len(scores) + 1)]
+        session = AsyncMock()
+        # Ranking reads column projections; the page is then hydrated by id.
+        session.execute.side_effect = [_FakeExecuteResult(candidates), _FakeExecuteResult(candidates)]
+        with (
+            patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries.composite_scores_from_arrays", return_value=scores) as scores_mock,
+        ):
+            page = await get_ranked_articles(
+                session, page=1, page_size=page_size, cursor=cursor, include_total=False
+            )
+        candidate_sql = _sql(session.execute.await_args_list[0].args[0])
+        self.assertNotIn("articles.title", candidate_sql)
+        self.assertIn("articles.id IN", _sql(session.execute.await_args_list[1].args[0]))
+        return page, scores_mock.call_args.kwargs["now_ts"]
+
+    async def test_cursor_continues_score_order_with_pinned_clock(self) -> None:
+        scores = np.array([0.5, 0.9, 0.7, 0.7, 0.1])
+
+        (first, _total, cursor), now_ts = await self._ranked_page(scores, None)
+        (second, _total, cursor_2), pinned = await self._ranked_page(scores, cursor)
+        (third, _total, cursor_3), _ = await self._ranked_page(scores, cursor_2)
+
+        self.assertEqual([a.id for a in first], [2, 4])
+        self.assertEqual([a.id for a in second], [3, 1])
+        self.assertEqual([a.id for a in third], [5])
+        self.assertEqual(pinned, now_ts)
+        self.assertIsNone(cursor_3)
+
+    async def test_tied_scores_page_every_id_exactly_once(self) -> None:
+        scores = np.array([0.5] * 37 + [0.9, 0.1, 0.5, 0.5])
+
+        seen: list[int] = []
+        cursor = None
+        for _ in range(len(scores)):
+            (page, _total, cursor), _ = await self._ranked_page(scores, cursor, page_size=3)
+            seen.extend(a.id for a in page)
+            if cursor is None:
+                break
+
+        self.assertEqual(sorted(seen), list(range(1, len(scores) + 1)))
+        self.assertEqual(seen[0], 38)
+        self.assertEqual(seen[1:40], sorted(set(range(1, 42)) - {38, 39}, reverse=True))
+        self.assertEqual(seen[-1], 39)
+
+
+if __name__ == "__main__":
+    unittest.main()
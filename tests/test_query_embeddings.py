@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from fundus_recommend.services.query_embeddings import (
+    QueryEmbeddingCache,
+    embed_queries,
+    embed_query,
+    normalize_query,
+)
+
+
+def _fake_embed(texts):
+    return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+class QueryEmbeddingCacheTests(unittest.TestCase):
+    def test_normalize_query_folds_case_and_whitespace(self) -> None:
+        self.assertEqual(normalize_query("  Latest\tNEWS \n"), "latest news")
+        self.assertEqual(normalize_query("ｃｌｉｍａｔｅ"), "climate")
+
+    @patch("fundus_recommend.services.query_embeddings.embed_texts", side_effect=_fake_embed)
+    def test_warm_encodes_missing_topics_in_one_batch(self, mock_embed) -> None:
+        cache = QueryEmbeddingCache(max_entries=10)
+        cache.put("ai", np.zeros(2))
+
+        added = cache.warm(["AI", "Climate", "climate", "Sports", ""])
+
+        self.assertEqual(added, 2)
+        mock_embed.assert_called_once_with(["climate", "sports"])
+        self.assertEqual(len(cache), 3)
+
+    def test_lru_eviction_respects_max_entries(self) -> None:
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("a", np.zeros(2))
+        cache.put("b", np.zeros(2))
+        cache.get("a")
+        cache.put("c", np.zeros(2))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_persisted_vectors_round_trip_for_same_model(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "query_vectors.npz"
+            cache = QueryEmbeddingCache(max_entries=10, path=str(path))
+            cache.put("latest news", np.array([0.6, 0.8]))
+            cache.save()
+
+            restored = QueryEmbeddingCache(max_entries=10, path=str(path))
+            self.assertEqual(restored.load(), 1)
+            np.testing.assert_allclose(restored.get("Latest News"), [0.6, 0.8])
+
+            with patch("fundus_recommend.services.query_embeddings.settings.embedding_model", "other-model"):
+                self.assertEqual(QueryEmbeddingCache(max_entries=10, path=str(path)).load(), 0)
+
+
+class EmbedQueryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_equivalent_queries_are_encoded_once(self) -> None:
+        cache = QueryEmbeddingCache(max_entries=10)
+        batcher = AsyncMock()
+        batcher.embed.return_value = np.array([0.6, 0.8])
+
+        with (
+            patch("fundus_recommend.services.query_embeddings.query_embedding_cache", cache),
+            patch("fundus_recommend.services.query_embeddings.embedding_batcher", batcher),
+        ):
+            first = await embed_query("Latest News")
+            second = await embed_query("latest   news")
+
+        np.testing.assert_array_equal(first, second)
+        batcher.embed.assert_awaited_once_with("latest news")
+        snapshot = cache.snapshot()
+        self.assertEqual((snapshot["hits"], snapshot["misses"]), (1, 1))
+        self.assertEqual(snapshot["hit_rate"], 0.5)
+
+    async def test_embed_queries_submits_only_distinct_misses(self) -> None:
+        cache = QueryEmbeddingCache(max_entries=10)
+        cache.put("ai", np.array([1.0, 0.0]))
+        batcher = AsyncMock()
+        batcher.embed.side_effect = lambda text: np.array([float(len(text)), 0.0])
+
+        with (
+            patch("fundus_recommend.services.query_embeddings.query_embedding_cache", cache),
+            patch("fundus_recommend.services.query_embeddings.embedding_batcher", batcher),
+        ):
+            vectors = await embed_queries(["AI", "Climate", "climate "])
+
+        self.assertEqual([call.args[0] for call in batcher.embed.await_args_list], ["climate"])
+        self.assertEqual([float(v[0]) for v in vectors], [1.0, 7.0, 7.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
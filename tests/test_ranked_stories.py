@@ -5,7 +5,8 @@ from unittest.mock import AsyncMock, patch
 
 import numpy as np
 
-from fundus_recommend.db.queries import get_ranked_stories
+from fundus_recommend.db.queries import get_ranked_stories, story_snapshot_key
+from fundus_recommend.services.pagination import decode_cursor, encode_cursor
 
 
 def _article(article_id: int, cluster_id: int | None, publisher: str, hour: int) -> SimpleNamespace:
@@ -14,6 +15,7 @@ def _article(article_id: int, cluster_id: int | None, publisher: str, hour: int)
         dedup_cluster_id=cluster_id,
         publisher=publisher,
         publishing_date=datetime(2026, 2, 10, hour, 0, tzinfo=timezone.utc),
+        category=None,
     )
 
 
@@ -32,6 +34,9 @@ class _FakeExecuteResult:
     def scalars(self):
         return _FakeScalarResult(self._rows)
 
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
     def all(self):
         return self._rows
 
@@ -75,14 +80,16 @@ class RankedStoriesTests(unittest.IsolatedAsyncioTestCase):
         ]
 
         with (
+            patch("fundus_recommend.db.queries.get_story_snapshot_page", return_value=None),
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch("fundus_recommend.db.queries._fetch_top_cluster_articles", return_value=[]),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.80, 0.90, 0.99, 0.20, 0.10, 0.95]),
             ),
         ):
-            stories, total = await get_ranked_stories(session, page=1, page_size=5)
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=5)
 
         # All three clusters now appear (cluster:300 is a single-source story)
         self.assertEqual(total, 3)
@@ -125,14 +132,16 @@ class RankedStoriesTests(unittest.IsolatedAsyncioTestCase):
         ]
 
         with (
+            patch("fundus_recommend.db.queries.get_story_snapshot_page", return_value=None),
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch("fundus_recommend.db.queries._fetch_top_cluster_articles", return_value=[]),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.95, 0.94, 0.93, 0.40, 0.30]),
             ),
         ):
-            stories, total = await get_ranked_stories(session, page=1, page_size=5)
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=5)
 
         # All three clusters included: 400 (Tier 1 lead + coverage), 600 (most sources), 500
         self.assertEqual(total, 3)
@@ -162,17 +171,21 @@ class RankedStoriesTests(unittest.IsolatedAsyncioTestCase):
             _FakeExecuteResult(candidates),
             _FakeExecuteResult(cluster_articles),
             _FakeExecuteResult(cluster_articles),
+            # Standalone leads are hydrated for the page.
+            _FakeExecuteResult(candidates[:2]),
         ]
 
         with (
+            patch("fundus_recommend.db.queries.get_story_snapshot_page", return_value=None),
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch("fundus_recommend.db.queries._fetch_top_cluster_articles", return_value=[]),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.90, 0.80, 0.85, 0.70]),
             ),
         ):
-            stories, total = await get_ranked_stories(session, page=1, page_size=5)
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=5)
 
         self.assertEqual(total, 3)
         story_ids = [story.story_id for story in stories]
@@ -185,6 +198,140 @@ class RankedStoriesTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(standalone.articles), 1)
         self.assertEqual(standalone.lead_article.id, 20)
 
+    async def test_story_clusters_supply_size_and_stored_lead(self) -> None:
+        """Clusters summarized in story_clusters are not loaded member by member;
+        the stored lead wins when no candidate is from the cluster's best tier."""
+        candidates = [
+            _article(1, 100, "Politico", 12),
+            _article(2, 100, "Local Outlet A", 11),
+            _article(8, None, "Reuters", 9),
+        ]
+        stored_lead = _article(3, 100, "Reuters", 10)
+        summaries = {
+            100: SimpleNamespace(cluster_id=100, size=6, tier_1_count=1, tier_2_count=1, lead_article_id=3),
+        }
+
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _FakeExecuteResult(candidates),
+            _FakeExecuteResult([stored_lead]),
+            _FakeExecuteResult([stored_lead, *candidates[:2]]),
+            _FakeExecuteResult([candidates[2]]),
+        ]
+
+        with (
+            patch("fundus_recommend.db.queries.get_story_snapshot_page", return_value=None),
+            patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value=summaries) as summaries_mock,
+            patch("fundus_recommend.db.queries._fetch_top_cluster_articles", return_value=[]),
+            patch(
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
+                return_value=np.array([0.90, 0.80, 0.70]),
+            ),
+        ):
+            stories, total, _next_cursor = await get_ranked_stories(session, page=1, page_size=5)
+
+        summaries_mock.assert_awaited_once_with(session, [100])
+        self.assertEqual(session.execute.await_count, 4)
+        self.assertEqual(total, 2)
+        cluster_story = next(story for story in stories if story.story_id == "cluster:100")
+        self.assertEqual(cluster_story.lead_article.id, 3)
+        self.assertEqual([article.id for article in cluster_story.articles], [3, 1, 2])
+
+    async def test_get_ranked_stories_serves_fresh_snapshot_without_ranking(self) -> None:
+        snapshot = SimpleNamespace(version=7, total=2, generated_at=datetime.now(timezone.utc))
+        lead_a = _article(30, 900, "Reuters", 12)
+        lead_b = _article(31, None, "Politico", 11)
+        cluster_articles = [lead_a, _article(32, 900, "Local Outlet F", 10)]
+
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _FakeExecuteResult([snapshot]),
+            _FakeExecuteResult([("cluster:900", lead_a, 0), ("article:31", lead_b, 1)]),
+            _FakeExecuteResult(cluster_articles),
+        ]
+
+        with patch("fundus_recommend.db.queries.rank_story_feed") as rank_mock:
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=5, category="Business")
+
+        rank_mock.assert_not_called()
+        self.assertEqual(total, 2)
+        self.assertEqual([story.story_id for story in stories], ["cluster:900", "article:31"])
+        self.assertEqual([article.id for article in stories[0].articles], [30, 32])
+
+    async def test_snapshot_cursor_resumes_after_story_in_newer_version(self) -> None:
+        snapshot = SimpleNamespace(version=8, total=40, generated_at=datetime.now(timezone.utc))
+        leads = [_article(40 + i, None, "Reuters", 12) for i in range(3)]
+
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _FakeExecuteResult([snapshot]),
+            _FakeExecuteResult([(f"article:{lead.id}", lead, 20 + i) for i, lead in enumerate(leads)]),
+        ]
+        cursor = encode_cursor("stories", v=7, pos=19, key="cluster:900")
+
+        stories, total, next_cursor = await get_ranked_stories(session, page=9, page_size=2, cursor=cursor)
+
+        page_sql = str(session.execute.await_args_list[1].args[0])
+        self.assertIn("coalesce", page_sql)
+        self.assertEqual(total, 40)
+        self.assertEqual([story.story_id for story in stories], ["article:40", "article:41"])
+        self.assertEqual(decode_cursor(next_cursor, "stories"), {"v": 8, "pos": 21, "key": "article:41"})
+
+    async def test_get_ranked_stories_ranks_live_when_snapshot_is_stale(self) -> None:
+        snapshot = SimpleNamespace(version=7, total=2, generated_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeExecuteResult([snapshot])]
+
+        with patch(
+            "fundus_recommend.db.queries.rank_story_feed",
+            return_value=([], {}, {}),
+        ) as rank_mock:
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=5)
+
+        rank_mock.assert_awaited_once()
+        self.assertEqual((stories, total, next_cursor), ([], 0, None))
+
+    async def test_get_ranked_stories_diversify_reranks_live_by_lead_embedding(self) -> None:
+        leads = {
+            "cluster:100": _article(1, 100, "Reuters", 12),
+            "cluster:200": _article(2, 200, "Politico", 11),
+            "cluster:300": _article(3, 300, "Reuters", 10),
+        }
+        scores = {"cluster:100": 0.9, "cluster:200": 0.8, "cluster:300": 0.1}
+        embedding = np.zeros(384, dtype=np.float32)
+        embedding[0] = 1.0
+        orthogonal = np.zeros(384, dtype=np.float32)
+        orthogonal[1] = 1.0
+
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _FakeExecuteResult([(1, embedding), (2, embedding), (3, orthogonal)]),
+            _FakeExecuteResult(list(leads.values())),
+        ]
+
+        with (
+            patch("fundus_recommend.db.queries.get_story_snapshot_page") as snapshot_mock,
+            patch(
+                "fundus_recommend.db.queries.rank_story_feed",
+                return_value=(list(leads), leads, scores),
+            ),
+        ):
+            stories, total, next_cursor = await get_ranked_stories(session, page=1, page_size=3, diversify=True)
+
+        snapshot_mock.assert_not_called()
+        self.assertEqual(total, 3)
+        self.assertEqual([story.story_id for story in stories], ["cluster:100", "cluster:300", "cluster:200"])
+
+    def test_story_snapshot_key_only_covers_materialized_filters(self) -> None:
+        self.assertEqual(story_snapshot_key(), "all")
+        self.assertEqual(story_snapshot_key(language="en"), "language:en")
+        self.assertEqual(story_snapshot_key(category="Sports"), "category:Sports")
+        self.assertIsNone(story_snapshot_key(publisher="Reuters"))
+        self.assertIsNone(story_snapshot_key(topic="ai"))
+        self.assertIsNone(story_snapshot_key(language="en", category="Sports"))
+
 
 if __name__ == "__main__":
     unittest.main()
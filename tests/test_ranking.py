@@ -0,0 +1,140 @@
+import math
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from fundus_recommend.services.ranking import (
+    RankingWeights,
+    composite_scores,
+    composite_scores_from_arrays,
+    engagement_score,
+    epoch_seconds,
+    freshness_score,
+    mmr_rerank,
+    prominence_score,
+)
+
+
+def _reference_scores(dates, views, weights, cluster_sizes, authorities, now):
+    max_views = max(views) if views else 0
+    max_cluster = max(cluster_sizes) if cluster_sizes else 1
+    return np.array(
+        [
+            weights.freshness * freshness_score(dates[i], now, weights.half_life_hours)
+            + weights.prominence * prominence_score(cluster_sizes[i], max_cluster)
+            + weights.authority * authorities[i]
+            + weights.engagement * engagement_score(views[i], max_views)
+            for i in range(len(dates))
+        ]
+    )
+
+
+def _reference_mmr(scores, embeddings, page_size, offset, lam, cluster_ids):
+    """The pre-vectorization MMR loop."""
+    n = len(scores)
+    k = min(offset + page_size, n)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normed = embeddings / np.where(norms == 0, 1, norms)
+    sim_matrix = normed @ normed.T
+    if cluster_ids is not None:
+        for i in range(n):
+            if cluster_ids[i] is None:
+                continue
+            for j in range(i + 1, n):
+                if cluster_ids[j] == cluster_ids[i]:
+                    sim_matrix[i, j] = 0.0
+                    sim_matrix[j, i] = 0.0
+    norm_scores = (scores - scores.min()) / (scores.max() - scores.min())
+    selected: list[int] = []
+    candidates = list(range(n))
+    max_sim = np.full(n, -np.inf)
+    for _ in range(k):
+        best_idx, best_val = -1, -np.inf
+        for idx in candidates:
+            penalty = max(max_sim[idx], 0.0) if selected else 0.0
+            val = lam * norm_scores[idx] - (1 - lam) * penalty
+            if val > best_val:
+                best_idx, best_val = idx, val
+        selected.append(best_idx)
+        candidates.remove(best_idx)
+        np.maximum(max_sim, sim_matrix[best_idx], out=max_sim)
+    return selected[offset:]
+
+
+class CompositeScoresTests(unittest.TestCase):
+    def test_array_engine_matches_scalar_components(self) -> None:
+        now = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+        dates = [
+            now - timedelta(hours=1),
+            now - timedelta(hours=48),
+            None,
+            datetime(2026, 2, 10, 13, 0),  # naive + future: clamped to age 0
+        ]
+        views = [0, 10, 3, 200]
+        cluster_sizes = [1, 4, 2, 1]
+        authorities = [1.0, 0.7, 0.4, 0.4]
+        weights = RankingWeights()
+
+        scores = composite_scores_from_arrays(
+            epoch_seconds(dates),
+            np.array(views),
+            weights,
+            np.array(cluster_sizes),
+            np.array(authorities),
+            now_ts=now.timestamp(),
+        )
+
+        expected = _reference_scores(dates, views, weights, cluster_sizes, authorities, now)
+        np.testing.assert_allclose(scores, expected, rtol=1e-12)
+
+    def test_degenerate_maxima_zero_engagement_and_prominence(self) -> None:
+        now = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+        weights = RankingWeights(freshness=0.0, authority=0.0, prominence=1.0, engagement=1.0)
+
+        scores = composite_scores_from_arrays(
+            epoch_seconds([now, now]),
+            np.array([0, 0]),
+            weights,
+            np.array([1, 1]),
+            now_ts=now.timestamp(),
+        )
+
+        np.testing.assert_array_equal(scores, np.zeros(2))
+
+    def test_composite_scores_wrapper_accepts_lists(self) -> None:
+        now = datetime.now(timezone.utc)
+        scores = composite_scores([now, None], [1, 0], RankingWeights(), [1, 1], [1.0, 0.4])
+
+        self.assertEqual(scores.shape, (2,))
+        self.assertTrue(math.isclose(scores[1], 0.2 * 0.4))
+        self.assertEqual(composite_scores([], [], RankingWeights()).shape, (0,))
+
+
+class MmrRerankTests(unittest.TestCase):
+    def test_matches_reference_loop(self) -> None:
+        rng = np.random.default_rng(7)
+        n = 60
+        scores = rng.uniform(0, 1, n)
+        embeddings = rng.normal(size=(n, 16)).astype(np.float32)
+        cluster_ids = [int(c) if c < 8 else None for c in rng.integers(0, 12, n)]
+
+        for offset in (0, 10):
+            selected = mmr_rerank(scores, embeddings, 10, offset=offset, lam=0.3, cluster_ids=cluster_ids)
+            expected = _reference_mmr(scores, embeddings, 10, offset, 0.3, cluster_ids)
+            self.assertEqual(selected, expected)
+
+    def test_near_duplicate_is_pushed_down_unless_same_cluster(self) -> None:
+        scores = np.array([1.0, 0.9, 0.5])
+        embeddings = np.array([[1.0, 0.0], [1.0, 0.01], [0.0, 1.0]], dtype=np.float16)
+
+        self.assertEqual(mmr_rerank(scores, embeddings, 3, lam=0.3), [0, 2, 1])
+        self.assertEqual(mmr_rerank(scores, embeddings, 3, lam=0.3, cluster_ids=[5, 5, None]), [0, 1, 2])
+
+    def test_empty_and_short_inputs(self) -> None:
+        self.assertEqual(mmr_rerank(np.array([]), np.zeros((0, 4)), 5), [])
+        self.assertEqual(mmr_rerank(np.array([0.2, 0.1]), np.eye(2), 5, offset=1), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,12 @@ from unittest.mock import AsyncMock, patch
 
 from fundus_recommend.api import recommendations
 from fundus_recommend.db.queries import RankedStory
-from fundus_recommend.models.schemas import SearchResult, StoryRecommendationResult
+from fundus_recommend.models.schemas import (
+    RecommendationResponse,
+    SearchResult,
+    StoryRecommendationResponse,
+    StoryRecommendationResult,
+)
 
 
 def _article(article_id: int, cluster_id: int | None = None, publisher: str = "Reuters") -> SimpleNamespace:
@@ -46,6 +51,7 @@ class RecommendationsApiTests(unittest.IsolatedAsyncioTestCase):
                 limit=10,
                 session=AsyncMock(),
             )
+        response = StoryRecommendationResponse.model_validate_json(response.body)
 
         self.assertEqual(response.strategy, "topic:ai policy")
         self.assertEqual(len(response.results), 1)
@@ -63,6 +69,7 @@ class RecommendationsApiTests(unittest.IsolatedAsyncioTestCase):
                 limit=5,
                 session=AsyncMock(),
             )
+        response = StoryRecommendationResponse.model_validate_json(response.body)
 
         self.assertEqual(response.strategy, "recent")
         self.assertEqual(response.results, [])
@@ -88,6 +95,7 @@ class RecommendationsApiTests(unittest.IsolatedAsyncioTestCase):
                 limit=20,
                 session=AsyncMock(),
             )
+        response = StoryRecommendationResponse.model_validate_json(response.body)
 
         self.assertEqual(response.strategy, "personalized:user-1")
         self.assertEqual(len(response.results), 1)
@@ -106,6 +114,7 @@ class RecommendationsApiTests(unittest.IsolatedAsyncioTestCase):
                 limit=10,
                 session=AsyncMock(),
             )
+        response = RecommendationResponse.model_validate_json(response.body)
 
         self.assertEqual(response.strategy, "topic:climate")
         self.assertEqual(len(response.results), 1)
@@ -124,6 +133,7 @@ class RecommendationsApiTests(unittest.IsolatedAsyncioTestCase):
                 limit=20,
                 session=AsyncMock(),
             )
+        response = RecommendationResponse.model_validate_json(response.body)
 
         self.assertEqual(response.strategy, "personalized:legacy-user")
         self.assertEqual(len(response.results), 1)
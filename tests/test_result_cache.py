@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from fundus_recommend.models.schemas import ArticleListResponse
+from fundus_recommend.services.result_cache import FeedResultCache
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeExecuteResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+def _session(*watermarks) -> MagicMock:
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_FakeExecuteResult(value) for value in watermarks])
+    return session
+
+
+def _response(page: int = 1) -> ArticleListResponse:
+    return ArticleListResponse(items=[], total=0, page=page, page_size=20)
+
+
+class FeedResultCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_second_request_is_served_from_cache(self) -> None:
+        cache = FeedResultCache(max_entries=8, max_bytes=1 << 20, ttl_seconds=60, watermark_ttl_seconds=5)
+        session = _session(10)
+        build = AsyncMock(return_value=_response())
+
+        first = await cache.get_or_build(session, ("articles", 1), build)
+        second = await cache.get_or_build(session, ("articles", 1), build)
+
+        self.assertIs(first, second)
+        build.assert_awaited_once()
+        session.execute.assert_awaited_once()
+        self.assertEqual(cache.snapshot()["hits"], 1)
+        self.assertEqual(cache.snapshot()["misses"], 1)
+
+    async def test_new_watermark_invalidates_entry(self) -> None:
+        clock = _FakeClock()
+        cache = FeedResultCache(
+            max_entries=8, max_bytes=1 << 20, ttl_seconds=600, watermark_ttl_seconds=5, clock=clock
+        )
+        session = _session(10, 11)
+        build = AsyncMock(side_effect=[_response(), _response()])
+
+        await cache.get_or_build(session, ("stories", 1), build)
+        clock.now = 6.0
+        await cache.get_or_build(session, ("stories", 1), build)
+
+        self.assertEqual(build.await_count, 2)
+        self.assertEqual(cache.snapshot()["invalidations"], 1)
+
+    async def test_entry_expires_after_ttl(self) -> None:
+        clock = _FakeClock()
+        cache = FeedResultCache(
+            max_entries=8, max_bytes=1 << 20, ttl_seconds=30, watermark_ttl_seconds=1000, clock=clock
+        )
+        session = _session(10)
+        build = AsyncMock(side_effect=[_response(), _response()])
+
+        await cache.get_or_build(session, ("articles", 1), build)
+        clock.now = 31.0
+        await cache.get_or_build(session, ("articles", 1), build)
+
+        self.assertEqual(build.await_count, 2)
+        self.assertEqual(cache.snapshot()["expirations"], 1)
+
+    def test_byte_budget_evicts_least_recently_used(self) -> None:
+        cache = FeedResultCache(max_entries=8, max_bytes=100, ttl_seconds=60, watermark_ttl_seconds=5)
+
+        cache.put("a", 1, "A", 40)
+        cache.put("b", 1, "B", 40)
+        self.assertEqual(cache.get("a", 1), "A")
+        cache.put("c", 1, "C", 40)
+
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), "A")
+        self.assertEqual(cache.get("c", 1), "C")
+        snapshot = cache.snapshot()
+        self.assertEqual(snapshot["evictions"], 1)
+        self.assertEqual(snapshot["bytes"], 80)
+
+    async def test_disabled_cache_always_builds(self) -> None:
+        cache = FeedResultCache(max_entries=0, max_bytes=1 << 20, ttl_seconds=60, watermark_ttl_seconds=5)
+        session = _session()
+        build = AsyncMock(side_effect=[_response(), _response()])
+
+        await cache.get_or_build(session, ("articles", 1), build)
+        await cache.get_or_build(session, ("articles", 1), build)
+
+        self.assertEqual(build.await_count, 2)
+        session.execute.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
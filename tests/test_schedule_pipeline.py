@@ -27,6 +27,11 @@ def _publisher_result(publisher_id: str, inserted_ids: list[int]) -> PublisherCr
 
 
 class SchedulePipelineTests(unittest.TestCase):
+    @patch("fundus_recommend.cli.schedule.publish_feed_version", return_value=1)
+    @patch("fundus_recommend.cli.schedule.run_story_snapshot_refresh", return_value=(0, 0))
+    @patch("fundus_recommend.cli.schedule.run_story_cluster_rebuild_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_article_count_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_view_rollup_pass", return_value=0)
     @patch("fundus_recommend.cli.schedule.refresh_stale_embeddings", return_value=0)
     @patch("fundus_recommend.cli.schedule.run_dedup_pass", return_value=0)
     @patch("fundus_recommend.cli.schedule.categorize_new_articles")
@@ -41,6 +46,11 @@ class SchedulePipelineTests(unittest.TestCase):
         mock_categorize,
         mock_dedup,
         mock_refresh,
+        mock_rollups,
+        mock_counts,
+        mock_clusters,
+        mock_snapshots,
+        mock_feed_version,
     ) -> None:
         events: list[str] = []
         mock_crawl_once.return_value = CrawlRunResult(
@@ -63,7 +73,17 @@ class SchedulePipelineTests(unittest.TestCase):
         mock_categorize.assert_called_once_with([1, 2])
         mock_dedup.assert_called_once_with([1, 2])
         mock_refresh.assert_called_once_with(max_age_days=7, batch_size=64, max_rows=123)
+        mock_rollups.assert_called_once_with()
+        mock_counts.assert_called_once_with()
+        mock_clusters.assert_called_once_with()
+        mock_snapshots.assert_called_once_with()
+        mock_feed_version.assert_called_once_with()
 
+    @patch("fundus_recommend.cli.schedule.publish_feed_version", return_value=1)
+    @patch("fundus_recommend.cli.schedule.run_story_snapshot_refresh", return_value=(0, 0))
+    @patch("fundus_recommend.cli.schedule.run_story_cluster_rebuild_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_article_count_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_view_rollup_pass", return_value=0)
     @patch("fundus_recommend.cli.schedule.refresh_stale_embeddings", return_value=0)
     @patch("fundus_recommend.cli.schedule.run_dedup_pass", return_value=0)
     @patch("fundus_recommend.cli.schedule.categorize_new_articles")
@@ -78,6 +98,11 @@ class SchedulePipelineTests(unittest.TestCase):
         mock_categorize,
         mock_dedup,
         mock_refresh,
+        mock_rollups,
+        mock_counts,
+        mock_clusters,
+        mock_snapshots,
+        mock_feed_version,
     ) -> None:
         mock_crawl_once.return_value = CrawlRunResult(
             run_id=1,
@@ -96,6 +121,39 @@ class SchedulePipelineTests(unittest.TestCase):
         mock_dedup.assert_called_once_with([])
         mock_refresh.assert_called_once_with(max_age_days=7, batch_size=64, max_rows=None)
 
+    @patch("fundus_recommend.cli.schedule.publish_feed_version", return_value=1)
+    @patch("fundus_recommend.cli.schedule.run_story_snapshot_refresh", side_effect=RuntimeError("engine disposed"))
+    @patch("fundus_recommend.cli.schedule.run_story_cluster_rebuild_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_article_count_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_view_rollup_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.refresh_stale_embeddings", return_value=0)
+    @patch("fundus_recommend.cli.schedule.run_dedup_pass", return_value=0)
+    @patch("fundus_recommend.cli.schedule.crawl_publishers_once")
+    def test_run_cycle_survives_a_failed_story_snapshot_refresh(
+        self,
+        mock_crawl_once,
+        mock_dedup,
+        mock_refresh,
+        mock_rollups,
+        mock_counts,
+        mock_clusters,
+        mock_snapshots,
+        mock_feed_version,
+    ) -> None:
+        mock_crawl_once.return_value = CrawlRunResult(run_id=1, publisher_results=[_publisher_result("cnn", [])])
+
+        with (
+            patch("fundus_recommend.cli.schedule.get_dedup_stats", return_value=(0, 0, 0)),
+            patch.object(schedule.settings, "story_snapshot_enabled", True),
+            patch("fundus_recommend.cli.schedule.click.echo") as echo,
+        ):
+            schedule.run_cycle(["cnn"], max_articles=10, language=None, batch_size=64, workers=1)
+
+        mock_snapshots.assert_called_once_with()
+        mock_feed_version.assert_called_once_with()
+        messages = [call.args[0] for call in echo.call_args_list]
+        self.assertTrue(any("Story snapshot refresh failed: RuntimeError: engine disposed" in m for m in messages))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from fundus_recommend.db.queries import RankedStory
+from fundus_recommend.models.schemas import ArticleSummary, NewsStory, StoryListResponse
+from fundus_recommend.services import serialization
+from fundus_recommend.services.serialization import ArticleJSONCache, JSONFragment, dumps, story_payload
+
+
+def _article(article_id: int, cluster_id: int | None = None, title: str = "Ünïcode \"quoted\" title") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=article_id,
+        url=f"https://example.com/{article_id}",
+        title=title,
+        title_en=None,
+        authors=["Reporter"],
+        topics=["news"],
+        publisher="Reuters",
+        language="en",
+        publishing_date=datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc),
+        cover_image_url=None,
+        dedup_cluster_id=cluster_id,
+        category="General",
+    )
+
+
+class ArticleJSONCacheTests(unittest.TestCase):
+    def test_fragment_matches_pydantic_serialization(self) -> None:
+        article = _article(1)
+
+        fragment = ArticleJSONCache().fragment(article)
+
+        self.assertEqual(fragment.data, ArticleSummary.model_validate(article).model_dump_json().encode("utf-8"))
+
+    def test_fragment_is_reused_until_row_version_changes(self) -> None:
+        cache = ArticleJSONCache()
+        article = _article(1)
+
+        first = cache.fragment(article)
+        self.assertIs(cache.fragment(article), first)
+
+        article.dedup_cluster_id = 42
+        updated = cache.fragment(article)
+
+        self.assertIsNot(updated, first)
+        self.assertEqual(json.loads(updated.data)["dedup_cluster_id"], 42)
+        self.assertEqual((cache.stats.hits, cache.stats.misses, len(cache)), (1, 2, 1))
+
+    def test_least_recently_used_fragment_is_evicted(self) -> None:
+        cache = ArticleJSONCache(max_entries=2)
+        for article_id in (1, 2, 1, 3):
+            cache.fragment(_article(article_id))
+
+        cache.fragment(_article(1))
+
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.hits, 2)
+
+
+class DumpsTests(unittest.TestCase):
+    def _stories(self) -> list[RankedStory]:
+        lead, related = _article(1, 100), _article(2, 100)
+        return [RankedStory("cluster:100", 100, lead, [lead, related]), RankedStory("article:3", None, _article(3), [_article(3)])]
+
+    def test_story_list_is_byte_identical_to_pydantic_path(self) -> None:
+        stories = self._stories()
+        expected = StoryListResponse(
+            items=[
+                NewsStory(
+                    story_id=story.story_id,
+                    dedup_cluster_id=story.dedup_cluster_id,
+                    source_count=len(story.articles),
+                    lead_article=ArticleSummary.model_validate(story.lead_article),
+                    articles=[ArticleSummary.model_validate(article) for article in story.articles],
+                )
+                for story in stories
+            ],
+            total=2,
+            page=1,
+            page_size=15,
+            next_cursor="abc",
+        ).model_dump_json()
+
+        cache = ArticleJSONCache()
+        payload = {
+            "items": [story_payload(story, cache) for story in stories],
+            "total": 2,
+            "page": 1,
+            "page_size": 15,
+            "next_cursor": "abc",
+        }
+
+        self.assertEqual(dumps(payload).decode("utf-8"), expected)
+        # The lead is encoded once and reused inside ``articles``.
+        self.assertEqual(cache.stats.misses, 3)
+
+    def test_stdlib_fallback_produces_same_bytes(self) -> None:
+        payload = {"query": "naïve", "results": [{"article": JSONFragment(b'{"id":1}'), "score": 0.5}], "n": None}
+
+        with patch.object(serialization, "orjson", None), patch.object(serialization, "_ORJSON_FRAGMENT", None):
+            fallback = dumps(payload)
+
+        self.assertEqual(json.loads(fallback), json.loads(dumps(payload)))
+        self.assertEqual(fallback, '{"query":"naïve","results":[{"article":{"id":1},"score":0.5}],"n":null}'.encode())
+
+    def test_numpy_scalars_are_encoded_on_every_path(self) -> None:
+        payload = {"results": [{"article": JSONFragment(b'{"id":1}'), "score": np.float32(0.5)}], "n": np.int64(3)}
+        expected = b'{"results":[{"article":{"id":1},"score":0.5}],"n":3}'
+
+        with patch.object(serialization, "orjson", None), patch.object(serialization, "_ORJSON_FRAGMENT", None):
+            self.assertEqual(dumps(payload), expected)
+        # orjson without Fragment (< 3.9) splices fragments with per-scalar dumps.
+        with patch.object(serialization, "_ORJSON_FRAGMENT", None):
+            self.assertEqual(dumps(payload), expected)
+        self.assertEqual(dumps(payload), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime, timezone
+
+from fundus_recommend.services.dedup import rebuild_story_clusters_if_due, refresh_story_clusters
+
+
+def _member(article_id: int, cluster_id: int, publisher: str, hour: int | None, category: str | None = "US"):
+    published = datetime(2026, 2, 10, hour, 0, tzinfo=timezone.utc) if hour is not None else None
+    return (cluster_id, article_id, publisher, "en", category, published)
+
+
+class _FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def all(self):
+        return self._value
+
+
+class _FakeSession:
+    def __init__(self, watermark, members):
+        self._select_values = [watermark, members]
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        if getattr(statement, "is_select", False):
+            return _FakeResult(self._select_values.pop(0))
+        return _FakeResult(None)
+
+    def commit(self):
+        self.commits += 1
+
+    def upserted_rows(self):
+        rows = []
+        for statement in self.statements:
+            if getattr(statement, "is_insert", False) and statement.table.name == "story_clusters":
+                rows.extend(
+                    {column.key: value for column, value in row.items()} for row in statement._multi_values[0]
+                )
+        return rows
+
+
+class RefreshStoryClustersTests(unittest.TestCase):
+    def test_rows_carry_tier_counts_and_best_tier_lead(self) -> None:
+        session = _FakeSession(
+            watermark=1_700_000_000,
+            members=[
+                _member(1, 100, "Politico", 13),
+                _member(2, 100, "Reuters", 11),
+                _member(3, 100, "Nytimes", 12, category="Global"),
+                _member(4, 100, "Local Gazette", None),
+            ],
+        )
+
+        written = refresh_story_clusters(session, {100})
+
+        self.assertEqual(written, 1)
+        [row] = session.upserted_rows()
+        self.assertEqual(row["size"], 4)
+        self.assertEqual((row["tier_1_count"], row["tier_2_count"], row["tier_3_count"]), (2, 1, 1))
+        self.assertEqual(row["lead_article_id"], 3)
+        self.assertEqual(row["member_ids"], [3, 2, 1, 4])
+        self.assertEqual(row["categories"], ["Global", "US"])
+        self.assertFalse(any(getattr(s, "is_delete", False) for s in session.statements))
+
+    def test_clusters_without_members_are_deleted(self) -> None:
+        session = _FakeSession(watermark=1_700_000_000, members=[_member(5, 200, "Reuters", 9)])
+
+        refresh_story_clusters(session, {200, 300})
+
+        deletes = [s for s in session.statements if getattr(s, "is_delete", False)]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn("story_clusters.cluster_id IN", str(deletes[0]))
+        self.assertEqual([row["cluster_id"] for row in session.upserted_rows()], [200])
+
+    def test_first_run_rebuilds_the_whole_table(self) -> None:
+        session = _FakeSession(watermark=0, members=[_member(5, 200, "Reuters", 9)])
+
+        refresh_story_clusters(session, {200})
+
+        select_sql = str(session.statements[1])
+        self.assertNotIn("IN", select_sql)
+        self.assertEqual(str(session.statements[2]), "DELETE FROM story_clusters")
+        self.assertTrue(
+            any(
+                getattr(s, "is_insert", False) and s.table.name == "pipeline_watermarks"
+                for s in session.statements
+            )
+        )
+
+    def test_recategorized_member_updates_its_cluster_row(self) -> None:
+        session = _FakeSession(
+            watermark=1_700_000_000,
+            members=[_member(1, 100, "Reuters", 11, category="Technology"), _member(2, 100, "Politico", 12)],
+        )
+
+        refresh_story_clusters(session, {100})
+
+        [row] = session.upserted_rows()
+        self.assertEqual(row["categories"], ["Technology", "US"])
+        [upsert] = [s for s in session.statements if getattr(s, "is_insert", False)]
+        self.assertIn("categories = excluded.categories", str(upsert))
+
+
+class RebuildStoryClustersIfDueTests(unittest.TestCase):
+    def test_stale_watermark_rebuilds_the_whole_table(self) -> None:
+        stale = int(datetime.now(timezone.utc).timestamp()) - 25 * 3600
+        session = _FakeSession(watermark=stale, members=[_member(1, 100, "Reuters", 11, category="Technology")])
+
+        written = rebuild_story_clusters_if_due(session, rebuild_interval_hours=24)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(session.commits, 1)
+        self.assertNotIn("IN", str(session.statements[1]))
+        self.assertEqual(str(session.statements[2]), "DELETE FROM story_clusters")
+        self.assertEqual(session.upserted_rows()[0]["categories"], ["Technology"])
+
+    def test_recent_watermark_skips_the_rebuild(self) -> None:
+        recent = int(datetime.now(timezone.utc).timestamp()) - 3600
+        session = _FakeSession(watermark=recent, members=[])
+
+        self.assertEqual(rebuild_story_clusters_if_due(session, rebuild_interval_hours=24), 0)
+        self.assertEqual(len(session.statements), 1)
+        self.assertEqual(session.commits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
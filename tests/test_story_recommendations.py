@@ -81,8 +81,9 @@ class StoryRecommendationsQueryTests(unittest.IsolatedAsyncioTestCase):
                 return_value=[(article, 0.9) for article in candidates],
             ),
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.88, 0.87, 0.86, 0.30, 0.99, 0.20, 0.10]),
             ),
         ):
@@ -127,8 +128,9 @@ class StoryRecommendationsQueryTests(unittest.IsolatedAsyncioTestCase):
                 return_value=[(article, 0.9) for article in similar_candidates],
             ),
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.95, 0.90, 0.88, 0.20, 0.89, 0.19, 0.18]),
             ),
         ):
@@ -138,8 +140,8 @@ class StoryRecommendationsQueryTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_personalized_story_feed_prefers_tier1_anchored_and_respects_limit(self) -> None:
         preferences = [
-            SimpleNamespace(topic="policy", weight=1.0),
-            SimpleNamespace(topic="markets", weight=0.8),
+            SimpleNamespace(topic="policy", weight=1.0, embedding=None, embedding_model=None),
+            SimpleNamespace(topic="markets", weight=0.8, embedding=None, embedding_model=None),
         ]
 
         tier1_cluster = [
@@ -160,22 +162,32 @@ class StoryRecommendationsQueryTests(unittest.IsolatedAsyncioTestCase):
             _FakeExecuteResult([*tier1_cluster, *fallback_cluster]),
         ]
 
-        async def _semantic_side_effect(_session, topic: str, _limit: int):
-            if topic == "policy":
-                return [(article, 0.9) for article in tier1_cluster]
-            return [(article, 0.8) for article in fallback_cluster]
+        nearest_by_topic = [
+            [(article, 0.9) for article in tier1_cluster],
+            [(article, 0.8) for article in fallback_cluster],
+        ]
 
         with (
-            patch("fundus_recommend.db.queries.semantic_search", side_effect=_semantic_side_effect) as semantic_mock,
+            patch(
+                "fundus_recommend.db.queries.embed_queries",
+                return_value=[np.array([1.0, 0.0]), np.array([0.0, 1.0])],
+            ) as embed_mock,
+            patch(
+                "fundus_recommend.db.queries._nearest_articles_multi",
+                return_value=nearest_by_topic,
+            ) as nearest_mock,
             patch("fundus_recommend.db.queries.get_view_counts", return_value={}),
+            patch("fundus_recommend.db.queries._fetch_story_clusters", return_value={}),
             patch(
-                "fundus_recommend.db.queries.composite_scores",
+                "fundus_recommend.db.queries.composite_scores_from_arrays",
                 return_value=np.array([0.91, 0.90, 0.50, 0.99, 0.40, 0.30]),
             ),
         ):
             results = await get_personalized_story_feed(session, "user-1", limit=1, candidate_limit_per_topic=5)
 
-        self.assertEqual(semantic_mock.await_count, 2)
+        embed_mock.assert_awaited_once_with(["policy", "markets"])
+        nearest_mock.assert_awaited_once()
+        self.assertEqual(nearest_mock.await_args.args[2], 5)
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0][0].story_id, "cluster:100")
 
@@ -0,0 +1,161 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from fundus_recommend.db.queries import (
+    _nearest_articles,
+    _nearest_articles_multi,
+    _preference_candidates,
+    get_personalized_feed,
+    set_user_preferences,
+)
+
+
+class _FakeExecuteResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class NearestArticlesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_sets_ef_search_locally_and_converts_distance(self) -> None:
+        article = SimpleNamespace(id=1)
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeExecuteResult([]), _FakeExecuteResult([(article, 0.25)])]
+
+        with patch.multiple(
+            "fundus_recommend.db.queries.settings",
+            vector_search_ef_search=40,
+            vector_search_overfetch_factor=1,
+        ):
+            results = await _nearest_articles(session, [0.0, 1.0], limit=60, exclude_id=9)
+
+        self.assertEqual(results, [(article, 0.75)])
+        set_sql = _sql(session.execute.await_args_list[0].args[0])
+        self.assertIn("set_config('hnsw.ef_search', '60', true)", set_sql)
+        search_sql = _sql(session.execute.await_args_list[1].args[0])
+        self.assertIn("<=>", search_sql)
+        self.assertIn("articles.id != 9", search_sql)
+        self.assertIn("LIMIT 60", search_sql)
+
+    async def test_overfetch_widens_the_candidate_list_not_the_result(self) -> None:
+        session = AsyncMock()
+        session.execute.side_effect = [_FakeExecuteResult([]), _FakeExecuteResult([])]
+
+        with patch.multiple(
+            "fundus_recommend.db.queries.settings",
+            vector_search_ef_search=100,
+            vector_search_overfetch_factor=4,
+        ):
+            await _nearest_articles(session, [0.0, 1.0], limit=50)
+
+        set_sql = _sql(session.execute.await_args_list[0].args[0])
+        self.assertIn("set_config('hnsw.ef_search', '200', true)", set_sql)
+        search_sql = _sql(session.execute.await_args_list[1].args[0])
+        self.assertEqual(search_sql.count("LIMIT"), 1)
+        self.assertTrue(search_sql.rstrip().endswith("LIMIT 50"))
+
+    async def test_non_positive_limit_skips_queries(self) -> None:
+        session = AsyncMock()
+
+        self.assertEqual(await _nearest_articles(session, [1.0], limit=0), [])
+        session.execute.assert_not_awaited()
+
+
+class MultiTopicRetrievalTests(unittest.IsolatedAsyncioTestCase):
+    async def test_all_topics_are_retrieved_in_one_statement(self) -> None:
+        a, b = SimpleNamespace(id=1), SimpleNamespace(id=2)
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _FakeExecuteResult([]),
+            _FakeExecuteResult([(0, a, 0.1), (0, b, 0.3), (2, b, 0.2)]),
+        ]
+
+        results = await _nearest_articles_multi(session, [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]], limit=2)
+
+        self.assertEqual(session.execute.await_count, 2)
+        search_sql = _sql(session.execute.await_args_list[1].args[0])
+        self.assertEqual(search_sql.count("UNION ALL"), 2)
+        self.assertEqual(search_sql.count("LIMIT 2"), 3)
+        self.assertEqual(results, [[(a, 0.9), (b, 0.7)], [], [(b, 0.8)]])
+
+    async def test_personalized_feed_merges_topic_weights_on_returned_rows(self) -> None:
+        a, b = SimpleNamespace(id=1), SimpleNamespace(id=2)
+        preferences = [
+            SimpleNamespace(topic="ai", weight=1.0, embedding=None, embedding_model=None),
+            SimpleNamespace(topic="climate", weight=0.5, embedding=None, embedding_model=None),
+        ]
+
+        class _PrefResult:
+            def scalars(self):
+                return SimpleNamespace(all=lambda: preferences)
+
+        session = AsyncMock()
+        session.execute.return_value = _PrefResult()
+
+        with (
+            patch("fundus_recommend.db.queries.embed_queries", return_value=[[1.0], [0.0]]) as embed_mock,
+            patch(
+                "fundus_recommend.db.queries._nearest_articles_multi",
+                return_value=[[(a, 0.6)], [(a, 0.9), (b, 0.8)]],
+            ) as nearest_mock,
+        ):
+            results = await get_personalized_feed(session, "user-1", limit=5)
+
+        embed_mock.assert_awaited_once_with(["ai", "climate"])
+        nearest_mock.assert_awaited_once()
+        self.assertEqual(results, [(a, 0.6), (b, 0.4)])
+
+    async def test_stored_preference_vectors_skip_the_model(self) -> None:
+        preferences = [
+            SimpleNamespace(topic="ai", weight=1.0, embedding=np.array([1.0, 0.0]), embedding_model="all-MiniLM-L6-v2"),
+            SimpleNamespace(topic="climate", weight=1.0, embedding=np.array([0.0, 1.0]), embedding_model="old-model"),
+        ]
+        session = AsyncMock()
+
+        with (
+            patch("fundus_recommend.db.queries.settings.embedding_model", "all-MiniLM-L6-v2"),
+            patch("fundus_recommend.db.queries.embed_queries", return_value=[np.array([0.5, 0.5])]) as embed_mock,
+            patch("fundus_recommend.db.queries._nearest_articles_multi", return_value=[[], []]) as nearest_mock,
+        ):
+            await _preference_candidates(session, preferences, 10)
+
+        embed_mock.assert_awaited_once_with(["climate"])
+        query_vecs = nearest_mock.await_args.args[1]
+        np.testing.assert_array_equal(query_vecs[0], [1.0, 0.0])
+        np.testing.assert_array_equal(query_vecs[1], [0.5, 0.5])
+
+
+class SetUserPreferencesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_preferences_are_embedded_and_upserted_in_one_statement(self) -> None:
+        session = AsyncMock()
+
+        with patch(
+            "fundus_recommend.db.queries.embed_queries",
+            return_value=[np.array([1.0, 0.0]), np.array([0.0, 1.0])],
+        ) as embed_mock:
+            prefs = await set_user_preferences(session, "user-1", [("ai", 1.0), ("climate", 0.2), ("ai", 3.0)])
+
+        embed_mock.assert_awaited_once_with(["ai", "climate"])
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        statement = session.execute.await_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.assertIn("WITH upsert_user AS", sql)
+        self.assertIn("DELETE FROM user_preferences", sql)
+        self.assertIn("ON CONFLICT ON CONSTRAINT uq_user_topic DO UPDATE", sql)
+        self.assertEqual([(p.topic, p.weight) for p in prefs], [("ai", 3.0), ("climate", 0.2)])
+        self.assertNotIn("profile_embedding", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
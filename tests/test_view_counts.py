@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from fundus_recommend.services.view_counts import refresh_view_rollups
+
+NOON = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+class _FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def scalar_one(self):
+        return self._value
+
+
+class _FakeSession:
+    def __init__(self, watermark, counted=0):
+        self._select_values = [watermark, counted]
+        self.statements: list[str] = []
+        self.committed = False
+
+    def execute(self, statement):
+        self.statements.append(
+            str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        )
+        if getattr(statement, "is_select", False):
+            return _FakeResult(self._select_values.pop(0))
+        return _FakeResult(None)
+
+    def commit(self):
+        self.committed = True
+
+
+class ViewRollupTests(unittest.TestCase):
+    def _refresh(self, session, now: datetime, lag_seconds: int = 60) -> int:
+        with patch("fundus_recommend.services.view_counts.datetime", wraps=datetime) as clock:
+            clock.now.return_value = now
+            return refresh_view_rollups(session, lag_seconds=lag_seconds)
+
+    def test_open_hour_leaves_watermark_untouched(self) -> None:
+        # 12:00 is already counted and 13:00 is still open (lagged time 12:59).
+        session = _FakeSession(watermark=int(NOON.timestamp()))
+
+        folded = self._refresh(session, NOON + timedelta(minutes=60))
+
+        self.assertEqual(folded, 0)
+        self.assertFalse(session.committed)
+        self.assertFalse(any("INSERT" in sql for sql in session.statements))
+
+    def test_recounts_closed_hours_by_viewed_at_and_advances_watermark(self) -> None:
+        session = _FakeSession(watermark=int(NOON.timestamp()), counted=8)
+
+        folded = self._refresh(session, NOON + timedelta(hours=2, minutes=5))
+
+        self.assertEqual(folded, 8)
+        self.assertTrue(session.committed)
+        inserts = [sql for sql in session.statements if sql.startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertIn("article_view_rollups", inserts[0])
+        # The hour before the watermark is recounted, so late commits into it are kept.
+        self.assertIn("article_views.viewed_at < '2026-10-17 14:00:00+00:00'", inserts[0])
+        self.assertIn("article_views.viewed_at >= '2026-10-17 11:00:00+00:00'", inserts[0])
+        self.assertNotIn("article_views.id >", inserts[0])
+        self.assertIn("SET view_count = excluded.view_count", inserts[0])
+        self.assertIn("pipeline_watermarks", inserts[1])
+        self.assertIn(str(int((NOON + timedelta(hours=2)).timestamp())), inserts[1])
+
+    def test_first_pass_counts_all_closed_hours(self) -> None:
+        session = _FakeSession(watermark=0, counted=3)
+
+        self.assertEqual(self._refresh(session, NOON + timedelta(minutes=5)), 3)
+
+        self.assertNotIn("viewed_at >=", session.statements[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, OperationalError
+
+from fundus_recommend.api import articles
+from fundus_recommend.services.view_sink import ArticleIdCache, ViewSink
+
+
+class _FakeSession:
+    def __init__(self, writes: list[list[dict]]):
+        self._writes = writes
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def execute(self, _statement, params=None):
+        self._writes.append(list(params or []))
+
+    async def commit(self):
+        self.commits += 1
+
+
+class _RejectingSession(_FakeSession):
+    """Raises like PostgreSQL when a session id does not fit VARCHAR(36)."""
+
+    async def execute(self, statement, params=None):
+        if any(len(row["session_id"]) > 36 for row in params or []):
+            raise DataError("INSERT INTO article_views", params, Exception("value too long"))
+        await super().execute(statement, params)
+
+
+class _FakeScalarResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class ViewSinkTests(unittest.IsolatedAsyncioTestCase):
+    async def test_flushes_in_bulk_when_batch_fills(self) -> None:
+        writes: list[list[dict]] = []
+        sink = ViewSink(lambda: _FakeSession(writes), batch_size=3, flush_interval_seconds=60, max_buffer=10)
+
+        for article_id in (1, 2, 3):
+            sink.record(article_id, "session-a")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await sink.stop()
+
+        self.assertEqual(len(writes), 1)
+        self.assertEqual([row["article_id"] for row in writes[0]], [1, 2, 3])
+        self.assertEqual(sink.stats.flushed, 3)
+
+    async def test_stop_drains_partial_batch(self) -> None:
+        writes: list[list[dict]] = []
+        sink = ViewSink(lambda: _FakeSession(writes), batch_size=100, flush_interval_seconds=60, max_buffer=10)
+
+        sink.record(7, "session-b")
+        self.assertEqual(sink.pending, 1)
+        await sink.stop()
+
+        self.assertEqual(sink.pending, 0)
+        self.assertEqual(writes, [[{"article_id": 7, "session_id": "session-b"}]])
+
+    async def test_full_buffer_drops_instead_of_blocking(self) -> None:
+        sink = ViewSink(lambda: _FakeSession([]), batch_size=100, flush_interval_seconds=60, max_buffer=2)
+
+        for article_id in (1, 2, 3):
+            sink.record(article_id, "session-c")
+
+        self.assertEqual(sink.pending, 2)
+        self.assertEqual(sink.stats.dropped, 1)
+        await sink.stop()
+
+    async def test_rejected_row_is_isolated_and_the_rest_of_the_batch_flushes(self) -> None:
+        writes: list[list[dict]] = []
+        sink = ViewSink(lambda: _RejectingSession(writes), batch_size=5, flush_interval_seconds=60, max_buffer=5)
+        for article_id in (1, 2, 3, 4, 5):
+            sink.record(article_id, "x" * 40 if article_id == 3 else "session-d")
+
+        self.assertTrue(await sink.flush())
+
+        self.assertEqual(sorted(row["article_id"] for rows in writes for row in rows), [1, 2, 4, 5])
+        self.assertEqual((sink.stats.flushed, sink.stats.dropped, sink.stats.failed_flushes), (4, 1, 0))
+        self.assertEqual(sink.pending, 0)
+        # The sink keeps accepting and writing views afterwards.
+        sink.record(6, "session-d")
+        self.assertTrue(await sink.flush())
+        self.assertEqual(sink.stats.flushed, 5)
+        await sink.stop()
+
+    async def test_transient_errors_keep_the_batch_for_the_next_flush(self) -> None:
+        session = _FakeSession([])
+        session.execute = AsyncMock(side_effect=OperationalError("INSERT", {}, Exception("connection lost")))
+        sink = ViewSink(lambda: session, batch_size=5, flush_interval_seconds=60, max_buffer=5)
+        sink.record(1, "session-e")
+
+        self.assertFalse(await sink.flush())
+
+        self.assertEqual((sink.pending, sink.stats.failed_flushes), (1, 1))
+        session.execute = AsyncMock()
+        await sink.stop()
+        self.assertEqual(sink.pending, 0)
+
+
+class ArticleIdCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_confirmed_ids_skip_the_database(self) -> None:
+        cache = ArticleIdCache()
+        session = AsyncMock()
+        session.execute.return_value = _FakeScalarResult(5)
+
+        self.assertTrue(await cache.exists(session, 5))
+        self.assertTrue(await cache.exists(session, 5))
+        self.assertEqual(session.execute.await_count, 1)
+
+    async def test_missing_ids_are_rechecked(self) -> None:
+        cache = ArticleIdCache()
+        session = AsyncMock()
+        session.execute.return_value = _FakeScalarResult(None)
+
+        self.assertFalse(await cache.exists(session, 9))
+        self.assertFalse(await cache.exists(session, 9))
+        self.assertEqual(session.execute.await_count, 2)
+
+
+class TrackArticleViewTests(unittest.IsolatedAsyncioTestCase):
+    async def test_unknown_article_returns_404_without_buffering(self) -> None:
+        sink = ViewSink(lambda: _FakeSession([]), batch_size=10, flush_interval_seconds=60, max_buffer=10)
+        with (
+            patch.object(articles.article_id_cache, "exists", AsyncMock(return_value=False)),
+            patch("fundus_recommend.api.articles.get_view_sink", return_value=sink),
+        ):
+            with self.assertRaises(HTTPException) as exc:
+                await articles.track_article_view(404, articles.ViewRequest(session_id="s"), session=AsyncMock())
+
+        self.assertEqual(exc.exception.status_code, 404)
+        self.assertEqual(sink.pending, 0)
+
+    def test_session_id_longer_than_the_column_is_rejected(self) -> None:
+        with self.assertRaises(ValidationError):
+            articles.ViewRequest(session_id="x" * 37)
+
+
+if __name__ == "__main__":
+    unittest.main()